@@ -139,6 +139,39 @@ AUTH_USER_MODEL = "users.User"
 
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
+# Seconds a worker may serve its compiled recipe index before rebuilding it (see src.menu.recipes)
+RECIPE_INDEX_TTL = env.int("RECIPE_INDEX_TTL", default=300)
+
+# Seconds the orders dashboard figures stay fresh, and how long a stale value may still be served
+ORDER_STATS_CACHE_TTL = env.int("ORDER_STATS_CACHE_TTL", default=30)
+ORDER_STATS_CACHE_STALE_TTL = env.int("ORDER_STATS_CACHE_STALE_TTL", default=60)
+
+# Number the orders of each day 1, 2, 3... for the kitchen and the customers
+ORDER_DAILY_TICKETS = env.bool("ORDER_DAILY_TICKETS", default=True)
+
+# Seconds a rendered menu catalog response is kept
+CATALOG_CACHE_TTL = env.int("CATALOG_CACHE_TTL", default=300)
+
+# Memory-mapped catalog snapshot (prices, recipes) shared by the workers of a host (see src.menu.shared_catalog),
+# empty disables it, config/gunicorn.py turns it on for the web workers only,
+# and how often a worker checks whether another process replaced it
+CATALOG_SHARED_SNAPSHOT_PATH = env.str("CATALOG_SHARED_SNAPSHOT_PATH", default="")
+CATALOG_SHARED_SNAPSHOT_CHECK_INTERVAL = env.float("CATALOG_SHARED_SNAPSHOT_CHECK_INTERVAL", default=1.0)
+
+# Per-process memory unless CACHE_URL points at a cache shared by the workers,
+# e.g. filecache:///var/tmp/django_cache or redis://redis:6379/1
+CACHES = {"default": env.cache("CACHE_URL", default="locmemcache://")}
+
+# Seconds cache namespace versions and cached selector results live (see src.common.cache),
+# bounds how long a worker may serve data changed in another one when the cache is not shared
+CACHE_NAMESPACE_TTL = env.int("CACHE_NAMESPACE_TTL", default=300)
+
+# How workers with a per-process or per-host cache learn about changes made in the others (see src.common.invalidation):
+# "notify" (Postgres LISTEN/NOTIFY), "poll" (version table), "off", or "auto" (by database, off with a cache
+# shared by every host)
+CACHE_INVALIDATION_BUS = env.str("CACHE_INVALIDATION_BUS", default="auto")
+CACHE_INVALIDATION_POLL_INTERVAL = env.float("CACHE_INVALIDATION_POLL_INTERVAL", default=1.0)
+
 from config.settings.cors import *
 from config.settings.celery import *
 from config.settings.files_and_storages import *
@@ -1,4 +1,5 @@
 from config.env import env
+from config.settings.database import DB_HEALTH_CHECKS, DB_POOL_ENABLED, DB_POOL_OPTIONS
 
 from .base import *
 
@@ -25,15 +26,23 @@ SECURE_SSL_REDIRECT = env.bool("SECURE_SSL_REDIRECT", default=False)
 # https://docs.djangoproject.com/en/dev/ref/middleware/#x-content-type-options-nosniff
 SECURE_CONTENT_TYPE_NOSNIFF = env.bool("SECURE_CONTENT_TYPE_NOSNIFF", default=False)
 
+# The workers must share a cache: single-flight recomputation (see src.common.cache.cache_get_or_compute) and
+# the cached responses are per cache backend, with per-process memory every worker recomputes on its own.
+# A file cache is shared by the workers of a host, point CACHE_URL at Redis or Memcached to share it between hosts.
+CACHES = {"default": env.cache("CACHE_URL", default="filecache:///var/tmp/django_cache")}
 
 DATABASES = {
     "default": {
-        "ENGINE": "django.db.backends.postgresql_psycopg2",
-        "HOST": "db",
-        "PORT": 5432,
+        "ENGINE": "django.db.backends.postgresql",
+        "HOST": env.str("POSTGRES_HOST", default="db"),
+        "PORT": env.int("POSTGRES_PORT", default=5432),
         "NAME": env.str("POSTGRES_DB"),
         "USER": env.str("POSTGRES_USER"),
         "PASSWORD": env.str("POSTGRES_PASSWORD"),
+        # Pooled connections go back to the pool at the end of each request, the pool keeps them open
         "CONN_MAX_AGE": 0,
+        # With a pool Django has it check each connection on checkout
+        "CONN_HEALTH_CHECKS": DB_HEALTH_CHECKS,
+        "OPTIONS": {"pool": DB_POOL_OPTIONS if DB_POOL_ENABLED else False},
     },
 }
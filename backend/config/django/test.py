@@ -15,6 +15,7 @@ DEBUG = False
 PASSWORD_HASHERS = ["django.contrib.auth.hashers.MD5PasswordHasher"]
 
 CELERY_BROKER_BACKEND = "memory"
+CELERY_BROKER_URL = "memory://"
 CELERY_TASK_ALWAYS_EAGER = True
 CELERY_TASK_EAGER_PROPAGATES = True
 
@@ -23,3 +24,9 @@ CACHES = {
         "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
     }
 }
+
+# Tests that publish snapshots pass their own directory
+CATALOG_SNAPSHOT_ROOT = ""
+
+CACHE_INVALIDATION_BUS = "off"
+CATALOG_SHARED_SNAPSHOT_PATH = ""
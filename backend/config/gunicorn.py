@@ -0,0 +1,58 @@
+"""
+Gunicorn settings, the command line (see docker/backend/wsgi-entrypoint.sh) sets bind, workers and timeouts.
+"""
+import logging
+import os
+import tempfile
+
+logger = logging.getLogger("gunicorn.error")
+
+# Only the web workers share the memory-mapped catalog snapshot (see src.menu.shared_catalog),
+# set before the app is loaded, the forked workers inherit it
+os.environ.setdefault(
+    "CATALOG_SHARED_SNAPSHOT_PATH",
+    os.path.join("/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir(), "catalog-snapshot.bin"),
+)
+
+# Load the application once in the master, so workers (recycled ones too) fork with it imported and warmed up
+preload_app = True
+
+
+def on_starting(server):
+    # The steps that are not per-worker (imports, serializers, the shared catalog snapshot) run once here,
+    # before any worker is forked (see src.common.warmup)
+    import django
+
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.django.base")
+    django.setup()
+
+    from src.common.database import close_connection_pools
+    from src.common.warmup import run_warmups
+
+    try:
+        run_warmups(per_worker=False)
+    finally:
+        # Forked workers must not inherit the master's connections, nor its pool and the pool's threads
+        close_connection_pools()
+
+
+def post_fork(server, worker):
+    # Connections and in-memory caches are per process, fill them before the worker takes requests
+    from src.common.warmup import run_warmups
+
+    run_warmups(per_worker=True)
+
+
+def post_worker_init(worker):
+    # Runs in every worker once the app is loaded, threads started before the fork would not survive it
+    from src.common.invalidation import start_invalidation_listener
+
+    start_invalidation_listener()
+
+
+def worker_exit(server, worker):
+    # Recycled workers (--max-requests) leave a record of how saturated their pool got
+    from src.common.database import get_connection_pool_stats
+
+    for alias, stats in get_connection_pool_stats().items():
+        logger.info("Worker %s database pool %r: %s", worker.pid, alias, stats)
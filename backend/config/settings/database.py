@@ -0,0 +1,17 @@
+from config.env import env
+
+# Postgres connections come from a pool per gunicorn worker (Django's psycopg 3 pool) instead of being
+# opened for every request. Keep workers x DB_POOL_MAX_SIZE under the server's max_connections.
+DB_POOL_ENABLED = env.bool("DB_POOL_ENABLED", default=True)
+DB_POOL_OPTIONS = {
+    "min_size": env.int("DB_POOL_MIN_SIZE", default=2),
+    # One per request thread (gunicorn --threads) is enough
+    "max_size": env.int("DB_POOL_MAX_SIZE", default=8),
+    # Seconds a request waits for a free connection before failing
+    "timeout": env.float("DB_POOL_TIMEOUT", default=10.0),
+    # Seconds before an unused connection above min_size is closed, and before any connection is replaced
+    "max_idle": env.float("DB_POOL_MAX_IDLE", default=300.0),
+    "max_lifetime": env.float("DB_POOL_MAX_LIFETIME", default=1800.0),
+}
+# Check every connection on checkout, so a connection dropped by the server is replaced instead of failing a request
+DB_HEALTH_CHECKS = env.bool("DB_HEALTH_CHECKS", default=True)
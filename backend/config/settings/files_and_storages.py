@@ -11,3 +11,9 @@ if FILE_UPLOAD_STORAGE == "local":
     MEDIA_ROOT_NAME = "media"
     MEDIA_ROOT = os.path.join(BASE_DIR, MEDIA_ROOT_NAME)
     MEDIA_URL = f"/{MEDIA_ROOT_NAME}/"
+
+# Where the pre-rendered catalog JSON is published for nginx (see src.menu.snapshots), empty disables it
+CATALOG_SNAPSHOT_ROOT = env.str(
+    "CATALOG_SNAPSHOT_ROOT",
+    default=os.path.join(BASE_DIR, "media", "catalog") if FILE_UPLOAD_STORAGE == "local" else "",
+)
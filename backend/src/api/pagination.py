@@ -1,7 +1,15 @@
+import base64
+import binascii
+import json
 from collections import OrderedDict
+from datetime import date, datetime
 
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
 from rest_framework.pagination import LimitOffsetPagination as _LimitOffsetPagination
 from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
 
 
 def get_paginated_response(*, pagination_class, serializer_class, queryset, request, view):
@@ -51,3 +59,125 @@ class LimitOffsetPagination(_LimitOffsetPagination):
                 ]
             )
         )
+
+
+class CursorPagination(BasePagination):
+    """
+    Keyset pagination on a compound ordering, (-created_at, -id) by default.
+
+    Pages are fetched with `WHERE (created_at, id) < (cursor)` instead of an OFFSET,
+    so every page costs the same no matter how deep the client scrolls.
+    The cursors are opaque, the ordering fields must be non-null and end with a unique field.
+    The total count is only computed with `?with_count=true` and is capped at `count_cap` rows.
+    """
+
+    ordering = ("-created_at", "-id")
+    page_size = 25
+    max_page_size = 100
+    page_size_query_param = "limit"
+    cursor_query_param = "cursor"
+    count_query_param = "with_count"
+    count_cap = 1000
+    invalid_cursor_message = "Invalid cursor"
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.limit = self.get_limit(request)
+        position, backwards = self.decode_cursor(request)
+
+        self.count = None
+        if request.query_params.get(self.count_query_param) in ("1", "true", "True"):
+            self.count = queryset.order_by()[: self.count_cap + 1].count()
+
+        ordering = self.get_ordering(reverse=backwards)
+        if position is not None:
+            queryset = queryset.filter(self.get_keyset_filter(position, reverse=backwards))
+
+        page = list(queryset.order_by(*ordering)[: self.limit + 1])
+        has_more = len(page) > self.limit
+        page = page[: self.limit]
+
+        if backwards:
+            page.reverse()
+            self.has_next, self.has_previous = position is not None, has_more
+        else:
+            self.has_next, self.has_previous = has_more, position is not None
+
+        self.page = page
+        return page
+
+    def get_limit(self, request):
+        try:
+            limit = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return min(max(limit, 1), self.max_page_size)
+
+    def get_ordering(self, reverse=False):
+        if not reverse:
+            return self.ordering
+        return tuple(field[1:] if field.startswith("-") else f"-{field}" for field in self.ordering)
+
+    def get_keyset_filter(self, position, reverse=False):
+        """Rows strictly after `position` in the (possibly reversed) ordering, as an OR of equal prefixes"""
+        keyset_filter = Q()
+        equal = Q()
+        for field, value in zip(self.get_ordering(reverse), position):
+            name = field.lstrip("-")
+            lookup = "lt" if field.startswith("-") else "gt"
+            keyset_filter |= equal & Q(**{f"{name}__{lookup}": value})
+            equal &= Q(**{name: value})
+        return keyset_filter
+
+    def get_position(self, instance):
+        position = []
+        for field in self.ordering:
+            value = getattr(instance, field.lstrip("-"))
+            position.append(value.isoformat() if isinstance(value, (date, datetime)) else value)
+        return position
+
+    def encode_cursor(self, position, backwards=False):
+        payload = json.dumps({"p": position, "b": backwards}, separators=(",", ":"))
+        cursor = base64.urlsafe_b64encode(payload.encode()).decode()
+        # The count is only needed once, following pages skip it
+        url = remove_query_param(self.request.build_absolute_uri(), self.count_query_param)
+        return replace_query_param(url, self.cursor_query_param, cursor)
+
+    def decode_cursor(self, request):
+        cursor = request.query_params.get(self.cursor_query_param)
+        if not cursor:
+            return None, False
+
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(cursor.encode()).decode())
+            position, backwards = payload["p"], bool(payload["b"])
+        except (binascii.Error, ValueError, KeyError, TypeError):
+            raise NotFound(self.invalid_cursor_message)
+
+        if not isinstance(position, list) or len(position) != len(self.ordering):
+            raise NotFound(self.invalid_cursor_message)
+
+        return position, backwards
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(self.get_position(self.page[-1]))
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        if not self.page:
+            return remove_query_param(self.request.build_absolute_uri(), self.cursor_query_param)
+        return self.encode_cursor(self.get_position(self.page[0]), backwards=True)
+
+    def get_paginated_response(self, data):
+        pagination = [
+            ("limit", self.limit),
+            ("next", self.get_next_link()),
+            ("previous", self.get_previous_link()),
+        ]
+        if self.count is not None:
+            pagination += [("count", min(self.count, self.count_cap)), ("count_capped", self.count > self.count_cap)]
+
+        return Response(OrderedDict(pagination + [("results", data)]))
@@ -0,0 +1,69 @@
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework import serializers
+from rest_framework.test import APIRequestFactory
+from rest_framework.views import APIView
+
+from src.api.pagination import CursorPagination, get_paginated_response
+from src.users.models import User
+from src.users.services import user_create
+
+
+class ExampleCursorListApi(APIView):
+    class Pagination(CursorPagination):
+        ordering = ("-date_joined", "-id")
+        page_size = 2
+        count_cap = 3
+
+    class OutputSerializer(serializers.ModelSerializer):
+        class Meta:
+            model = User
+            fields = ("id", "email")
+
+    def get(self, request):
+        return get_paginated_response(
+            pagination_class=self.Pagination,
+            serializer_class=self.OutputSerializer,
+            queryset=User.objects.all(),
+            request=request,
+            view=self,
+        )
+
+
+class CursorPaginationTests(TestCase):
+    def setUp(self):
+        self.factory = APIRequestFactory()
+
+        # Users 1-3 share the same timestamp so the id tie-break is exercised
+        joined = timezone.now()
+        self.users = [
+            user_create(username=f"user{index}", password="123456", email=f"user{index}@hacksoft.io")
+            for index in range(5)
+        ]
+        User.objects.filter(id__in=[user.id for user in self.users[1:4]]).update(date_joined=joined)
+        User.objects.filter(id=self.users[0].id).update(date_joined=joined - timezone.timedelta(days=1))
+        User.objects.filter(id=self.users[4].id).update(date_joined=joined + timezone.timedelta(days=1))
+
+        self.expected = [self.users[4].id, self.users[3].id, self.users[2].id, self.users[1].id, self.users[0].id]
+
+    def get(self, url):
+        return ExampleCursorListApi.as_view()(self.factory.get(url)).data
+
+    def test_walks_forward_and_back_without_gaps(self):
+        pages = [self.get("/some/path?with_count=true")]
+        while pages[-1]["next"]:
+            pages.append(self.get(pages[-1]["next"]))
+
+        self.assertEqual([user["id"] for page in pages for user in page["results"]], self.expected)
+        self.assertEqual((pages[0]["count"], pages[0]["count_capped"]), (3, True))
+        self.assertIsNone(pages[0]["previous"])
+        self.assertNotIn("count", pages[1])
+
+        previous = self.get(pages[-1]["previous"])
+        self.assertEqual([user["id"] for user in previous["results"]], self.expected[2:4])
+        self.assertEqual([user["id"] for user in self.get(previous["previous"])["results"]], self.expected[:2])
+
+    def test_invalid_cursor_is_rejected(self):
+        response = ExampleCursorListApi.as_view()(self.factory.get("/some/path?cursor=not-a-cursor"))
+
+        self.assertEqual(response.status_code, 404)
@@ -7,4 +7,5 @@ urlpatterns = [
     path("tables/", include(("src.table.urls", "tables"))),
     path("orders/", include(("src.order.urls", "orders"))),
     path("services/", include(("src.service.urls", "services"))),
+    path("health/", include(("src.common.urls", "common"))),
 ]
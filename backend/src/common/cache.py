@@ -0,0 +1,214 @@
+import functools
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save
+
+
+def cache_get_or_compute(key, compute, *, ttl, stale_ttl=60, namespace=None, lock_timeout=30, wait=5.0, poll=0.05):
+    """
+    Cached `compute()` with single-flight recomputation.
+
+    A value is fresh for `ttl` seconds and then kept `stale_ttl` seconds longer. When it is stale or
+    invalidated only the caller that takes the lock recomputes, the others get the stale value, or,
+    when there is none, wait up to `wait` seconds for the fresh one before computing it themselves.
+    With a `namespace` the value also goes stale when the namespace is invalidated (invalidate_namespaces),
+    in every worker through the invalidation bus. Single-flight spans the workers sharing the cache backend.
+    """
+    version = get_namespace_version(namespace) if namespace else None
+    entry = cache.get(key)
+    if entry is not None and entry["fresh_until"] > time.time() and entry.get("version") == version:
+        return entry["value"]
+
+    lock_key = f"{key}:lock"
+    if cache.add(lock_key, True, timeout=lock_timeout):
+        try:
+            generation = get_cache_generation(key)
+            value = compute()
+            # Invalidated while computing, the value may miss that write so store it as already stale
+            invalidated = get_cache_generation(key) != generation or (
+                namespace is not None and get_namespace_version(namespace) != version
+            )
+            fresh_until = 0 if invalidated else time.time() + ttl
+            cache.set(key, {"value": value, "fresh_until": fresh_until, "version": version}, timeout=ttl + stale_ttl)
+            return value
+        finally:
+            cache.delete(lock_key)
+
+    if entry is not None:
+        return entry["value"]
+
+    deadline = time.time() + wait
+    while time.time() < deadline:
+        time.sleep(poll)
+        entry = cache.get(key)
+        if entry is not None:
+            return entry["value"]
+
+    return compute()
+
+
+def get_cache_generation(key):
+    return cache.get(f"{key}:generation", 0)
+
+
+def cache_invalidate(key, stale_ttl=60):
+    """
+    Mark a cached value stale instead of deleting it,
+    so readers keep getting it while a single caller recomputes
+    """
+    generation_key = f"{key}:generation"
+    if not cache.add(generation_key, 1, timeout=None):
+        cache.incr(generation_key)
+
+    entry = cache.get(key)
+    if entry is not None:
+        cache.set(key, {**entry, "fresh_until": 0}, timeout=stale_ttl)
+
+
+CACHE_NAMESPACES = ("menu", "services", "tables", "recipes", "orders")
+
+# Model (or m2m through model) -> the cache namespaces its writes invalidate
+_namespace_registry = {}
+
+_CACHE_MISS = object()
+
+
+def _check_namespace(namespace):
+    if namespace not in CACHE_NAMESPACES:
+        raise ImproperlyConfigured(f"Unknown cache namespace {namespace!r}, expected one of {CACHE_NAMESPACES}")
+
+
+def get_namespace_version(namespace):
+    """
+    Current version of a cache namespace, part of every key in it.
+    A missing version (evicted or expired after CACHE_NAMESPACE_TTL) restarts from the clock,
+    so it never goes back to a used value and a per-process cache is stale for at most that long.
+    """
+    key = f"{namespace}:version"
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, time.time_ns(), timeout=settings.CACHE_NAMESPACE_TTL)
+        version = cache.get(key, time.time_ns())
+    return version
+
+
+def bump_namespace_version(namespace):
+    """Move a namespace to a new version, orphaning every key of the previous one"""
+    _check_namespace(namespace)
+    key = f"{namespace}:version"
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, time.time_ns(), timeout=settings.CACHE_NAMESPACE_TTL)
+
+
+def namespaced_key(namespace, *parts):
+    _check_namespace(namespace)
+    return ":".join([namespace, str(get_namespace_version(namespace)), *map(str, parts)])
+
+
+def invalidate_namespaces(*namespaces):
+    """
+    Bump the namespaces now and again once the current transaction commits,
+    so a value cached from uncommitted data does not outlive the change,
+    then tell the other workers through the invalidation bus
+    """
+    from src.common.invalidation import publish_invalidation
+
+    def bump():
+        for namespace in namespaces:
+            bump_namespace_version(namespace)
+
+    bump()
+    transaction.on_commit(bump)
+    # A failing bus must not fail the request that already committed
+    transaction.on_commit(lambda: publish_invalidation(namespaces), robust=True)
+
+
+def _model_changed(sender, **kwargs):
+    if kwargs.get("action", "post_").startswith("pre_"):
+        return
+    invalidate_namespaces(*_namespace_registry.get(sender, ()))
+
+
+def register_cache_invalidation(namespace, *models):
+    """
+    Invalidate `namespace` whenever one of `models` is saved or deleted, or one of its
+    many-to-many relations changes. Writes that bypass signals (`update()`, `bulk_create()`)
+    have to call `invalidate_namespaces` themselves.
+    """
+    _check_namespace(namespace)
+
+    for model in models:
+        senders = [(model, (post_save, post_delete))]
+        senders.extend((field.remote_field.through, (m2m_changed,)) for field in model._meta.many_to_many)
+
+        for sender, signals in senders:
+            _namespace_registry.setdefault(sender, set()).add(namespace)
+            for signal in signals:
+                signal.connect(_model_changed, sender=sender, dispatch_uid=f"cache-namespaces:{sender._meta.label}")
+
+
+def record_cache_lookup(namespace, hit):
+    key = f"cache-stats:{namespace}:{'hits' if hit else 'misses'}"
+    if not cache.add(key, 1, timeout=None):
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, 1, timeout=None)
+
+
+def get_cache_stats():
+    """{namespace: {"hits", "misses", "hit_rate"}} since the counters were last reset"""
+    keys = [f"cache-stats:{namespace}:{kind}" for namespace in CACHE_NAMESPACES for kind in ("hits", "misses")]
+    counters = cache.get_many(keys)
+
+    stats = {}
+    for namespace in CACHE_NAMESPACES:
+        hits = counters.get(f"cache-stats:{namespace}:hits", 0)
+        misses = counters.get(f"cache-stats:{namespace}:misses", 0)
+        lookups = hits + misses
+        stats[namespace] = {"hits": hits, "misses": misses, "hit_rate": hits / lookups if lookups else None}
+
+    return stats
+
+
+def reset_cache_stats():
+    cache.delete_many(
+        [f"cache-stats:{namespace}:{kind}" for namespace in CACHE_NAMESPACES for kind in ("hits", "misses")]
+    )
+
+
+def cached_selector(namespace, ttl=None):
+    """
+    Cache a selector's result under the current version of `namespace`, keyed by its arguments.
+    Querysets are evaluated (with their prefetches) when stored, so only decorate selectors whose result
+    is read, never written back. Exceptions, e.g. Http404, are not cached.
+    `<selector>.uncached` queries the database directly, for processes that get no invalidations.
+    """
+    _check_namespace(namespace)
+
+    def decorator(selector):
+        name = f"{selector.__module__}.{selector.__qualname__}"
+
+        @functools.wraps(selector)
+        def wrapper(*args, **kwargs):
+            arguments = hashlib.md5(repr((args, sorted(kwargs.items()))).encode()).hexdigest()
+            key = namespaced_key(namespace, name, arguments)
+
+            value = cache.get(key, _CACHE_MISS)
+            record_cache_lookup(namespace, hit=value is not _CACHE_MISS)
+            if value is _CACHE_MISS:
+                value = selector(*args, **kwargs)
+                cache.set(key, value, timeout=ttl or settings.CACHE_NAMESPACE_TTL)
+            return value
+
+        wrapper.uncached = selector
+        return wrapper
+
+    return decorator
@@ -0,0 +1,50 @@
+import copy
+import time
+
+from django.db import connections
+
+
+def get_unpooled_settings(alias="default"):
+    """Settings of a database without its connection pool, for connections held outside of requests"""
+    settings_dict = copy.deepcopy(connections.settings[alias])
+    settings_dict["OPTIONS"].pop("pool", None)
+    return settings_dict
+
+
+def get_connection_pools():
+    """
+    {alias: psycopg pool} of this process, pools are per worker.
+    Only the pools already opened: reading `connection.pool` would create one for every alias.
+    """
+    pools = {}
+    for alias in connections:
+        # The PostgreSQL backend keeps its pools by alias on the wrapper class
+        pool = getattr(type(connections[alias]), "_connection_pools", {}).get(alias)
+        if pool is not None:
+            pools[alias] = pool
+    return pools
+
+
+def get_connection_pool_stats():
+    """
+    Size and saturation counters of this worker's pools: pool_size / pool_available connections,
+    requests_waiting right now, and since the pool opened requests_queued (had to wait),
+    requests_wait_ms, requests_errors (timed out) and connections_lost
+    """
+    return {alias: pool.get_stats() for alias, pool in get_connection_pools().items()}
+
+
+def close_connection_pools():
+    """Close this process's pools, the gunicorn master does before forking so workers open their own"""
+    for connection in connections.all(initialized_only=True):
+        connection.close()
+    for alias in get_connection_pools():
+        connections[alias].close_pool()
+
+
+def check_database(alias="default"):
+    """Run a trivial query and return its round trip in milliseconds"""
+    started = time.perf_counter()
+    with connections[alias].cursor() as cursor:
+        cursor.execute("SELECT 1")
+    return (time.perf_counter() - started) * 1000
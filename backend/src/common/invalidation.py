@@ -0,0 +1,172 @@
+import json
+import logging
+import os
+import select
+import socket
+import threading
+
+from django.conf import settings
+from django.db import connection, connections
+from django.db.models import F
+from django.db.utils import load_backend
+
+from src.common.cache import CACHE_NAMESPACES, bump_namespace_version
+from src.common.database import get_unpooled_settings
+from src.common.models import CacheNamespaceVersion
+
+logger = logging.getLogger(__name__)
+
+INVALIDATION_CHANNEL = "cache_invalidation"
+
+# Caches the workers of other hosts do not see
+HOST_LOCAL_CACHE_BACKENDS = (
+    "django.core.cache.backends.locmem.LocMemCache",
+    "django.core.cache.backends.filebased.FileBasedCache",
+)
+
+
+def get_invalidation_bus():
+    """
+    "notify" (Postgres LISTEN/NOTIFY), "poll" (CacheNamespaceVersion table) or "off".
+    "auto" only runs a bus when the cache is per-process or per-host, a cache shared by every host needs none.
+    """
+    bus = settings.CACHE_INVALIDATION_BUS
+    if bus != "auto":
+        return bus
+
+    if settings.CACHES["default"]["BACKEND"] not in HOST_LOCAL_CACHE_BACKENDS:
+        return "off"
+    return "notify" if connection.vendor == "postgresql" else "poll"
+
+
+def _get_origin():
+    # Computed on every call, forked workers must not share their parent's id
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def publish_invalidation(namespaces):
+    """Tell the other workers that `namespaces` changed, called once the change is committed"""
+    bus = get_invalidation_bus()
+    if bus == "off" or not namespaces:
+        return
+
+    if bus == "notify":
+        payload = json.dumps({"origin": _get_origin(), "namespaces": sorted(namespaces)})
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT pg_notify(%s, %s)", [INVALIDATION_CHANNEL, payload])
+        return
+
+    for namespace in namespaces:
+        if not CacheNamespaceVersion.objects.filter(namespace=namespace).update(version=F("version") + 1):
+            CacheNamespaceVersion.objects.get_or_create(namespace=namespace)
+            CacheNamespaceVersion.objects.filter(namespace=namespace).update(version=F("version") + 1)
+
+
+class InvalidationListener(threading.Thread):
+    """
+    Worker thread bumping the local cache namespace versions when another worker publishes a change.
+    After a lost connection every namespace is bumped, notifications sent meanwhile are gone.
+    """
+
+    def __init__(self, bus, poll_interval):
+        super().__init__(name="cache-invalidation-listener", daemon=True)
+        self.bus = bus
+        self.poll_interval = poll_interval
+        self.stopped = threading.Event()
+
+    def stop(self):
+        self.stopped.set()
+
+    def run(self):
+        reconnecting = False
+        while not self.stopped.is_set():
+            try:
+                if self.bus == "notify":
+                    self.listen(reconnecting)
+                else:
+                    self.poll(reconnecting)
+            except Exception:
+                logger.exception("Cache invalidation listener failed, retrying in %ss", self.poll_interval)
+                reconnecting = True
+                self.stopped.wait(self.poll_interval)
+            finally:
+                connections.close_all()
+
+    def invalidate(self, namespaces):
+        for namespace in namespaces:
+            if namespace in CACHE_NAMESPACES:
+                bump_namespace_version(namespace)
+
+    def listen(self, reconnecting):
+        # A connection of its own, outside the request connections, their transactions and their pool
+        settings_dict = get_unpooled_settings("default")
+        wrapper = load_backend(settings_dict["ENGINE"]).DatabaseWrapper(settings_dict, "default")
+        try:
+            wrapper.ensure_connection()
+            wrapper.set_autocommit(True)
+            with wrapper.cursor() as cursor:
+                cursor.execute(f"LISTEN {INVALIDATION_CHANNEL}")
+            if reconnecting:
+                self.invalidate(CACHE_NAMESPACES)
+
+            while not self.stopped.is_set():
+                for payload in self.wait_for_notifications(wrapper.connection):
+                    message = json.loads(payload)
+                    if message["origin"] != _get_origin():
+                        self.invalidate(message["namespaces"])
+        finally:
+            wrapper.close()
+
+    def wait_for_notifications(self, raw_connection):
+        """Payloads received within one poll interval, for psycopg 2 and 3"""
+        if hasattr(raw_connection, "notifies") and callable(raw_connection.notifies):
+            return [notify.payload for notify in raw_connection.notifies(timeout=self.poll_interval, stop_after=100)]
+
+        if select.select([raw_connection], [], [], self.poll_interval) == ([], [], []):
+            return []
+        raw_connection.poll()
+        payloads = [notify.payload for notify in raw_connection.notifies]
+        raw_connection.notifies.clear()
+        return payloads
+
+    def poll(self, reconnecting):
+        seen = dict(CacheNamespaceVersion.objects.values_list("namespace", "version"))
+        if reconnecting:
+            self.invalidate(CACHE_NAMESPACES)
+
+        # The worker's own changes come back too, bumping its versions once more is harmless
+        while not self.stopped.wait(self.poll_interval):
+            versions = dict(CacheNamespaceVersion.objects.values_list("namespace", "version"))
+            self.invalidate([namespace for namespace, version in versions.items() if seen.get(namespace) != version])
+            seen = versions
+
+
+_listener = None
+_listener_lock = threading.Lock()
+
+
+def start_invalidation_listener():
+    """Start this process's listener thread, once per process, when a bus is configured"""
+    global _listener
+
+    bus = get_invalidation_bus()
+    if bus == "off":
+        return None
+
+    with _listener_lock:
+        # A listener inherited through fork has no thread in this process
+        if _listener is None or not _listener.is_alive():
+            _listener = InvalidationListener(bus, settings.CACHE_INVALIDATION_POLL_INTERVAL)
+            _listener.start()
+
+    return _listener
+
+
+def stop_invalidation_listener():
+    global _listener
+
+    with _listener_lock:
+        if _listener is not None:
+            _listener.stop()
+            _listener.join()
+            _listener = None
@@ -0,0 +1,119 @@
+import copy
+import statistics
+import threading
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.db.utils import load_backend
+
+from src.common.database import get_unpooled_settings
+
+
+class Command(BaseCommand):
+    help = """
+    Compare requests/second against Postgres with a new connection per request (CONN_MAX_AGE 0,
+    no pool) and with the psycopg connection pool, from the settings of the default database.
+
+    Every simulated request opens (or checks out) a connection, runs --query and closes
+    (or returns) it, like a Django request does. Run it next to the database, with the
+    docker-compose stack from the repository root: "docker compose up -d db backend", then
+    "docker compose exec backend python manage.py benchmark_db_pool --threads 8 --requests 500".
+    The first lines of the output describe the run (server version and address, psycopg and
+    pool versions, pool options), quote them together with the figures.
+    """
+
+    def add_arguments(self, parser):
+        parser.add_argument("--threads", type=int, default=8, help="Concurrent request threads (gunicorn --threads)")
+        parser.add_argument("--requests", type=int, default=500, help="Requests per thread")
+        parser.add_argument("--query", default="SELECT 1")
+        parser.add_argument("--pool-size", type=int, help="Pool max_size, defaults to the configured one or --threads")
+
+    def handle(self, *args, **options):
+        if connections["default"].vendor != "postgresql":
+            raise CommandError("The connection pool needs PostgreSQL, the default database is not")
+
+        unpooled = get_unpooled_settings("default")
+        pooled = copy.deepcopy(unpooled)
+        pool_options = connections.settings["default"]["OPTIONS"].get("pool")
+        pool_options = dict(pool_options) if isinstance(pool_options, dict) else {}
+        pool_options["max_size"] = options["pool_size"] or pool_options.get("max_size") or options["threads"]
+        pool_options["min_size"] = min(pool_options.get("min_size", 0), pool_options["max_size"])
+        pooled["OPTIONS"]["pool"] = pool_options
+
+        self.describe_environment(unpooled, pool_options, options)
+        for label, settings_dict in (("no pool", unpooled), ("pool", pooled)):
+            self.run_benchmark(label, settings_dict, options)
+
+    def describe_environment(self, settings_dict, pool_options, options):
+        import psycopg
+        import psycopg_pool
+
+        with connections["default"].cursor() as cursor:
+            cursor.execute("SHOW server_version")
+            (server_version,) = cursor.fetchone()
+
+        address = f"{settings_dict['HOST'] or 'localhost'}:{settings_dict['PORT'] or 5432}"
+        self.stdout.write(
+            f"PostgreSQL {server_version} at {address}, psycopg {psycopg.__version__}, "
+            f"psycopg-pool {psycopg_pool.__version__}"
+        )
+        self.stdout.write(
+            f"{options['threads']} threads x {options['requests']} requests, query {options['query']!r}, "
+            f"pool options {pool_options}"
+        )
+
+    def run_benchmark(self, label, settings_dict, options):
+        backend = load_backend(settings_dict["ENGINE"])
+        # The pool is keyed by alias, a dedicated one keeps it apart from the default database's
+        alias = f"benchmark-{label.replace(' ', '-')}"
+        latencies = []
+        errors = []
+        lock = threading.Lock()
+
+        def worker():
+            connection = backend.DatabaseWrapper(settings_dict, alias)
+            thread_latencies = []
+            try:
+                for _ in range(options["requests"]):
+                    started = time.perf_counter()
+                    with connection.cursor() as cursor:
+                        cursor.execute(options["query"])
+                        cursor.fetchall()
+                    connection.close()
+                    thread_latencies.append(time.perf_counter() - started)
+            except Exception as exc:
+                errors.append(exc)
+            with lock:
+                latencies.extend(thread_latencies)
+
+        # Opened up front, like the warm-up does, so pool start up is not measured
+        warmup_connection = backend.DatabaseWrapper(settings_dict, alias)
+        warmup_connection.ensure_connection()
+        warmup_connection.close()
+
+        threads = [threading.Thread(target=worker) for _ in range(options["threads"])]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+
+        pool = warmup_connection.pool
+        stats = pool.get_stats() if pool is not None else None
+        if pool is not None:
+            warmup_connection.close_pool()
+
+        if errors:
+            raise CommandError(f"{label}: {len(errors)} threads failed, first error: {errors[0]!r}")
+
+        latencies.sort()
+        self.stdout.write(
+            f"{label:<8} {len(latencies) / elapsed:>9.1f} req/s  "
+            f"mean {statistics.fmean(latencies) * 1000:.2f} ms  "
+            f"p50 {latencies[len(latencies) // 2] * 1000:.2f} ms  "
+            f"p99 {latencies[int(len(latencies) * 0.99) - 1] * 1000:.2f} ms"
+        )
+        if stats is not None:
+            self.stdout.write(f"         pool stats: {stats}")
@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+
+from src.common.cache import get_cache_stats, reset_cache_stats
+
+
+class Command(BaseCommand):
+    help = """
+    Show the hit/miss counters of the cache namespaces (menu, services, tables, recipes).
+
+    The counters live in the default cache, so they only cover other workers when that cache is shared.
+    Use --reset to start counting again.
+    """
+
+    def add_arguments(self, parser):
+        parser.add_argument("--reset", action="store_true", help="Reset the counters after showing them")
+
+    def handle(self, *args, **options):
+        for namespace, stats in get_cache_stats().items():
+            hit_rate = "-" if stats["hit_rate"] is None else f"{stats['hit_rate']:.1%}"
+            self.stdout.write(
+                f"{namespace:<10} hits={stats['hits']:<8} misses={stats['misses']:<8} hit rate={hit_rate}"
+            )
+
+        if options["reset"]:
+            reset_cache_stats()
+            self.stdout.write(self.style.SUCCESS("Counters reset"))
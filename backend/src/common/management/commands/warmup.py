@@ -0,0 +1,41 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from src.common.warmup import get_warmup_steps, run_warmups
+
+
+class Command(BaseCommand):
+    help = """
+    Run the warm-up steps (serializers, database connection, shared catalog snapshot, recipe matrix,
+    catalog cache) and report how long each took. Gunicorn runs them through its preload/post_fork hooks,
+    this runs them by hand, e.g. to time them or to check a deployment.
+    """
+
+    def add_arguments(self, parser):
+        parser.add_argument("--step", action="append", dest="steps", help="Only run this step, can be repeated")
+        parser.add_argument("--list", action="store_true", help="List the registered steps without running them")
+
+    def handle(self, *args, **options):
+        try:
+            steps = get_warmup_steps(options["steps"])
+        except ValueError as exc:
+            raise CommandError(exc)
+
+        if options["list"]:
+            for name, step in steps.items():
+                self.stdout.write(f"{name} ({'per worker' if step['per_worker'] else 'master'})")
+            return
+
+        results = run_warmups(options["steps"])
+        for result in results:
+            line = f"{result['name']:<16} {result['duration'] * 1000:>9.1f} ms"
+            if result["error"]:
+                self.stdout.write(self.style.ERROR(f"{line}  failed: {result['error']}"))
+            else:
+                self.stdout.write(f"{line}  {result['detail'] or ''}".rstrip())
+
+        total = sum(result["duration"] for result in results)
+        self.stdout.write(f"{'total':<16} {total * 1000:>9.1f} ms")
+
+        failed = [result["name"] for result in results if result["error"]]
+        if failed:
+            raise CommandError(f"Warm-up steps failed: {', '.join(failed)}")
@@ -32,3 +32,14 @@ class RandomModel(BaseModel):
 
     class Meta:
         constraints = [models.CheckConstraint(name="start_date_before_end_date", check=Q(start_date__lt=F("end_date")))]
+
+
+class CacheNamespaceVersion(models.Model):
+    """
+    Invalidation counter of a cache namespace, polled by the workers
+    when the database has no LISTEN/NOTIFY (see src.common.invalidation)
+    """
+
+    namespace = models.CharField(max_length=50, primary_key=True)
+    version = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
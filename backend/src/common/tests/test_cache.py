@@ -0,0 +1,106 @@
+import threading
+import time
+
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase
+
+from src.common.cache import (
+    cache_get_or_compute,
+    cache_invalidate,
+    get_cache_stats,
+    invalidate_namespaces,
+)
+from src.table.models import Table, TableArea
+from src.table.selectors import get_tables_by_area, get_tables_list
+from src.table.services import change_table_status
+
+
+class CacheGetOrComputeTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        self.calls = 0
+
+    def compute(self, value="fresh", delay=0):
+        def inner():
+            self.calls += 1
+            time.sleep(delay)
+            return value
+
+        return inner
+
+    def test_concurrent_callers_share_a_single_computation(self):
+        results = []
+        threads = [
+            threading.Thread(
+                target=lambda: results.append(cache_get_or_compute("stats", self.compute(delay=0.2), ttl=30))
+            )
+            for _ in range(20)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(self.calls, 1)
+        self.assertEqual(results, ["fresh"] * 20)
+
+    def test_invalidation_serves_stale_while_one_caller_recomputes(self):
+        cache_get_or_compute("stats", self.compute("old"), ttl=30)
+        cache_invalidate("stats")
+
+        cache.add("stats:lock", True)  # another caller is recomputing
+        self.assertEqual(cache_get_or_compute("stats", self.compute("new"), ttl=30), "old")
+        cache.delete("stats:lock")
+
+        self.assertEqual(cache_get_or_compute("stats", self.compute("new"), ttl=30), "new")
+        self.assertEqual(cache_get_or_compute("stats", self.compute("newer"), ttl=30), "new")
+        self.assertEqual(self.calls, 2)
+
+    def test_value_invalidated_during_computation_is_stored_stale(self):
+        def compute():
+            cache_invalidate("stats")
+            return "racy"
+
+        self.assertEqual(cache_get_or_compute("stats", compute, ttl=30), "racy")
+        self.assertEqual(cache_get_or_compute("stats", self.compute("fresh"), ttl=30), "fresh")
+
+
+class NamespacedCacheGetOrComputeTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_namespace_invalidation_makes_the_value_stale(self):
+        cache_get_or_compute("stats", lambda: "old", ttl=30, namespace="orders")
+        self.assertEqual(cache_get_or_compute("stats", lambda: "new", ttl=30, namespace="orders"), "old")
+
+        invalidate_namespaces("orders")
+
+        self.assertEqual(cache_get_or_compute("stats", lambda: "new", ttl=30, namespace="orders"), "new")
+
+
+class CachedSelectorTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+        self.area = TableArea.objects.create(name="Pool")
+        self.table = Table.objects.create(number="1", area=self.area, capacity=4)
+
+    def test_results_are_cached_per_arguments_until_the_namespace_changes(self):
+        self.assertEqual([table.status for table in get_tables_list()], ["available"])
+
+        with self.assertNumQueries(0):
+            self.assertEqual([table.area.name for table in get_tables_list()], ["Pool"])
+
+        self.assertEqual(len(get_tables_by_area(self.area.id)), 1)
+        self.assertEqual(len(get_tables_by_area(self.area.id + 1)), 0)
+
+        # Saved through the ORM, invalidated by the registered signals
+        self.table.capacity = 6
+        self.table.save()
+        self.assertEqual([table.capacity for table in get_tables_list()], [6])
+
+        # update() sends no signals, the service invalidates the namespace itself
+        change_table_status(self.table.id, "occupied")
+        self.assertEqual([table.status for table in get_tables_list()], ["occupied"])
+
+        self.assertEqual(get_cache_stats()["tables"], {"hits": 1, "misses": 5, "hit_rate": 1 / 6})
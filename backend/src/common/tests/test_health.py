@@ -0,0 +1,28 @@
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from src.users.models import User
+
+
+class HealthViewTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.url = reverse("api:common:health")
+
+    def test_reports_the_database_round_trip(self):
+        result = self.client.get(self.url)
+
+        self.assertEqual(result.status_code, 200)
+        self.assertEqual(result.json()["status"], "ok")
+        self.assertGreaterEqual(result.json()["database_ms"], 0)
+        self.assertNotIn("pools", result.json())
+
+    def test_staff_see_the_connection_pool_stats(self):
+        staff = User.objects.create_superuser(username="admin", email="admin@hacksoft.io", password="123456")
+        self.client.force_authenticate(staff)
+
+        result = self.client.get(self.url)
+
+        # SQLite has no pool, Postgres with DB_POOL_ENABLED lists {"default": {"pool_size": ...}}
+        self.assertEqual(result.json()["pools"], {})
@@ -0,0 +1,41 @@
+import time
+
+from django.core.cache import cache
+from django.test import TransactionTestCase, override_settings
+
+from src.common.cache import get_namespace_version, invalidate_namespaces
+from src.common.invalidation import (
+    start_invalidation_listener,
+    stop_invalidation_listener,
+)
+from src.common.models import CacheNamespaceVersion
+
+
+@override_settings(CACHE_INVALIDATION_BUS="poll", CACHE_INVALIDATION_POLL_INTERVAL=0.01)
+class PollingInvalidationBusTests(TransactionTestCase):
+    def setUp(self):
+        cache.clear()
+
+    def wait_for_new_version(self, namespace, version, timeout=5):
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if get_namespace_version(namespace) != version:
+                return True
+            time.sleep(0.01)
+        return False
+
+    def test_committed_changes_reach_the_listener(self):
+        invalidate_namespaces("tables")
+        self.assertEqual(CacheNamespaceVersion.objects.get(namespace="tables").version, 1)
+
+        start_invalidation_listener()
+        self.addCleanup(stop_invalidation_listener)
+        time.sleep(0.2)
+
+        # Another worker's change only shows up in the shared version table
+        version = get_namespace_version("tables")
+        menu_version = get_namespace_version("menu")
+        CacheNamespaceVersion.objects.filter(namespace="tables").update(version=2)
+
+        self.assertTrue(self.wait_for_new_version("tables", version))
+        self.assertEqual(get_namespace_version("menu"), menu_version)
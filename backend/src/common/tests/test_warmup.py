@@ -0,0 +1,40 @@
+from django.core.cache import cache
+from django.test import TestCase
+
+from src.common import warmup
+from src.common.cache import get_cache_stats
+from src.common.warmup import register_warmup, run_warmups
+
+
+class WarmupTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_registered_steps_warm_the_worker_caches(self):
+        results = run_warmups()
+
+        self.assertEqual(
+            [result["name"] for result in results],
+            ["serializers", "db_connection", "shared_catalog", "recipe_matrix", "catalog_cache"],
+        )
+        self.assertEqual([result["error"] for result in results], [None] * len(results))
+        self.assertTrue(all(result["duration"] >= 0 for result in results))
+
+        # The first requests find the catalog selectors cached
+        self.assertEqual(get_cache_stats()["menu"]["misses"], 2)
+        self.assertEqual(get_cache_stats()["services"]["misses"], 2)
+
+    def test_a_failing_step_does_not_stop_the_others(self):
+        self.addCleanup(warmup._warmup_steps.pop, "broken", None)
+
+        @register_warmup("broken", per_worker=True)
+        def broken():
+            raise RuntimeError("unreachable")
+
+        results = run_warmups(per_worker=True)
+
+        self.assertEqual(
+            [result["name"] for result in results], ["db_connection", "recipe_matrix", "catalog_cache", "broken"]
+        )
+        self.assertEqual(results[-1]["error"], "RuntimeError('unreachable')")
+        self.assertEqual([result["error"] for result in results[:-1]], [None] * 3)
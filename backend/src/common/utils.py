@@ -1,5 +1,8 @@
+import re
+
 from django.conf import settings
 from django.core.exceptions import ImproperlyConfigured
+from django.db import transaction
 from django.http import Http404
 from django.shortcuts import get_object_or_404
 
@@ -46,3 +49,51 @@ def assert_settings(required_settings, error_message_prefix=""):
         raise ImproperlyConfigured(f"{error_message_prefix} Could not find: {stringified_not_present}")
 
     return values
+
+
+ARABIC_DIACRITICS = re.compile("[\u0610-\u061a\u064b-\u065f\u0670\u06d6-\u06ed\u0640]")  # tashkeel and tatweel
+ARABIC_LETTER_VARIANTS = str.maketrans(
+    {
+        "أ": "ا",
+        "إ": "ا",
+        "آ": "ا",
+        "ٱ": "ا",
+        "ى": "ي",
+        "ئ": "ي",
+        "ؤ": "و",
+        "ة": "ه",
+        **{chr(0x0660 + digit): str(digit) for digit in range(10)},  # Arabic-Indic digits
+        **{chr(0x06F0 + digit): str(digit) for digit in range(10)},  # Eastern Arabic-Indic digits
+    }
+)
+
+
+def normalize_search_text(*values):
+    """
+    Fold free text for searching: Arabic diacritics and tatweel removed, alef / yeh / teh marbuta variants
+    unified, Arabic digits made ASCII, lowercased and whitespace collapsed. Empty values are skipped.
+    """
+    text = " ".join(str(value) for value in values if value)
+    text = ARABIC_DIACRITICS.sub("", text).translate(ARABIC_LETTER_VARIANTS).lower()
+    return " ".join(text.split())
+
+
+def on_commit_once(key, func):
+    """
+    Robust transaction.on_commit(func) unless a callback with the same key is already queued
+    in the current transaction, returns whether it was queued.
+    Callbacks of a rolled back savepoint are dropped by Django, so their keys can be queued again.
+    """
+    connection = transaction.get_connection()
+    for _savepoints, queued, _robust in connection.run_on_commit:
+        if getattr(queued, "on_commit_key", None) == key and not queued.done:
+            return False
+
+    def callback():
+        callback.done = True
+        func()
+
+    callback.on_commit_key = key
+    callback.done = False
+    transaction.on_commit(callback, robust=True)
+    return True
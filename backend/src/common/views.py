@@ -0,0 +1,25 @@
+from django.db import DatabaseError
+from rest_framework import response, serializers, status, views
+
+from src.common.database import check_database, get_connection_pool_stats
+
+
+class HealthView(views.APIView):
+    class OutputSerializer(serializers.Serializer):
+        status = serializers.CharField()
+        database_ms = serializers.FloatField(required=False)
+        # Staff only, the pool statistics of the worker that served the request
+        pools = serializers.DictField(child=serializers.DictField(), required=False)
+
+    def get(self, request):
+        try:
+            data = {"status": "ok", "database_ms": round(check_database(), 2)}
+        except DatabaseError:
+            serializer = self.OutputSerializer({"status": "unavailable"})
+            return response.Response(serializer.data, status=status.HTTP_503_SERVICE_UNAVAILABLE)
+
+        if request.user.is_staff:
+            data["pools"] = get_connection_pool_stats()
+
+        serializer = self.OutputSerializer(data)
+        return response.Response(serializer.data, status=status.HTTP_200_OK)
@@ -0,0 +1,59 @@
+import logging
+import time
+from typing import Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Name -> {"function", "per_worker"}, in registration (app) order
+_warmup_steps: Dict[str, Dict] = {}
+
+
+def register_warmup(name: str, *, per_worker: bool = False):
+    """
+    Register the decorated function as a warm-up step, it may return a short detail string for the report.
+    Per-worker steps fill process-local state (connections, in-memory caches) and run after the fork,
+    the others run once in the gunicorn master before it forks.
+    """
+
+    def decorator(function: Callable):
+        _warmup_steps[name] = {"function": function, "per_worker": per_worker}
+        return function
+
+    return decorator
+
+
+def get_warmup_steps(names: Optional[List[str]] = None, per_worker: Optional[bool] = None) -> Dict[str, Dict]:
+    unknown = set(names or []) - set(_warmup_steps)
+    if unknown:
+        raise ValueError(f"Unknown warm-up steps: {', '.join(sorted(unknown))}")
+
+    return {
+        name: step
+        for name, step in _warmup_steps.items()
+        if (not names or name in names) and (per_worker is None or step["per_worker"] == per_worker)
+    }
+
+
+def run_warmups(names: Optional[List[str]] = None, per_worker: Optional[bool] = None) -> List[Dict]:
+    """
+    Run the warm-up steps and time each of them. A failing step is logged and reported,
+    it never stops the others or the worker from serving.
+    """
+    results = []
+    for name, step in get_warmup_steps(names, per_worker).items():
+        started = time.perf_counter()
+        result = {"name": name, "detail": None, "error": None}
+        try:
+            result["detail"] = step["function"]()
+        except Exception as exc:
+            result["error"] = repr(exc)
+        result["duration"] = time.perf_counter() - started
+
+        if result["error"]:
+            logger.error("Warm-up %s failed after %.1f ms: %s", name, result["duration"] * 1000, result["error"])
+        else:
+            detail = f" ({result['detail']})" if result["detail"] else ""
+            logger.info("Warm-up %s took %.1f ms%s", name, result["duration"] * 1000, detail)
+        results.append(result)
+
+    return results
@@ -0,0 +1,53 @@
+from django.db import connection
+from django.urls import URLResolver, get_resolver
+from rest_framework.settings import api_settings
+
+from src.common.warmup import register_warmup
+
+WARMUP_SERIALIZER_NAMES = ("InputSerializer", "FilterSerializer", "OutputSerializer")
+
+
+def get_api_views(patterns):
+    """Every DRF view class routed by the url patterns"""
+    views = set()
+    for pattern in patterns:
+        if isinstance(pattern, URLResolver):
+            views |= get_api_views(pattern.url_patterns)
+        elif getattr(pattern.callback, "cls", None) is not None:
+            views.add(pattern.callback.cls)
+    return views
+
+
+@register_warmup("serializers")
+def compile_serializers():
+    """Import every API view through the URLconf and bind the fields of their nested serializers"""
+    # DRF imports its configured classes on first access
+    api_settings.DEFAULT_AUTHENTICATION_CLASSES
+    api_settings.DEFAULT_PARSER_CLASSES
+    api_settings.DEFAULT_RENDERER_CLASSES
+
+    compiled = 0
+    for view in get_api_views(get_resolver().url_patterns):
+        for name in WARMUP_SERIALIZER_NAMES:
+            serializer_class = getattr(view, name, None)
+            if serializer_class is not None:
+                serializer_class().fields
+                compiled += 1
+
+    return f"{compiled} serializers"
+
+
+@register_warmup("db_connection", per_worker=True)
+def check_db_connection():
+    """
+    Fail early on an unreachable database. With a pool this opens it, so its min_size connections
+    are ready before traffic, and the connection goes back to it.
+    """
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT 1")
+    finally:
+        if not connection.in_atomic_block:
+            connection.close()
+
+    return connection.vendor
@@ -1,12 +1,56 @@
+from django import forms
 from django.contrib import admin
-from src.inventory.models import Ingredient, RecipeIngredient
+from django.utils.translation import gettext_lazy as _
+from src.inventory.models import Ingredient, RecipeIngredient, StockMovement
+from src.inventory.services import correct_stock_level
+
+# Moved by the stock ledger compaction only
+STOCK_SNAPSHOT_FIELDS = ("quantity_in_stock", "stock_snapshot_at")
+
+
+class IngredientAdminForm(forms.ModelForm):
+    counted_stock = forms.FloatField(
+        label=_("الكمية المعدودة"),
+        required=False,
+        min_value=0,
+        help_text=_("تسجل الفرق عن المخزون الحالي كحركة تسوية"),
+    )
+
+    class Meta:
+        model = Ingredient
+        fields = "__all__"
 
 
 @admin.register(Ingredient)
 class IngredientAdmin(admin.ModelAdmin):
-    list_display = ("name", "quantity_in_stock", "reorder_level", "is_low")
+    form = IngredientAdminForm
+    list_display = ("name", "quantity_in_stock", "get_stock_level", "reorder_level", "is_low")
     search_fields = ("name",)
-    readonly_fields = ("create_at", "updated_at")
+    readonly_fields = ("create_at", "updated_at", *STOCK_SNAPSHOT_FIELDS)
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).with_stock_level()
+
+    def save_model(self, request, obj, form, change):
+        if change:
+            # Never write back the snapshot loaded with the form, a compaction may have moved it since
+            obj.save(
+                update_fields=[
+                    field.name
+                    for field in obj._meta.concrete_fields
+                    if not field.primary_key and field.name not in STOCK_SNAPSHOT_FIELDS
+                ]
+            )
+        else:
+            super().save_model(request, obj, form, change)
+
+        counted_stock = form.cleaned_data.get("counted_stock")
+        if counted_stock is not None:
+            correct_stock_level(ingredient=obj, counted=counted_stock, notes=f"جرد يدوي ({request.user})")
+
+    @admin.display(description="Stock level")
+    def get_stock_level(self, obj):
+        return obj.get_stock_level()
 
     def has_add_permission(self, request, obj=None):
         if request.user.is_anonymous:
@@ -86,3 +130,41 @@ class RecipeIngredientAdmin(admin.ModelAdmin):
         if request.user.is_superuser or request.user.role != "owner" or request.user.role != "manger":
             return True
         return False
+
+
+@admin.register(StockMovement)
+class StockMovementAdmin(admin.ModelAdmin):
+    list_display = ("id", "ingredient", "kind", "quantity", "order", "reconciled", "created_at")
+    list_filter = ("kind", "reconciled", "ingredient")
+    search_fields = ("ingredient__name", "notes")
+    readonly_fields = ("reconciled", "created_at")
+    list_select_related = ("ingredient",)
+
+    def has_add_permission(self, request, obj=None):
+        if request.user.is_anonymous:
+            return False
+        if request.user.is_superuser or request.user.role != "owner" or request.user.role != "manger":
+            return True
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        # The stock ledger is append-only
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        # The stock ledger is append-only
+        return False
+
+    def has_module_permission(self, request, obj=None):
+        if request.user.is_anonymous:
+            return False
+        if request.user.is_superuser or request.user.role != "owner" or request.user.role != "manger":
+            return True
+        return False
+
+    def has_view_permission(self, request, obj=None) -> bool:
+        if request.user.is_anonymous:
+            return False
+        if request.user.is_superuser or request.user.role != "owner" or request.user.role != "manger":
+            return True
+        return False
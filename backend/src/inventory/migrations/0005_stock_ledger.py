@@ -0,0 +1,38 @@
+# Generated by Django 5.1.2 on 2026-10-18 01:49
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0004_alter_ingredient_create_at_alter_ingredient_name_and_more'),
+        ('order', '0006_order_line_price_snapshots'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='ingredient',
+            name='stock_snapshot_at',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='تاريخ آخر جرد'),
+        ),
+        migrations.CreateModel(
+            name='StockMovement',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('sale', 'بيع'), ('cancel', 'إلغاء'), ('restock', 'إعادة تخزين'), ('waste', 'هالك'), ('adjustment', 'تسوية')], max_length=12, verbose_name='النوع')),
+                ('quantity', models.FloatField(help_text='موجبة للإضافة وسالبة للخصم', verbose_name='الكمية')),
+                ('notes', models.CharField(blank=True, max_length=255, verbose_name='ملاحظات')),
+                ('reconciled', models.BooleanField(default=False, verbose_name='تمت التسوية')),
+                ('created_at', models.DateTimeField(auto_now_add=True, db_index=True, verbose_name='تاريخ الانشاء')),
+                ('ingredient', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='movements', to='inventory.ingredient', verbose_name='المكون')),
+                ('order', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='stock_movements', to='order.order', verbose_name='الطلب')),
+            ],
+            options={
+                'verbose_name': 'حركة المخزون',
+                'verbose_name_plural': 'حركات المخزون',
+                'indexes': [models.Index(condition=models.Q(('reconciled', False)), fields=['ingredient'], name='stock_movement_unreconciled')],
+            },
+        ),
+    ]
@@ -2,6 +2,8 @@ from django.db import models
 from django.utils.translation import gettext_lazy as _
 from src.menu.models import MenuItemVariation, MenuItem
 from django.core.exceptions import ValidationError
+from django.db.models import ExpressionWrapper, F, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
 
 UNITS = (
     ("Liter", "لتر"),
@@ -14,24 +16,65 @@ UNITS = (
 )
 
 
+STOCK_MOVEMENT_KINDS = (
+    ("sale", "بيع"),
+    ("cancel", "إلغاء"),
+    ("restock", "إعادة تخزين"),
+    ("waste", "هالك"),
+    ("adjustment", "تسوية"),
+)
+
+
+class IngredientQuerySet(models.QuerySet):
+    """
+    ingredient queryset to read the current stock:
+    the materialized snapshot plus the unreconciled ledger tail
+    """
+
+    def with_stock_level(self):
+        tail = (
+            StockMovement.objects.filter(ingredient=OuterRef("pk"), reconciled=False)
+            .values("ingredient")
+            .annotate(total=Sum("quantity"))
+            .values("total")
+        )
+        return self.annotate(
+            stock_level=ExpressionWrapper(
+                F("quantity_in_stock") + Coalesce(Subquery(tail), Value(0.0)), output_field=models.FloatField()
+            )
+        )
+
+
 class Ingredient(models.Model):
     name = models.CharField(_("اسم"), max_length=150, unique=True)
     unit = models.CharField(_("الوحدة"), choices=UNITS, max_length=12)
+    # Stock snapshot as of `stock_snapshot_at`, newer movements live in the ledger until compacted
     quantity_in_stock = models.FloatField(_("الكمية المتوفرة في المخزون"), default=0)
+    stock_snapshot_at = models.DateTimeField(_("تاريخ آخر جرد"), null=True, blank=True)
     reorder_level = models.FloatField(_("مستوى إعادة الطلب"), default=0)
     create_at = models.DateTimeField(_("تم إنشاؤه في"), auto_now_add=True)
     updated_at = models.DateTimeField(_("تم التحديث في"), auto_now=True)
 
+    objects = IngredientQuerySet.as_manager()
+
     class Meta:
         verbose_name = _("المكون")
         verbose_name_plural = _("المكونات")
 
+    def get_stock_level(self):
+        """Current stock, the snapshot plus the unreconciled ledger tail"""
+        stock_level = getattr(self, "stock_level", None)
+        if stock_level is None:
+            tail = self.movements.filter(reconciled=False).aggregate(total=Sum("quantity"))["total"] or 0
+            stock_level = self.quantity_in_stock + tail
+        return stock_level
+
     def is_low(self):
-        return self.quantity_in_stock <= self.reorder_level
+        return self.get_stock_level() <= self.reorder_level
 
     def is_out_of_stock(self):
         """Check if completely out of stock"""
-        return self.quantity_in_stock <= 0
+        return self.get_stock_level() <= 0
 
     def clean(self):
         if self.quantity_in_stock < 0:
@@ -98,3 +141,39 @@ class RecipeIngredient(models.Model):
         if self.variation:
             return f"{self.variation} needs {self.quantity_required} {self.ingredient.unit} of {self.ingredient.name}"
         return f"{self.menu_item} needs {self.quantity_required} {self.ingredient.unit} of {self.ingredient.name}"
+
+
+class StockMovement(models.Model):
+    """
+    Append-only stock ledger, every stock change is an insert here.
+    Unreconciled movements are folded into `Ingredient.quantity_in_stock` by a periodic compaction.
+    """
+
+    ingredient = models.ForeignKey(
+        Ingredient, on_delete=models.CASCADE, related_name="movements", verbose_name=_("المكون")
+    )
+    kind = models.CharField(_("النوع"), max_length=12, choices=STOCK_MOVEMENT_KINDS)
+    quantity = models.FloatField(_("الكمية"), help_text=_("موجبة للإضافة وسالبة للخصم"))
+    order = models.ForeignKey(
+        "order.Order",
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="stock_movements",
+        verbose_name=_("الطلب"),
+    )
+    notes = models.CharField(_("ملاحظات"), max_length=255, blank=True)
+    reconciled = models.BooleanField(_("تمت التسوية"), default=False)
+    created_at = models.DateTimeField(_("تاريخ الانشاء"), auto_now_add=True, db_index=True)
+
+    class Meta:
+        verbose_name = _("حركة المخزون")
+        verbose_name_plural = _("حركات المخزون")
+        indexes = [
+            models.Index(
+                fields=["ingredient"], condition=models.Q(reconciled=False), name="stock_movement_unreconciled"
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.get_kind_display()} {self.quantity} {self.ingredient.name}"
@@ -0,0 +1,32 @@
+from django.db import connection
+from django.db.models import Sum
+
+from src.inventory.models import Ingredient
+
+
+def get_stock_levels(ingredient_ids, lock=False):
+    """
+    Current stock for the given ingredients, returns {ingredient_id: {"id", "name", "stock_level"}}.
+    With `lock` the ingredient rows are first locked in ascending id order by a statement of their own
+    and the stock is read by a second one: under READ COMMITTED that read starts once the locks are held,
+    so it sees the ledger rows and compactions committed by whoever held them before.
+    On Postgres the lock is FOR NO KEY UPDATE: it still serializes reservations of the same ingredients,
+    but not the KEY SHARE lock that the foreign key check of a ledger insert takes, so releases,
+    restocks and waste are appended without waiting for a reservation to commit.
+    """
+    if lock:
+        list(
+            Ingredient.objects.select_for_update(no_key=connection.features.has_select_for_no_key_update)
+            .filter(id__in=ingredient_ids)
+            .order_by("id")
+            .values_list("id", flat=True)
+        )
+
+    queryset = Ingredient.objects.filter(id__in=ingredient_ids).with_stock_level().order_by("id")
+    return {ingredient["id"]: ingredient for ingredient in queryset.values("id", "name", "stock_level")}
+
+
+def get_stock_level_at(ingredient: Ingredient, at):
+    """Stock of an ingredient at a point in time, the current level minus the movements since then"""
+    since = ingredient.movements.filter(created_at__gt=at).aggregate(total=Sum("quantity"))["total"] or 0
+    return ingredient.get_stock_level() - since
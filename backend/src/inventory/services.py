@@ -0,0 +1,83 @@
+from typing import Dict, Optional
+
+from django.db import connection, transaction
+from django.db.models import Case, F, FloatField, Value, When
+from django.utils import timezone
+
+from src.inventory.models import Ingredient, StockMovement
+from src.inventory.selectors import get_stock_levels
+
+
+def get_stock_delta_expression(deltas: Dict[int, float]):
+    """CASE id WHEN ... THEN quantity END expression for a {ingredient_id: quantity} vector"""
+    return Case(
+        *[When(id=ingredient_id, then=Value(float(quantity))) for ingredient_id, quantity in deltas.items()],
+        output_field=FloatField(),
+    )
+
+
+def record_stock_movements(deltas: Dict[int, float], kind: str, order=None, notes: str = "") -> list:
+    """
+    Append one ledger row per ingredient of a signed {ingredient_id: quantity} vector,
+    no ingredient row is touched
+    """
+    return StockMovement.objects.bulk_create(
+        [
+            StockMovement(ingredient_id=ingredient_id, kind=kind, quantity=quantity, order=order, notes=notes)
+            for ingredient_id, quantity in sorted(deltas.items())
+            if quantity
+        ]
+    )
+
+
+def record_stock_movement(
+    *, ingredient: Ingredient, kind: str, quantity: float, notes: str = "", order=None
+) -> Optional[StockMovement]:
+    """Record a single restock, waste or adjustment movement"""
+    movements = record_stock_movements({ingredient.id: quantity}, kind=kind, order=order, notes=notes)
+    return movements[0] if movements else None
+
+
+@transaction.atomic
+def correct_stock_level(*, ingredient: Ingredient, counted: float, notes: str = "") -> Optional[StockMovement]:
+    """
+    Bring an ingredient to a counted stock level with an adjustment movement for the difference,
+    the snapshot itself is only ever moved by the compaction
+    """
+    stock_level = get_stock_levels([ingredient.id], lock=True)[ingredient.id]["stock_level"]
+    return record_stock_movement(ingredient=ingredient, kind="adjustment", quantity=counted - stock_level, notes=notes)
+
+
+@transaction.atomic
+def compact_stock_ledger(batch_size: int = 10000) -> int:
+    """
+    Fold the unreconciled ledger tail into the ingredient snapshots.
+    The ingredient rows are locked in ascending id order like stock reservations,
+    the snapshot moves by the summed tail in one UPDATE and the folded movements
+    are marked reconciled by id, so rows committed meanwhile are left for the next run.
+    Returns the number of compacted movements.
+    """
+    movements = list(
+        StockMovement.objects.filter(reconciled=False)
+        .order_by("id")
+        .values_list("id", "ingredient_id", "quantity")[:batch_size]
+    )
+    if not movements:
+        return 0
+
+    deltas = {}
+    for _, ingredient_id, quantity in movements:
+        deltas[ingredient_id] = deltas.get(ingredient_id, 0) + quantity
+
+    list(
+        Ingredient.objects.select_for_update(no_key=connection.features.has_select_for_no_key_update)
+        .filter(id__in=deltas)
+        .order_by("id")
+        .values_list("id", flat=True)
+    )
+    Ingredient.objects.filter(id__in=deltas).update(
+        quantity_in_stock=F("quantity_in_stock") + get_stock_delta_expression(deltas),
+        stock_snapshot_at=timezone.now(),
+    )
+
+    return StockMovement.objects.filter(id__in=[movement_id for movement_id, _, _ in movements]).update(reconciled=True)
@@ -0,0 +1,9 @@
+from celery import shared_task
+
+from src.inventory.services import compact_stock_ledger
+
+
+@shared_task
+def compact_stock_ledger_task():
+    """Fold the unreconciled stock movements into the ingredient snapshots"""
+    return compact_stock_ledger()
@@ -0,0 +1,56 @@
+from datetime import timedelta
+
+from django.test import TestCase
+from django.utils import timezone
+
+from src.inventory.models import Ingredient, StockMovement
+from src.inventory.selectors import get_stock_level_at
+from src.inventory.services import (
+    compact_stock_ledger,
+    correct_stock_level,
+    record_stock_movement,
+    record_stock_movements,
+)
+
+
+class StockLedgerTests(TestCase):
+    def setUp(self):
+        self.sugar = Ingredient.objects.create(name="Sugar", unit="Gram", quantity_in_stock=500)
+        self.oil = Ingredient.objects.create(name="Oil", unit="Liter", quantity_in_stock=20)
+
+    def test_stock_level_is_snapshot_plus_unreconciled_tail(self):
+        record_stock_movements({self.sugar.id: -50, self.oil.id: -2}, kind="sale")
+        record_stock_movement(ingredient=self.sugar, kind="restock", quantity=100)
+
+        self.sugar.refresh_from_db()
+        self.assertEqual(self.sugar.quantity_in_stock, 500)
+        self.assertEqual(self.sugar.get_stock_level(), 550)
+        self.assertEqual(Ingredient.objects.with_stock_level().get(id=self.oil.id).stock_level, 18)
+
+    def test_compaction_folds_the_tail_into_the_snapshot(self):
+        before = timezone.now() - timedelta(seconds=1)
+        record_stock_movements({self.sugar.id: -50, self.oil.id: -2}, kind="sale")
+        record_stock_movement(ingredient=self.sugar, kind="waste", quantity=-10)
+
+        self.assertEqual(compact_stock_ledger(), 3)
+        self.assertEqual(compact_stock_ledger(), 0)
+
+        self.sugar.refresh_from_db()
+        self.assertEqual(self.sugar.quantity_in_stock, 440)
+        self.assertEqual(self.sugar.get_stock_level(), 440)
+        self.assertIsNotNone(self.sugar.stock_snapshot_at)
+        self.assertFalse(StockMovement.objects.filter(reconciled=False).exists())
+
+        # History survives the compaction
+        self.assertEqual(get_stock_level_at(self.sugar, before), 500)
+
+    def test_stock_correction_is_an_adjustment_movement(self):
+        record_stock_movements({self.sugar.id: -50}, kind="sale")
+
+        movement = correct_stock_level(ingredient=self.sugar, counted=430)
+
+        self.assertEqual(movement.kind, "adjustment")
+        self.assertEqual(movement.quantity, -20)
+        self.sugar.refresh_from_db()
+        self.assertEqual(self.sugar.quantity_in_stock, 500)
+        self.assertEqual(self.sugar.get_stock_level(), 430)
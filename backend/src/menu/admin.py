@@ -1,7 +1,6 @@
 from django.contrib import admin
 from src.menu.models import Category, MenuItem, Variation, MenuItemVariation, ProductGallery
 from src.inventory.models import RecipeIngredient
-from src.menu.services import calculate_max_available
 
 
 @admin.register(Category)
@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class MenuConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "src.menu"
+
+    def ready(self) -> None:
+        from . import signals, warmups
@@ -0,0 +1,41 @@
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse, HttpResponseNotModified
+from django.utils.http import parse_etags
+from rest_framework.renderers import JSONRenderer
+
+from src.common.cache import namespaced_key, record_cache_lookup
+
+
+def get_catalog_response(request, name, render):
+    """
+    JSON response for a catalog endpoint, `render()` returning the serialized data.
+    The rendered body is cached per version of the "menu" cache namespace and served with a strong ETag
+    hashed from the body and the host, so every worker tags the same catalog alike across cache versions,
+    and a client revalidating an unchanged catalog gets a 304 from a single cache read without touching the database.
+    When `render()` raises (an unknown slug), nothing is cached.
+    """
+    # Image URLs are absolute, so the body depends on the host it was requested on
+    host = request.get_host()
+    key = namespaced_key("menu", "response", host, name)
+    cached = cache.get(key)
+    record_cache_lookup("menu", hit=cached is not None)
+    if cached is None:
+        body = JSONRenderer().render(render())
+        digest = hashlib.sha256(host.encode() + b"\n" + body).hexdigest()
+        etag = f'"{digest[:32]}"'
+        cached = (etag, body)
+        cache.set(key, cached, timeout=settings.CATALOG_CACHE_TTL)
+
+    etag, body = cached
+    if etag in parse_etags(request.headers.get("If-None-Match", "")):
+        not_modified = HttpResponseNotModified()
+        not_modified["ETag"] = etag
+        return not_modified
+
+    catalog_response = HttpResponse(body, content_type="application/json")
+    catalog_response["ETag"] = etag
+    catalog_response["Cache-Control"] = "no-cache"
+    return catalog_response
@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+
+from src.menu.snapshots import publish_catalog_snapshots
+
+
+class Command(BaseCommand):
+    help = """
+    Render the menu and services catalogs to static JSON files (with gzip twins)
+    under CATALOG_SNAPSHOT_ROOT, for nginx to serve without going through Django.
+    """
+
+    def add_arguments(self, parser):
+        parser.add_argument("--root", help="Directory to publish to, defaults to CATALOG_SNAPSHOT_ROOT")
+
+    def handle(self, *args, **options):
+        manifest = publish_catalog_snapshots(root=options["root"])
+        if manifest is None:
+            self.stdout.write(self.style.WARNING("CATALOG_SNAPSHOT_ROOT is not set, nothing published"))
+            return
+
+        for name, filename in manifest.items():
+            if name != "published_at":
+                self.stdout.write(f"{name}: {filename}")
+        self.stdout.write(self.style.SUCCESS("Catalog snapshots published"))
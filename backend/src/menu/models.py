@@ -52,10 +52,9 @@ class MenuItem(models.Model):
 
     def is_available(self):
         """Check if this item is currently available"""
-        from src.menu.services import calculate_max_available
+        from src.menu.services import get_menu_item_max_available
 
-        ingredients = self.recipe_ingredients.all()
-        return calculate_max_available(ingredients) > 0
+        return get_menu_item_max_available(self.id) > 0
 
 
 class Variation(models.Model):
@@ -103,11 +102,10 @@ class MenuItemVariation(models.Model):
         return self.value
 
     def is_available(self):
-        from src.menu.services import calculate_max_available
-
         """Check if this item is currently available"""
-        ingredients = self.recipe_ingredients.all()
-        return calculate_max_available(ingredients) > 0
+        from src.menu.services import get_variation_max_available
+
+        return get_variation_max_available(self.id) > 0
 
 
 class ProductGallery(models.Model):
@@ -0,0 +1,112 @@
+import threading
+import time
+from array import array
+from collections import defaultdict
+
+from django.conf import settings
+
+from src.common.cache import get_namespace_version, record_cache_lookup
+from src.inventory.models import RecipeIngredient
+
+EMPTY_RECIPE = (array("q"), array("d"))
+
+
+class RecipeIndex:
+    """
+    Every recipe compiled into menu item / variation id -> (ingredient ids, quantities) arrays,
+    built with a single query so availability and usage math needs no recipe queries.
+    """
+
+    def __init__(self, items, variations, version=None):
+        self.items = items
+        self.variations = variations
+        self.version = version
+        self.built_at = time.monotonic()
+
+    def is_current(self, version):
+        return self.version == version and time.monotonic() - self.built_at < settings.RECIPE_INDEX_TTL
+
+    @classmethod
+    def build(cls, version=None):
+        items = defaultdict(lambda: (array("q"), array("d")))
+        variations = defaultdict(lambda: (array("q"), array("d")))
+
+        rows = RecipeIngredient.objects.values_list(
+            "menu_item_id", "variation_id", "ingredient_id", "quantity_required"
+        )
+        for menu_item_id, variation_id, ingredient_id, quantity_required in rows.order_by("id"):
+            if menu_item_id:
+                ingredient_ids, quantities = items[menu_item_id]
+            elif variation_id:
+                ingredient_ids, quantities = variations[variation_id]
+            else:
+                continue
+            ingredient_ids.append(ingredient_id)
+            quantities.append(quantity_required)
+
+        return cls(dict(items), dict(variations), version)
+
+    def get_item_recipe(self, menu_item_id):
+        return self.items.get(menu_item_id, EMPTY_RECIPE)
+
+    def get_variation_recipe(self, variation_id):
+        return self.variations.get(variation_id, EMPTY_RECIPE)
+
+    def get_requirements(self, lines):
+        """
+        Sum the ingredients needed by a list of (menu_item_id, variation_ids, quantity) lines
+        into one {ingredient_id: required} mapping
+        """
+        requirements = defaultdict(float)
+        for menu_item_id, variation_ids, quantity in lines:
+            recipes = [self.get_item_recipe(menu_item_id)]
+            recipes.extend(self.get_variation_recipe(variation_id) for variation_id in variation_ids or [])
+
+            for ingredient_ids, quantities in recipes:
+                for ingredient_id, quantity_required in zip(ingredient_ids, quantities):
+                    requirements[ingredient_id] += quantity_required * quantity
+
+        return dict(requirements)
+
+
+_recipe_index = None
+_recipe_index_lock = threading.Lock()
+
+
+def get_recipe_index():
+    """
+    Return the recipes, from the host's shared catalog snapshot when there is one (see src.menu.shared_catalog),
+    else from the process-wide recipe index, built on first use.
+    The index is rebuilt when the "recipes" cache namespace moves to a new version (recipe, item or variation
+    writes, in any worker sharing the cache) and at the latest after RECIPE_INDEX_TTL seconds.
+    """
+    from src.menu.shared_catalog import get_shared_catalog
+
+    global _recipe_index
+
+    shared_catalog = get_shared_catalog()
+    if shared_catalog is not None:
+        return shared_catalog
+
+    # Read before building, a change made during the build leaves the index outdated rather than stale
+    version = get_namespace_version("recipes")
+    index = _recipe_index
+    if index is not None and index.is_current(version):
+        record_cache_lookup("recipes", hit=True)
+        return index
+
+    with _recipe_index_lock:
+        index = _recipe_index
+        if index is None or not index.is_current(version):
+            index = RecipeIndex.build(version)
+            _recipe_index = index
+    record_cache_lookup("recipes", hit=False)
+
+    return index
+
+
+def invalidate_recipe_index():
+    global _recipe_index
+
+    with _recipe_index_lock:
+        _recipe_index = None
@@ -1,22 +1,30 @@
 from src.menu.models import MenuItem, Category, ProductGallery, MenuItemVariation, Variation
+from src.menu.recipes import get_recipe_index
+from src.menu.shared_catalog import get_shared_catalog
+from src.inventory.models import Ingredient
+from src.common.cache import cached_selector
 from src.common.utils import get_object
 from django.db.models import Prefetch
 
 
+@cached_selector("menu")
 def get_categories_list():
     return Category.objects.all().prefetch_related(
         Prefetch("product_category", queryset=MenuItem.objects.filter(visible=True))
     )
 
 
+@cached_selector("menu")
 def get_category_by_slug(slug):
     return get_object(Category.objects.prefetch_related("product_category"), slug=slug)
 
 
+@cached_selector("menu")
 def get_menu_items_list():
     return MenuItem.objects.prefetch_related("product_gallery").all()
 
 
+@cached_selector("menu")
 def get_menu_item_by_slug(slug):
     return get_object(
         MenuItem.objects.prefetch_related(
@@ -26,3 +34,44 @@ def get_menu_item_by_slug(slug):
         ),
         slug=slug,
     )
+
+
+def get_makeable_count(requirements, stock_levels):
+    """
+    How many times a {ingredient_id: required} vector fits into the {ingredient_id: stock_level} vector,
+    None when nothing limits it (no recipe)
+    """
+    counts = [
+        max(int(stock_levels.get(ingredient_id, 0) // required), 0)
+        for ingredient_id, required in requirements.items()
+        if required > 0
+    ]
+    return min(counts) if counts else None
+
+
+def get_menu_availability():
+    """
+    Max-makeable counts for every menu item and variation in one pass,
+    one stock query against the compiled recipe index instead of a query per item.
+    A variation's count is for the item ordered with that variation.
+    """
+    index = get_recipe_index()
+    stock_levels = dict(Ingredient.objects.with_stock_level().values_list("id", "stock_level"))
+
+    shared_catalog = get_shared_catalog()
+    if shared_catalog is not None:
+        menu_item_ids, variation_items = shared_catalog.item_ids, shared_catalog.get_variation_items()
+    else:
+        menu_item_ids = MenuItem.objects.values_list("id", flat=True)
+        variation_items = MenuItemVariation.objects.values_list("id", "variation__item_id")
+
+    items = {
+        menu_item_id: get_makeable_count(index.get_requirements([(menu_item_id, [], 1)]), stock_levels)
+        for menu_item_id in menu_item_ids
+    }
+    variations = {
+        variation_id: get_makeable_count(index.get_requirements([(menu_item_id, [variation_id], 1)]), stock_levels)
+        for variation_id, menu_item_id in variation_items
+    }
+
+    return {"items": items, "variations": variations}
@@ -1,4 +1,8 @@
 from src.menu.models import MenuItem, MenuItemVariation, Variation
+from src.menu.recipes import get_recipe_index
+from src.inventory.models import Ingredient
+from src.inventory.selectors import get_stock_levels
+from src.inventory.services import record_stock_movements
 from src.api.exception_handlers import ApplicationError
 
 
@@ -16,21 +20,34 @@ def get_variation_ingredients(vaariation):
     return vaariation.recipe_ingredients.all()
 
 
-def calculate_max_available(ingredients):
-    """Calculate how many of this item can be made based on ingredients"""
+def calculate_max_available(recipe):
+    """
+    Calculate how many of this item can be made based on ingredients,
+    `recipe` is an (ingredient ids, quantities) pair from the recipe index
+    """
+    ingredient_ids, quantities = recipe
 
-    if not ingredients.exists():
+    if not ingredient_ids:
         return float("inf")  # No ingredients defined, assume unlimited
 
-    max_available = []
-    for recipe_ingredient in ingredients:
-        ingredient = recipe_ingredient.ingredient
-        required = recipe_ingredient.quantity_required
-        if required <= 0:
-            continue
-        max_available.append(ingredient.quantity_in_stock // required)
+    stock_levels = get_stock_levels(ingredient_ids)
+
+    max_available = [
+        stock_levels[ingredient_id]["stock_level"] // required
+        for ingredient_id, required in zip(ingredient_ids, quantities)
+        if required > 0
+    ]
+
+    # Only zero quantities (garnish, optional extras), nothing limits the item
+    return min(max_available) if max_available else float("inf")
+
 
-    return min(max_available) if max_available else 0
+def get_menu_item_max_available(menu_item_id):
+    return calculate_max_available(get_recipe_index().get_item_recipe(menu_item_id))
+
+
+def get_variation_max_available(variation_id):
+    return calculate_max_available(get_recipe_index().get_variation_recipe(variation_id))
 
 
 def check_ingredient_availability(menu_item, variations=None, quantity=1):
@@ -38,164 +55,104 @@ def check_ingredient_availability(menu_item, variations=None, quantity=1):
     Check if there are enough ingredients for a menu item with variations
     Returns (is_available, missing_ingredients)
     """
-    missing_ingredients = []
+    requirements = get_ingredient_requirements([(menu_item.id, [var.id for var in variations or []], quantity)])
+    missing_ingredients = get_missing_ingredients(requirements)
+
+    return len(missing_ingredients) == 0, missing_ingredients
 
-    # Check base menu item ingredients
-    item_ingredients = get_menu_item_ingredients(menu_item)
-    for recipe_ingredient in item_ingredients:
-        ingredient = recipe_ingredient.ingredient
-        required = recipe_ingredient.quantity_required * quantity
 
-        if ingredient.quantity_in_stock < required:
+def get_missing_ingredients(requirements, lock=False):
+    """
+    Compare a {ingredient_id: required} vector with the current stock levels (one query)
+    and return the shortages
+    """
+    if not requirements:
+        return []
+
+    missing_ingredients = []
+    for ingredient_id, ingredient in get_stock_levels(requirements.keys(), lock=lock).items():
+        required = requirements[ingredient_id]
+        if ingredient["stock_level"] < required:
             missing_ingredients.append(
                 {
-                    "ingredient": ingredient.name,
+                    "ingredient": ingredient["name"],
                     "required": required,
-                    "available": ingredient.quantity_in_stock,
-                    "shortage": required - ingredient.quantity_in_stock,
+                    "available": ingredient["stock_level"],
+                    "shortage": required - ingredient["stock_level"],
                 }
             )
 
-    # Check variation ingredients
-    if variations:
-        for variation in variations:
-            variation_ingredients = get_variation_ingredients(variation)
-            for recipe_ingredient in variation_ingredients:
-                ingredient = recipe_ingredient.ingredient
-                required = recipe_ingredient.quantity_required * quantity
-
-                if ingredient.quantity_in_stock < required:
-                    missing_ingredients.append(
-                        {
-                            "ingredient": ingredient.name,
-                            "required": required,
-                            "available": ingredient.quantity_in_stock,
-                            "shortage": required - ingredient.quantity_in_stock,
-                        }
-                    )
-
-    return len(missing_ingredients) == 0, missing_ingredients
+    return missing_ingredients
 
 
-def decrease_ingredient_stock(menu_item, variations=None, quantity=1):
+def decrease_ingredient_stock(menu_item, variations=None, quantity=1, order=None):
     """
     Decrease ingredient stock when this item is sold
     This should be called within a database transaction
     """
-    ingredients_updated = []
-
-    try:
-        # Decrease base menu item ingredients
-        item_ingredients = get_menu_item_ingredients(menu_item)
-        for recipe_ingredient in item_ingredients:
-            ingredient = recipe_ingredient.ingredient
-            required = recipe_ingredient.quantity_required * quantity
-
-            if required > ingredient.quantity_in_stock:
-                raise ApplicationError(
-                    message=f"Not enough stock for {ingredient.name}. Required: {required}, Available: {ingredient.quantity_in_stock}"
-                )
+    requirements = get_ingredient_requirements([(menu_item.id, [var.id for var in variations or []], quantity)])
+    return reserve_ingredients(requirements, order=order)
 
-            ingredient.quantity_in_stock -= required
-            ingredient.save()
-            ingredients_updated.append(ingredient)
 
-            # Check if stock is low and notify
-            if ingredient.is_low():
-                # You can implement notification logic here
-                # For example, send email, create notification record, etc.
-                print(f"WARNING: Low stock for {ingredient.name}. Current stock: {ingredient.quantity_in_stock}")
-
-        # Decrease variation ingredients
-        if variations:
-            for variation in variations:
-                variation_ingredients = get_variation_ingredients(variation)
-                for recipe_ingredient in variation_ingredients:
-                    ingredient = recipe_ingredient.ingredient
-                    required = recipe_ingredient.quantity_required * quantity
-
-                    if required > ingredient.quantity_in_stock:
-                        raise ApplicationError(
-                            message=f"Not enough stock for {ingredient.name} (variation: {variation.value}). Required: {required}, Available: {ingredient.quantity_in_stock}"
-                        )
-
-                    ingredient.quantity_in_stock -= required
-                    ingredient.save()
-                    ingredients_updated.append(ingredient)
-
-                    # Check if stock is low
-                    if ingredient.is_low():
-                        print(
-                            f"WARNING: Low stock for {ingredient.name}. Current stock: {ingredient.quantity_in_stock}"
-                        )
+def increase_ingredient_stock(menu_item, variations=None, quantity=1, order=None):
+    """
+    Increase ingredient stock when an order is cancelled or returned
+    This should be called within a database transaction
+    """
+    requirements = get_ingredient_requirements([(menu_item.id, [var.id for var in variations or []], quantity)])
+    return release_ingredients(requirements, order=order)
 
-        return ingredients_updated
 
-    except Exception as e:
-        # If there's an error, the transaction will be rolled back
-        # so ingredient quantities will be restored automatically
-        raise e
+def get_ingredient_requirements(lines):
+    """
+    Sum the ingredients needed by a list of (menu_item_id, variation_ids, quantity) lines
+    into one {ingredient_id: required} mapping, read from the compiled recipe index (no queries).
+    """
+    return get_recipe_index().get_requirements(lines)
 
 
-def increase_ingredient_stock(menu_item, variations=None, quantity=1):
+def reserve_ingredients(requirements, order=None, kind="sale"):
     """
-    Increase ingredient stock when an order is cancelled or returned
+    Reserve a whole {ingredient_id: required} vector for an order.
+    The ingredient rows are locked in ascending id order before the stock is read, so concurrent
+    orders always lock shared ingredients in the same order and cannot deadlock, every shortage
+    against the current stock is reported at once, and the reservation is appended to the stock
+    ledger with one insert. The rows are not rewritten but stay locked until the transaction commits,
+    reservations of the same ingredients still run one after the other: an unlocked insert could not
+    see the uncommitted reservations of other orders and both would pass the stock check.
+    Releases and restocks do not wait for that lock.
+    Returns the created stock movements.
     This should be called within a database transaction
     """
-    ingredients_updated = []
-
-    # Increase base menu item ingredients
-    item_ingredients = get_menu_item_ingredients(menu_item)
-    for recipe_ingredient in item_ingredients:
-        ingredient = recipe_ingredient.ingredient
-        required = recipe_ingredient.quantity_required * quantity
+    missing_ingredients = get_missing_ingredients(requirements, lock=True)
 
-        ingredient.quantity_in_stock += required
-        ingredient.save()
-        ingredients_updated.append(ingredient)
+    if missing_ingredients:
+        missing_items = ", ".join(
+            [f"{ing['ingredient']} (تحتاج {ing['required']}, يملك {ing['available']})" for ing in missing_ingredients]
+        )
+        raise ApplicationError(message=f"مكونات غير كافية: {missing_items}", extra={"missing": missing_ingredients})
 
-    # Increase variation ingredients
-    if variations:
-        for variation in variations:
-            variation_ingredients = get_variation_ingredients(variation)
-            for recipe_ingredient in variation_ingredients:
-                ingredient = recipe_ingredient.ingredient
-                required = recipe_ingredient.quantity_required * quantity
+    deltas = {ingredient_id: -required for ingredient_id, required in requirements.items()}
+    return record_stock_movements(deltas, kind=kind, order=order)
 
-                ingredient.quantity_in_stock += required
-                ingredient.save()
-                ingredients_updated.append(ingredient)
 
-    return ingredients_updated
+def release_ingredients(requirements, order=None, kind="cancel"):
+    """
+    Return a whole {ingredient_id: quantity} vector to stock (cancellations, lower quantities)
+    by appending it to the stock ledger, adding stock needs no row lock and does not wait
+    for reservations holding the ingredient rows.
+    Returns the created stock movements.
+    """
+    return record_stock_movements(requirements, kind=kind, order=order)
 
 
 def get_ingredient_usage_for_order_item(order_item):
     """
     Calculate ingredient usage for a specific order item
     """
-    usage = {}
-
-    # Base item ingredients
-    item_ingredients = get_menu_item_ingredients(order_item.item)
-    for recipe_ingredient in item_ingredients:
-        ingredient = recipe_ingredient.ingredient
-        total_needed = recipe_ingredient.quantity_required * order_item.quantity
-
-        if ingredient in usage:
-            usage[ingredient] += total_needed
-        else:
-            usage[ingredient] = total_needed
-
-    # Variation ingredients
-    for variation in order_item.item_variations.all():
-        variation_ingredients = get_variation_ingredients(variation)
-        for recipe_ingredient in variation_ingredients:
-            ingredient = recipe_ingredient.ingredient
-            total_needed = recipe_ingredient.quantity_required * order_item.quantity
-
-            if ingredient in usage:
-                usage[ingredient] += total_needed
-            else:
-                usage[ingredient] = total_needed
+    requirements = get_ingredient_requirements(
+        [(order_item.item_id, [var.id for var in order_item.item_variations.all()], order_item.quantity)]
+    )
+    ingredients = Ingredient.objects.in_bulk(requirements.keys())
 
-    return usage
+    return {ingredients[ingredient_id]: required for ingredient_id, required in requirements.items()}
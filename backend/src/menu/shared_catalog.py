@@ -0,0 +1,335 @@
+import hashlib
+import json
+import mmap
+import os
+import struct
+import tempfile
+import threading
+import time
+from array import array
+from bisect import bisect_left
+from decimal import Decimal
+
+from django.conf import settings
+from django.db import connection, transaction
+
+from src.common.cache import get_namespace_version
+from src.menu.recipes import EMPTY_RECIPE, RecipeIndex
+
+SHARED_CATALOG_MAGIC = b"CATALOG1"
+# Magic, then the length of the JSON header that locates the sections
+SHARED_CATALOG_PREAMBLE = struct.Struct("<8sQ")
+
+
+def _to_cents(price):
+    return int(price * 100) if price is not None else -1
+
+
+def _from_cents(cents):
+    return Decimal(cents).scaleb(-2) if cents >= 0 else None
+
+
+def build_shared_catalog_sections():
+    """
+    The catalog packed into typed arrays: sorted ids with their prices (in cents, -1 for none)
+    and recipe offsets into one shared pool of ingredient ids and quantities
+    """
+    from src.menu.models import MenuItem, MenuItemVariation
+    from src.service.models import Service
+
+    recipes = RecipeIndex.build()
+    recipe_ingredient_ids = array("q")
+    recipe_quantities = array("d")
+
+    def add_recipe(recipe, offsets):
+        ingredient_ids, quantities = recipe
+        recipe_ingredient_ids.extend(ingredient_ids)
+        recipe_quantities.extend(quantities)
+        offsets.append(len(recipe_ingredient_ids))
+
+    item_ids, item_prices, item_discount_prices, item_recipe_offsets = (
+        array("q"),
+        array("q"),
+        array("q"),
+        array("q", [0]),
+    )
+    for item_id, price, discount_price in MenuItem.objects.values_list("id", "price", "discount_price").order_by("id"):
+        item_ids.append(item_id)
+        item_prices.append(_to_cents(price))
+        item_discount_prices.append(_to_cents(discount_price))
+        add_recipe(recipes.get_item_recipe(item_id), item_recipe_offsets)
+
+    variation_ids, variation_item_ids, variation_extra_prices = array("q"), array("q"), array("q")
+    variation_recipe_offsets = array("q", [len(recipe_ingredient_ids)])
+    variations = MenuItemVariation.objects.values_list("id", "variation__item_id", "extra_price").order_by("id")
+    for variation_id, item_id, extra_price in variations:
+        variation_ids.append(variation_id)
+        variation_item_ids.append(item_id)
+        variation_extra_prices.append(_to_cents(extra_price or 0))
+        add_recipe(recipes.get_variation_recipe(variation_id), variation_recipe_offsets)
+
+    service_ids, service_prices = array("q"), array("q")
+    for service_id, price in Service.objects.values_list("id", "price").order_by("id"):
+        service_ids.append(service_id)
+        service_prices.append(_to_cents(price))
+
+    return {
+        "item_ids": item_ids,
+        "item_prices": item_prices,
+        "item_discount_prices": item_discount_prices,
+        "item_recipe_offsets": item_recipe_offsets,
+        "variation_ids": variation_ids,
+        "variation_item_ids": variation_item_ids,
+        "variation_extra_prices": variation_extra_prices,
+        "variation_recipe_offsets": variation_recipe_offsets,
+        "service_ids": service_ids,
+        "service_prices": service_prices,
+        "recipe_ingredient_ids": recipe_ingredient_ids,
+        "recipe_quantities": recipe_quantities,
+    }
+
+
+def get_database_identity():
+    """Fingerprint of the default database, a snapshot built from another one is never mapped"""
+    database = settings.DATABASES["default"]
+    identity = (connection.vendor, str(database["NAME"]), database.get("HOST", ""), str(database.get("PORT", "")))
+    return hashlib.sha256(repr(identity).encode()).hexdigest()[:16]
+
+
+def get_sections_digest(sections):
+    """Version of the catalog packed in the sections, equal digests mean the same prices and recipes"""
+    digest = hashlib.sha256()
+    for name, values in sections.items():
+        digest.update(name.encode())
+        digest.update(values.tobytes())
+    return digest.hexdigest()[:16]
+
+
+def write_shared_catalog(path=None, sections=None):
+    """
+    Build the catalog snapshot file and atomically replace `path` (CATALOG_SHARED_SNAPSHOT_PATH) with it,
+    processes that mapped the previous file keep it until they remap
+    """
+    path = path or settings.CATALOG_SHARED_SNAPSHOT_PATH
+    sections = sections or build_shared_catalog_sections()
+
+    layout = {}
+    offset = 0
+    for name, values in sections.items():
+        layout[name] = [offset, len(values), values.typecode]
+        offset += len(values) * values.itemsize
+    header = json.dumps(
+        {
+            "built_at": time.time(),
+            "database": get_database_identity(),
+            "digest": get_sections_digest(sections),
+            "sections": layout,
+        }
+    ).encode()
+    # Sections start 8-byte aligned, every item is 8 bytes wide
+    header += b" " * (-(SHARED_CATALOG_PREAMBLE.size + len(header)) % 8)
+
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".tmp-catalog-")
+    try:
+        with os.fdopen(fd, "wb") as snapshot_file:
+            snapshot_file.write(SHARED_CATALOG_PREAMBLE.pack(SHARED_CATALOG_MAGIC, len(header)))
+            snapshot_file.write(header)
+            for values in sections.values():
+                values.tofile(snapshot_file)
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+    return path
+
+
+class SharedCatalog:
+    """
+    Read-only view over a memory-mapped catalog snapshot. Every process mapping the same file shares
+    one copy of it in the page cache, lookups slice typed memoryviews and copy nothing.
+    Recipes are looked up like in the RecipeIndex, which it stands in for.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as snapshot_file:
+            self.inode = os.fstat(snapshot_file.fileno()).st_ino
+            self.buffer = mmap.mmap(snapshot_file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, header_length = SHARED_CATALOG_PREAMBLE.unpack_from(self.buffer)
+        if magic != SHARED_CATALOG_MAGIC:
+            raise ValueError(f"{path} is not a catalog snapshot")
+
+        start = SHARED_CATALOG_PREAMBLE.size + header_length
+        header = json.loads(self.buffer[SHARED_CATALOG_PREAMBLE.size : start])
+        self.built_at = header["built_at"]
+        self.database = header.get("database")
+        self.digest = header.get("digest")
+        # "recipes" cache namespace version this process last checked the file against, see is_current
+        self.version = None
+        self.verified_at = 0.0
+
+        view = memoryview(self.buffer)
+        for name, (offset, length, typecode) in header["sections"].items():
+            section_start = start + offset
+            setattr(self, name, view[section_start : section_start + length * 8].cast(typecode))
+
+    def is_current(self, version):
+        """Checked against the database since the last recipe change this process heard of, within RECIPE_INDEX_TTL"""
+        return self.version == version and time.monotonic() - self.verified_at < settings.RECIPE_INDEX_TTL
+
+    def mark_verified(self, version):
+        self.version = version
+        self.verified_at = time.monotonic()
+
+    @staticmethod
+    def _position(ids, object_id):
+        position = bisect_left(ids, object_id)
+        if position < len(ids) and ids[position] == object_id:
+            return position
+        return None
+
+    def _recipe(self, ids, offsets, object_id):
+        position = self._position(ids, object_id)
+        if position is None:
+            return EMPTY_RECIPE
+        start, end = offsets[position], offsets[position + 1]
+        return self.recipe_ingredient_ids[start:end], self.recipe_quantities[start:end]
+
+    def get_item_recipe(self, menu_item_id):
+        return self._recipe(self.item_ids, self.item_recipe_offsets, menu_item_id)
+
+    def get_variation_recipe(self, variation_id):
+        return self._recipe(self.variation_ids, self.variation_recipe_offsets, variation_id)
+
+    get_requirements = RecipeIndex.get_requirements
+
+    def get_item_prices(self, menu_item_id):
+        """(price, discount_price) of a menu item, None when it is not in the snapshot"""
+        position = self._position(self.item_ids, menu_item_id)
+        if position is None:
+            return None
+        return _from_cents(self.item_prices[position]), _from_cents(self.item_discount_prices[position])
+
+    def get_variation_extra_price(self, variation_id):
+        position = self._position(self.variation_ids, variation_id)
+        return _from_cents(self.variation_extra_prices[position]) if position is not None else None
+
+    def get_service_price(self, service_id):
+        position = self._position(self.service_ids, service_id)
+        return _from_cents(self.service_prices[position]) if position is not None else None
+
+    def get_unit_price(self, menu_item_id, variation_ids=()):
+        """Price of one item with its variations, discount applied like OrderItem.get_unit_price"""
+        prices = self.get_item_prices(menu_item_id)
+        if prices is None:
+            return None
+
+        price, discount_price = prices
+        base_price = discount_price if discount_price and discount_price > 0 else price
+        return base_price + sum(
+            (self.get_variation_extra_price(variation_id) or 0 for variation_id in variation_ids), 0
+        )
+
+    def get_variation_items(self):
+        """(variation id, menu item id) pairs of every variation"""
+        return zip(self.variation_ids, self.variation_item_ids)
+
+
+_shared_catalog = None
+_shared_catalog_checked_at = 0.0
+_shared_catalog_lock = threading.Lock()
+
+
+def _map_shared_catalog(path, verify):
+    """
+    Map the snapshot at `path`, rebuilding it when it is missing, was built from another database or,
+    with `verify`, no longer matches the catalog in the database
+    """
+    sections = None
+    try:
+        shared_catalog = SharedCatalog(path)
+    except (FileNotFoundError, ValueError):
+        shared_catalog = None
+
+    if shared_catalog is not None and shared_catalog.database != get_database_identity():
+        shared_catalog = None
+    if shared_catalog is not None and verify:
+        sections = build_shared_catalog_sections()
+        if shared_catalog.digest != get_sections_digest(sections):
+            shared_catalog = None
+
+    if shared_catalog is None:
+        write_shared_catalog(path, sections)
+        shared_catalog = SharedCatalog(path)
+    return shared_catalog
+
+
+def get_shared_catalog():
+    """
+    The mapped catalog snapshot of this host, or None when CATALOG_SHARED_SNAPSHOT_PATH is not set.
+    The file is built by the gunicorn master and rebuilt by whichever process commits a catalog change,
+    the others notice the replaced file within CATALOG_SHARED_SNAPSHOT_CHECK_INTERVAL seconds and remap it.
+    A process checks the file against the database before it first trusts it, it may be left over
+    from another database, checkout or run, and again when the "recipes" cache namespace moves to a new
+    version (changes committed by processes without the snapshot reach it through the invalidation bus)
+    and at the latest after RECIPE_INDEX_TTL seconds, like the RecipeIndex it stands in for.
+    """
+    global _shared_catalog, _shared_catalog_checked_at
+
+    path = settings.CATALOG_SHARED_SNAPSHOT_PATH
+    if not path:
+        return None
+
+    # Read before checking, a change made during the check leaves the snapshot outdated rather than stale
+    version = get_namespace_version("recipes")
+    shared_catalog = _shared_catalog
+    if (
+        shared_catalog is not None
+        and shared_catalog.path == path
+        and shared_catalog.is_current(version)
+        and time.monotonic() - _shared_catalog_checked_at < settings.CATALOG_SHARED_SNAPSHOT_CHECK_INTERVAL
+    ):
+        return shared_catalog
+
+    with _shared_catalog_lock:
+        # Not closed, requests may still hold views into it, it is unmapped once they are gone
+        if (
+            _shared_catalog is None
+            or _shared_catalog.path != path
+            or not _shared_catalog.is_current(version)
+            or not os.path.exists(path)
+        ):
+            _shared_catalog = _map_shared_catalog(path, verify=True)
+            _shared_catalog.mark_verified(version)
+        elif os.stat(path).st_ino != _shared_catalog.inode:
+            # Replaced by a process that committed a catalog change, built from the database just now
+            _shared_catalog = _map_shared_catalog(path, verify=False)
+            _shared_catalog.mark_verified(version)
+        _shared_catalog_checked_at = time.monotonic()
+
+    return _shared_catalog
+
+
+def refresh_shared_catalog():
+    """Rebuild the snapshot file and map it in this process right away"""
+    global _shared_catalog, _shared_catalog_checked_at
+
+    path = settings.CATALOG_SHARED_SNAPSHOT_PATH
+    if not path:
+        return
+
+    version = get_namespace_version("recipes")
+    with _shared_catalog_lock:
+        write_shared_catalog(path)
+        _shared_catalog = SharedCatalog(path)
+        _shared_catalog.mark_verified(version)
+        _shared_catalog_checked_at = time.monotonic()
+
+
+def schedule_shared_catalog_refresh():
+    """Rebuild the shared catalog snapshot once the current transaction commits"""
+    if settings.CATALOG_SHARED_SNAPSHOT_PATH:
+        transaction.on_commit(refresh_shared_catalog, robust=True)
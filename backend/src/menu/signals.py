@@ -0,0 +1,38 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from src.common.cache import register_cache_invalidation
+from src.inventory.models import RecipeIngredient
+from src.menu.models import (
+    Category,
+    MenuItem,
+    MenuItemVariation,
+    ProductGallery,
+    Variation,
+)
+from src.menu.shared_catalog import schedule_shared_catalog_refresh
+from src.menu.snapshots import schedule_catalog_snapshots
+
+register_cache_invalidation("menu", Category, MenuItem, Variation, MenuItemVariation, ProductGallery)
+register_cache_invalidation("recipes", RecipeIngredient, MenuItem, MenuItemVariation)
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+@receiver(post_save, sender=MenuItem)
+@receiver(post_delete, sender=MenuItem)
+@receiver(post_save, sender=Variation)
+@receiver(post_delete, sender=Variation)
+@receiver(post_save, sender=MenuItemVariation)
+@receiver(post_delete, sender=MenuItemVariation)
+@receiver(post_save, sender=ProductGallery)
+@receiver(post_delete, sender=ProductGallery)
+def catalog_changed(sender, **kwargs):
+    schedule_catalog_snapshots()
+    schedule_shared_catalog_refresh()
+
+
+@receiver(post_save, sender=RecipeIngredient)
+@receiver(post_delete, sender=RecipeIngredient)
+def recipe_changed(sender, **kwargs):
+    schedule_shared_catalog_refresh()
@@ -0,0 +1,125 @@
+import gzip
+import hashlib
+import json
+import logging
+import os
+import tempfile
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+
+logger = logging.getLogger(__name__)
+
+CATALOG_SNAPSHOT_KEEP = 3
+
+
+def get_catalog_snapshots():
+    """
+    Snapshot name -> serialized data, the same shape the matching list endpoints return.
+    There is no request, so image URLs are relative to the site (/media/...).
+    Read uncached: the Celery worker's cache never receives the invalidations of the web workers.
+    """
+    from src.menu.selectors import get_categories_list
+    from src.menu.views import CategoryListView
+    from src.service.selectors import get_service_categories_list
+    from src.service.views import ServiceCategoryListView
+
+    return {
+        "menu": CategoryListView.OutputSerializer(get_categories_list.uncached(), many=True).data,
+        "services": ServiceCategoryListView.OutputSerializer(get_service_categories_list.uncached(), many=True).data,
+    }
+
+
+def _write_atomic(path, content):
+    """Write through a temporary file and rename it, so nginx never serves a half written file"""
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".tmp-")
+    try:
+        with os.fdopen(fd, "wb") as tmp_file:
+            tmp_file.write(content)
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def _write_snapshot(root, name, body):
+    # mtime=0 keeps the compressed bytes identical for identical content
+    compressed = gzip.compress(body, compresslevel=9, mtime=0)
+    version = hashlib.sha256(body).hexdigest()[:16]
+    versioned_name = f"{name}.{version}.json"
+
+    for filename in (versioned_name, f"{name}.json"):
+        _write_atomic(os.path.join(root, filename), body)
+        _write_atomic(os.path.join(root, f"{filename}.gz"), compressed)
+
+    return versioned_name
+
+
+def _prune_snapshots(root, name, current):
+    """Keep the few newest versions of a snapshot, clients may still hold the manifest that names them"""
+    prefix = f"{name}."
+    versions = [
+        entry
+        for entry in os.scandir(root)
+        if entry.name.startswith(prefix)
+        and entry.name.endswith(".json")
+        and entry.name not in (current, f"{name}.json")
+    ]
+    versions.sort(key=lambda entry: entry.stat().st_mtime, reverse=True)
+
+    for entry in versions[CATALOG_SNAPSHOT_KEEP - 1 :]:
+        for path in (entry.path, f"{entry.path}.gz"):
+            if os.path.exists(path):
+                os.unlink(path)
+
+
+def publish_catalog_snapshots(root=None):
+    """
+    Render the menu and services catalogs into CATALOG_SNAPSHOT_ROOT for nginx to serve.
+
+    Every snapshot is written as `<name>.json` (always the latest) and `<name>.<hash>.json`
+    (immutable), each with a gzip twin for `gzip_static`; `manifest.json` names the current versions.
+    Returns the manifest, or None when publishing is disabled.
+    """
+    root = root or settings.CATALOG_SNAPSHOT_ROOT
+    if not root:
+        return None
+
+    os.makedirs(root, exist_ok=True)
+
+    manifest = {"published_at": timezone.now().isoformat()}
+    renderer = JSONRenderer()
+    for name, data in get_catalog_snapshots().items():
+        body = renderer.render(data)
+        manifest[name] = _write_snapshot(root, name, body)
+        _prune_snapshots(root, name, manifest[name])
+
+    # Written last, so it never names a version that is not on disk yet
+    body = json.dumps(manifest).encode()
+    _write_atomic(os.path.join(root, "manifest.json"), body)
+    _write_atomic(os.path.join(root, "manifest.json.gz"), gzip.compress(body, mtime=0))
+
+    return manifest
+
+
+def enqueue_catalog_snapshots():
+    """Queue the republishing, publish inline when the broker cannot be reached"""
+    from src.menu.tasks import publish_catalog_snapshots_task
+
+    try:
+        publish_catalog_snapshots_task.delay()
+    except Exception:
+        logger.exception("Could not queue the catalog snapshots, publishing inline")
+        publish_catalog_snapshots()
+
+
+def schedule_catalog_snapshots():
+    """
+    Republish the catalog snapshots in the background once the current transaction commits,
+    as a robust callback: the catalog change is committed by then and must not fail on publishing
+    """
+    if settings.CATALOG_SNAPSHOT_ROOT:
+        transaction.on_commit(enqueue_catalog_snapshots, robust=True)
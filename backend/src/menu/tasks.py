@@ -0,0 +1,9 @@
+from celery import shared_task
+
+from src.menu.snapshots import publish_catalog_snapshots
+
+
+@shared_task
+def publish_catalog_snapshots_task():
+    """Render the menu and services catalogs to the static snapshot files"""
+    return publish_catalog_snapshots()
@@ -0,0 +1,59 @@
+from decimal import Decimal
+
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from src.inventory.models import Ingredient, RecipeIngredient
+from src.inventory.services import record_stock_movement
+from src.menu.models import Category, MenuItem, MenuItemVariation, Variation
+from src.menu.recipes import get_recipe_index, invalidate_recipe_index
+from src.menu.selectors import get_menu_availability
+
+
+class MenuAvailabilityTests(TestCase):
+    def setUp(self):
+        invalidate_recipe_index()
+
+        self.category = Category.objects.create(name="Food", slug="food", image="category.webp")
+        self.bread = Ingredient.objects.create(name="Bread", unit="Piece", quantity_in_stock=10)
+        self.cheese = Ingredient.objects.create(name="Cheese", unit="Gram", quantity_in_stock=100)
+
+        self.sandwich = self.create_item("sandwich")
+        RecipeIngredient.objects.create(menu_item=self.sandwich, ingredient=self.bread, quantity_required=2)
+        variation = Variation.objects.create(item=self.sandwich, name="Extra")
+        self.extra_cheese = MenuItemVariation.objects.create(variation=variation, value="Cheese")
+        RecipeIngredient.objects.create(variation=self.extra_cheese, ingredient=self.cheese, quantity_required=30)
+
+        self.water = self.create_item("water")
+
+    def create_item(self, slug):
+        return MenuItem.objects.create(
+            category=self.category, name=slug, slug=slug, price=Decimal("10.00"), product_image=f"{slug}.webp"
+        )
+
+    def test_counts_every_item_and_variation_in_constant_queries(self):
+        record_stock_movement(ingredient=self.bread, kind="sale", quantity=-3)
+        get_recipe_index()
+
+        with self.assertNumQueries(3):
+            availability = get_menu_availability()
+
+        self.assertEqual(availability["items"], {self.sandwich.id: 3, self.water.id: None})
+        self.assertEqual(availability["variations"], {self.extra_cheese.id: 3})
+
+        record_stock_movement(ingredient=self.cheese, kind="waste", quantity=-50)
+        self.assertEqual(get_menu_availability()["variations"], {self.extra_cheese.id: 1})
+
+    def test_category_list_includes_available_count_on_request(self):
+        client = APIClient()
+        url = reverse("api:menu:categories")
+
+        products = client.get(url).json()[0]["product_category"]
+        self.assertNotIn("available_count", products[0])
+
+        products = client.get(url, {"with_availability": "true"}).json()[0]["product_category"]
+        self.assertEqual(
+            {product["id"]: product["available_count"] for product in products},
+            {self.sandwich.id: 5, self.water.id: None},
+        )
@@ -0,0 +1,66 @@
+import gzip
+import json
+import os
+import tempfile
+from decimal import Decimal
+from unittest.mock import patch
+
+from django.test import TestCase, override_settings
+
+from src.menu.models import Category, MenuItem
+from src.menu.snapshots import publish_catalog_snapshots
+from src.service.models import Service, ServiceCategory
+
+
+class PublishCatalogSnapshotsTests(TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.root = self.tmp_dir.name
+        self.addCleanup(self.tmp_dir.cleanup)
+
+        category = Category.objects.create(name="Food", slug="food", image="category.webp")
+        self.burger = MenuItem.objects.create(
+            category=category, name="Burger", slug="burger", price=Decimal("50.00"), product_image="burger.webp"
+        )
+        service_category = ServiceCategory.objects.create(name="Kids", slug="kids")
+        Service.objects.create(category=service_category, name="Play", slug="play", price=Decimal("20.00"))
+
+    def read(self, filename):
+        with open(os.path.join(self.root, filename), "rb") as snapshot:
+            return snapshot.read()
+
+    def test_publishes_versioned_and_compressed_snapshots(self):
+        manifest = publish_catalog_snapshots(root=self.root)
+
+        menu = json.loads(self.read("menu.json"))
+        self.assertEqual(menu[0]["product_category"][0]["name"], "Burger")
+        self.assertEqual(menu[0]["product_category"][0]["product_image"], "/media/burger.webp")
+        self.assertEqual(json.loads(self.read("services.json"))[0]["services"][0]["name"], "Play")
+
+        self.assertEqual(self.read(manifest["menu"]), self.read("menu.json"))
+        self.assertEqual(gzip.decompress(self.read("menu.json.gz")), self.read("menu.json"))
+        self.assertEqual(json.loads(self.read("manifest.json"))["menu"], manifest["menu"])
+
+    def test_catalog_changes_are_published_on_commit(self):
+        with override_settings(CATALOG_SNAPSHOT_ROOT=self.root):
+            old_manifest = publish_catalog_snapshots()
+
+            with self.captureOnCommitCallbacks(execute=True):
+                self.burger.price = Decimal("55.00")
+                self.burger.save()
+
+        manifest = json.loads(self.read("manifest.json"))
+        self.assertNotEqual(manifest["menu"], old_manifest["menu"])
+        self.assertEqual(manifest["services"], old_manifest["services"])
+        self.assertEqual(json.loads(self.read("menu.json"))[0]["product_category"][0]["price"], "55.00")
+        # The previous version stays available for clients holding the old manifest
+        self.assertTrue(os.path.exists(os.path.join(self.root, old_manifest["menu"])))
+
+    def test_catalog_changes_are_published_without_a_broker(self):
+        with override_settings(CATALOG_SNAPSHOT_ROOT=self.root):
+            with patch("src.menu.tasks.publish_catalog_snapshots_task.delay", side_effect=ConnectionError("no broker")):
+                with self.captureOnCommitCallbacks(execute=True):
+                    self.burger.price = Decimal("55.00")
+                    self.burger.save()
+
+        self.assertEqual(json.loads(self.read("menu.json"))[0]["product_category"][0]["price"], "55.00")
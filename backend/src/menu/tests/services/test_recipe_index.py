@@ -0,0 +1,64 @@
+from decimal import Decimal
+
+from django.test import TestCase
+
+from src.inventory.models import Ingredient, RecipeIngredient
+from src.menu.models import Category, MenuItem, MenuItemVariation, Variation
+from src.menu.recipes import invalidate_recipe_index
+from src.menu.services import get_ingredient_requirements, get_menu_item_max_available
+
+
+class RecipeIndexTests(TestCase):
+    def setUp(self):
+        invalidate_recipe_index()
+
+        category = Category.objects.create(name="Drinks", slug="drinks", image="category.webp")
+        self.milk = Ingredient.objects.create(name="Milk", unit="Liter", quantity_in_stock=10)
+        self.coffee = Ingredient.objects.create(name="Coffee", unit="Gram", quantity_in_stock=100)
+
+        self.latte = MenuItem.objects.create(
+            category=category, name="Latte", slug="latte", price=Decimal("30.00"), product_image="latte.webp"
+        )
+        RecipeIngredient.objects.create(menu_item=self.latte, ingredient=self.milk, quantity_required=0.5)
+        RecipeIngredient.objects.create(menu_item=self.latte, ingredient=self.coffee, quantity_required=20)
+
+        variation = Variation.objects.create(item=self.latte, name="Shot")
+        self.double = MenuItemVariation.objects.create(variation=variation, value="Double")
+        RecipeIngredient.objects.create(variation=self.double, ingredient=self.coffee, quantity_required=10)
+
+    def test_requirements_need_no_queries_once_compiled(self):
+        get_ingredient_requirements([])
+
+        with self.assertNumQueries(0):
+            requirements = get_ingredient_requirements([(self.latte.id, [self.double.id], 2)])
+
+        self.assertEqual(requirements, {self.milk.id: 1.0, self.coffee.id: 60.0})
+
+    def test_recipe_changes_invalidate_the_index(self):
+        self.assertEqual(get_menu_item_max_available(self.latte.id), 5)
+
+        sugar = Ingredient.objects.create(name="Sugar", unit="Gram", quantity_in_stock=30)
+        recipe = RecipeIngredient.objects.create(menu_item=self.latte, ingredient=sugar, quantity_required=15)
+        self.assertEqual(get_menu_item_max_available(self.latte.id), 2)
+
+        recipe.quantity_required = 10
+        recipe.save()
+        self.assertEqual(get_menu_item_max_available(self.latte.id), 3)
+
+        recipe.delete()
+        self.assertEqual(get_menu_item_max_available(self.latte.id), 5)
+
+        self.double.delete()
+        self.assertEqual(
+            get_ingredient_requirements([(self.latte.id, [self.double.id], 1)]),
+            {self.milk.id: 0.5, self.coffee.id: 20.0},
+        )
+
+    def test_recipes_with_only_zero_quantities_are_unlimited(self):
+        water = MenuItem.objects.create(
+            category=self.latte.category, name="Water", slug="water", price=Decimal("5.00"), product_image="water.webp"
+        )
+        RecipeIngredient.objects.create(menu_item=water, ingredient=self.milk, quantity_required=0)
+
+        self.assertEqual(get_menu_item_max_available(water.id), float("inf"))
+        self.assertTrue(water.is_available())
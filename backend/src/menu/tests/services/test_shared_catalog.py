@@ -0,0 +1,121 @@
+import os
+import tempfile
+from decimal import Decimal
+
+from django.test import TestCase, override_settings
+
+from src.common.cache import bump_namespace_version
+from src.inventory.models import Ingredient, RecipeIngredient
+from src.menu.models import Category, MenuItem, MenuItemVariation, Variation
+from src.menu.recipes import RecipeIndex
+from src.menu.selectors import get_menu_availability
+from src.menu.services import get_ingredient_requirements
+from src.menu.shared_catalog import (
+    SharedCatalog,
+    get_shared_catalog,
+    write_shared_catalog,
+)
+from src.service.models import Service, ServiceCategory
+
+
+class SharedCatalogTests(TestCase):
+    def setUp(self):
+        tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp_dir.cleanup)
+        self.path = os.path.join(tmp_dir.name, "catalog.bin")
+
+        category = Category.objects.create(name="Drinks", slug="drinks", image="category.webp")
+        self.milk = Ingredient.objects.create(name="Milk", unit="Liter", quantity_in_stock=10)
+        self.coffee = Ingredient.objects.create(name="Coffee", unit="Gram", quantity_in_stock=100)
+
+        self.latte = MenuItem.objects.create(
+            category=category,
+            name="Latte",
+            slug="latte",
+            price=Decimal("30.00"),
+            discount_price=Decimal("25.50"),
+            product_image="latte.webp",
+        )
+        self.water = MenuItem.objects.create(
+            category=category, name="Water", slug="water", price=Decimal("5.00"), product_image="water.webp"
+        )
+        RecipeIngredient.objects.create(menu_item=self.latte, ingredient=self.milk, quantity_required=0.5)
+        RecipeIngredient.objects.create(menu_item=self.latte, ingredient=self.coffee, quantity_required=20)
+
+        variation = Variation.objects.create(item=self.latte, name="Shot")
+        self.double = MenuItemVariation.objects.create(variation=variation, value="Double", extra_price=Decimal("4.25"))
+        RecipeIngredient.objects.create(variation=self.double, ingredient=self.coffee, quantity_required=10)
+
+        service_category = ServiceCategory.objects.create(name="Kids", slug="kids")
+        self.play = Service.objects.create(category=service_category, name="Play", slug="play", price=Decimal("20.00"))
+
+    def test_snapshot_matches_the_database(self):
+        write_shared_catalog(self.path)
+        shared_catalog = SharedCatalog(self.path)
+        index = RecipeIndex.build()
+
+        for menu_item_id in (self.latte.id, self.water.id, 0):
+            self.assertEqual(
+                [list(part) for part in shared_catalog.get_item_recipe(menu_item_id)],
+                [list(part) for part in index.get_item_recipe(menu_item_id)],
+            )
+        self.assertEqual(
+            shared_catalog.get_requirements([(self.latte.id, [self.double.id], 2)]),
+            {self.milk.id: 1.0, self.coffee.id: 60.0},
+        )
+
+        self.assertEqual(shared_catalog.get_item_prices(self.latte.id), (Decimal("30.00"), Decimal("25.50")))
+        self.assertEqual(shared_catalog.get_item_prices(self.water.id), (Decimal("5.00"), None))
+        self.assertEqual(shared_catalog.get_unit_price(self.latte.id, [self.double.id]), Decimal("29.75"))
+        self.assertEqual(shared_catalog.get_service_price(self.play.id), Decimal("20.00"))
+        self.assertIsNone(shared_catalog.get_item_prices(0))
+
+    def test_recipes_and_availability_are_served_from_the_mapped_file(self):
+        with override_settings(CATALOG_SHARED_SNAPSHOT_PATH=self.path):
+            get_shared_catalog()
+
+            with self.assertNumQueries(0):
+                requirements = get_ingredient_requirements([(self.latte.id, [], 1)])
+            self.assertEqual(requirements, {self.milk.id: 0.5, self.coffee.id: 20.0})
+
+            # Only the stock levels are read from the database
+            with self.assertNumQueries(1):
+                availability = get_menu_availability()
+            self.assertEqual(availability["items"], {self.latte.id: 5, self.water.id: None})
+            self.assertEqual(availability["variations"], {self.double.id: 3})
+
+    def test_committed_changes_rebuild_the_snapshot(self):
+        with override_settings(CATALOG_SHARED_SNAPSHOT_PATH=self.path):
+            inode = get_shared_catalog().inode
+
+            with self.captureOnCommitCallbacks(execute=True):
+                self.latte.price = Decimal("32.00")
+                self.latte.save()
+
+            shared_catalog = get_shared_catalog()
+
+        self.assertNotEqual(shared_catalog.inode, inode)
+        self.assertEqual(shared_catalog.get_item_prices(self.latte.id)[0], Decimal("32.00"))
+
+    def test_a_leftover_snapshot_is_rebuilt_before_it_is_trusted(self):
+        write_shared_catalog(self.path)
+        # Changed behind the snapshot's back, e.g. by another checkout sharing the path
+        MenuItem.objects.filter(id=self.latte.id).update(price=Decimal("35.00"))
+
+        with override_settings(CATALOG_SHARED_SNAPSHOT_PATH=self.path):
+            shared_catalog = get_shared_catalog()
+
+        self.assertEqual(shared_catalog.get_item_prices(self.latte.id)[0], Decimal("35.00"))
+
+    def test_recipe_changes_from_processes_without_the_snapshot_are_picked_up(self):
+        with override_settings(CATALOG_SHARED_SNAPSHOT_PATH=self.path):
+            get_shared_catalog()
+
+            # Committed by e.g. a Celery worker, which rebuilds no snapshot, its invalidation
+            # reaches this process through the bus as a new "recipes" version
+            RecipeIngredient.objects.filter(menu_item=self.latte, ingredient=self.milk).update(quantity_required=0.25)
+            bump_namespace_version("recipes")
+
+            requirements = get_ingredient_requirements([(self.latte.id, [], 1)])
+
+        self.assertEqual(requirements, {self.milk.id: 0.25, self.coffee.id: 20.0})
@@ -0,0 +1,68 @@
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from src.common.cache import bump_namespace_version, namespaced_key
+from src.menu.models import Category, MenuItem
+
+
+class CatalogETagTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+
+        self.category = Category.objects.create(name="Food", slug="food", image="category.webp")
+        self.burger = MenuItem.objects.create(
+            category=self.category, name="Burger", slug="burger", price=Decimal("50.00"), product_image="burger.webp"
+        )
+
+    def test_unchanged_catalog_is_revalidated_without_queries(self):
+        url = reverse("api:menu:categories")
+
+        first = self.client.get(url)
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(first.json()[0]["product_category"][0]["name"], "Burger")
+
+        with self.assertNumQueries(0):
+            cached = self.client.get(url)
+            not_modified = self.client.get(url, HTTP_IF_NONE_MATCH=first["ETag"])
+
+        self.assertEqual(cached.content, first.content)
+        self.assertEqual(not_modified.status_code, 304)
+        self.assertEqual(not_modified["ETag"], first["ETag"])
+
+    def test_catalog_changes_change_the_etag(self):
+        url = reverse("api:menu:menu-items", kwargs={"slug": "burger"})
+        first = self.client.get(url)
+
+        self.burger.price = Decimal("55.00")
+        self.burger.save()
+
+        changed = self.client.get(url, HTTP_IF_NONE_MATCH=first["ETag"])
+        self.assertEqual(changed.status_code, 200)
+        self.assertNotEqual(changed["ETag"], first["ETag"])
+        self.assertEqual(changed.json()["price"], "55.00")
+
+    def test_etag_survives_a_new_cache_version_of_the_same_catalog(self):
+        url = reverse("api:menu:categories")
+        first = self.client.get(url)
+
+        # Another worker's cache, or an expired version key
+        bump_namespace_version("menu")
+
+        not_modified = self.client.get(url, HTTP_IF_NONE_MATCH=first["ETag"])
+        self.assertEqual(not_modified.status_code, 304)
+
+    def test_unknown_menu_items_are_not_cached(self):
+        url = reverse("api:menu:menu-items", kwargs={"slug": "pizza"})
+
+        self.assertEqual(self.client.get(url).status_code, 404)
+        self.assertIsNone(cache.get(namespaced_key("menu", "response", "testserver", "menu-item:pizza")))
+
+        MenuItem.objects.create(
+            category=self.category, name="Pizza", slug="pizza", price=Decimal("80.00"), product_image="pizza.webp"
+        )
+        self.assertEqual(self.client.get(url).json()["name"], "Pizza")
@@ -1,8 +1,9 @@
 from django.urls import path
-from src.menu.views import CategoryListView, MenuItemView
+from src.menu.views import CategoryListView, MenuAvailabilityView, MenuItemView
 
 
 urlpatterns = [
     path("categories/", CategoryListView.as_view(), name="categories"),
+    path("availability/", MenuAvailabilityView.as_view(), name="availability"),
     path("menu-items/<slug:slug>/", MenuItemView.as_view(), name="menu-items"),
 ]
@@ -1,9 +1,13 @@
 from rest_framework import serializers, views, response, status
+from rest_framework.exceptions import NotFound
 from src.api.utils import inline_serializer
-from src.menu.selectors import get_categories_list, get_menu_item_by_slug
+from src.menu.catalog import get_catalog_response
+from src.menu.selectors import get_categories_list, get_menu_availability, get_menu_item_by_slug
 
 
 class CategoryListView(views.APIView):
+    class FilterSerializer(serializers.Serializer):
+        with_availability = serializers.BooleanField(required=False, default=False)
 
     class OutputSerializer(serializers.Serializer):
         id = serializers.IntegerField()
@@ -19,14 +23,30 @@ class CategoryListView(views.APIView):
                 "discount_price": serializers.DecimalField(max_digits=8, decimal_places=2),
                 "slug": serializers.SlugField(allow_unicode=True),
                 "product_image": serializers.ImageField(),
+                # Only set with ?with_availability=true, null means no recipe limits the item
+                "available_count": serializers.IntegerField(required=False),
             },
             many=True,
         )
 
     def get(self, request):
+        filters_serializer = self.FilterSerializer(data=request.query_params)
+        filters_serializer.is_valid(raise_exception=True)
+
+        if not filters_serializer.validated_data["with_availability"]:
+            return get_catalog_response(request, "categories", lambda: self.render(request, get_categories_list()))
+
+        # Stock changes all the time, the availability variant is never cached
         categories = get_categories_list()
-        serializer = self.OutputSerializer(categories, many=True, context={"request": request})
-        return response.Response(serializer.data, status=status.HTTP_200_OK)
+        available_counts = get_menu_availability()["items"]
+        for category in categories:
+            for menu_item in category.product_category.all():
+                menu_item.available_count = available_counts.get(menu_item.id)
+
+        return response.Response(self.render(request, categories), status=status.HTTP_200_OK)
+
+    def render(self, request, categories):
+        return self.OutputSerializer(categories, many=True, context={"request": request}).data
 
 
 class MenuItemView(views.APIView):
@@ -66,6 +86,38 @@ class MenuItemView(views.APIView):
         )
 
     def get(self, request, slug):
-        menu_items = get_menu_item_by_slug(slug=slug)
-        serializer = self.OutputSerializer(menu_items, context={"request": request})
+        return get_catalog_response(request, f"menu-item:{slug}", lambda: self.render(request, slug))
+
+    def render(self, request, slug):
+        menu_item = get_menu_item_by_slug(slug=slug)
+        # Raised before anything is cached, unknown slugs do not fill the catalog cache
+        if menu_item is None:
+            raise NotFound()
+        return self.OutputSerializer(menu_item, context={"request": request}).data
+
+
+class MenuAvailabilityView(views.APIView):
+    class OutputSerializer(serializers.Serializer):
+        items = inline_serializer(
+            fields={
+                "id": serializers.IntegerField(),
+                "available_count": serializers.IntegerField(allow_null=True),
+            },
+            many=True,
+        )
+        variations = inline_serializer(
+            fields={
+                "id": serializers.IntegerField(),
+                "available_count": serializers.IntegerField(allow_null=True),
+            },
+            many=True,
+        )
+
+    def get(self, request):
+        availability = get_menu_availability()
+        data = {
+            key: [{"id": object_id, "available_count": count} for object_id, count in counts.items()]
+            for key, counts in availability.items()
+        }
+        serializer = self.OutputSerializer(data)
         return response.Response(serializer.data, status=status.HTTP_200_OK)
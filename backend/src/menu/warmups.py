@@ -0,0 +1,32 @@
+from django.conf import settings
+
+from src.common.warmup import register_warmup
+from src.menu.recipes import get_recipe_index
+from src.menu.selectors import get_categories_list, get_menu_items_list
+from src.menu.shared_catalog import SharedCatalog, refresh_shared_catalog
+from src.service.selectors import get_service_categories_list, get_services_list
+
+
+@register_warmup("shared_catalog")
+def build_shared_catalog():
+    if not settings.CATALOG_SHARED_SNAPSHOT_PATH:
+        return "disabled"
+
+    refresh_shared_catalog()
+    return settings.CATALOG_SHARED_SNAPSHOT_PATH
+
+
+@register_warmup("recipe_matrix", per_worker=True)
+def warm_recipe_matrix():
+    index = get_recipe_index()
+    return "shared snapshot" if isinstance(index, SharedCatalog) else f"{len(index.items)} item recipes"
+
+
+@register_warmup("catalog_cache", per_worker=True)
+def warm_catalog_cache():
+    """Fill the cached catalog selectors the menu and services endpoints read"""
+    selectors = [get_categories_list, get_menu_items_list, get_service_categories_list, get_services_list]
+    for selector in selectors:
+        selector()
+
+    return f"{len(selectors)} selectors"
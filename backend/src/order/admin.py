@@ -1,5 +1,7 @@
 from django.contrib import admin
+from django.db import transaction
 from src.order.models import Order, OrderItem, OrderService
+from src.order.services import apply_order_line_change, issue_order_codes, rebuild_order_totals
 
 
 @admin.register(Order)
@@ -12,24 +14,51 @@ class OrderAdmin(admin.ModelAdmin):
         "customer_name",
         "customer_phone",
         "ref_code",
+        "ticket_number",
         "created_at",
         "payment_status",
+        "total",
     )
     list_filter = ("payment_status", "created_at", "updated_at", "tax_enabled", "tax_rate")
     search_fields = ("id", "user__username", "user__email", "customer_name", "customer_phone", "ref_code")
-    readonly_fields = ("created_at", "updated_at")
+    readonly_fields = (
+        "ref_code",
+        "ticket_number",
+        "created_at",
+        "updated_at",
+        "subtotal",
+        "tax_amount",
+        "total",
+        "paid_total",
+    )
+
+    actions = ("rebuild_totals",)
+
+    def save_model(self, request, obj, form, change):
+        super().save_model(request, obj, form, change)
+        if not change:
+            issue_order_codes(obj)
+        elif {"tax_enabled", "tax_rate"}.intersection(form.changed_data):
+            rebuild_order_totals(obj)
+
+    @admin.action(description="Rebuild totals from the order lines")
+    def rebuild_totals(self, request, queryset):
+        rebuilt = sum(
+            1 for order in queryset.prefetch_related("order_items", "order_services") if rebuild_order_totals(order)
+        )
+        self.message_user(request, f"Fixed {rebuilt} of {queryset.count()} orders with drifted totals")
 
     @admin.display(description="Total")
     def get_total(self, obj):
-        return obj.get_total()
+        return obj.total
 
     @admin.display(description="Subtotal")
     def get_subtotal(self, obj):
-        return obj.get_subtotal()
+        return obj.subtotal
 
     @admin.display(description="Tax")
     def get_tax_amount(self, obj):
-        return obj.get_tax_amount()
+        return obj.tax_amount
 
     @admin.display(description="Items")
     def get_items(self, obj):
@@ -93,6 +122,31 @@ class OrderItemAdmin(admin.ModelAdmin):
     list_filter = ("order", "item")
     search_fields = ("id", "order__id", "item__name")
 
+    def save_model(self, request, obj, form, change):
+        # Read the stored line before the form values are written, the order totals move by the difference
+        obj._stored_line = OrderItem.objects.filter(pk=obj.pk).first() if change else None
+        super().save_model(request, obj, form, change)
+
+    def save_related(self, request, form, formsets, change):
+        super().save_related(request, form, formsets, change)
+        line = form.instance
+        if "item_variations" in form.changed_data:
+            line.variations_price = sum(var.extra_price or 0 for var in line.item_variations.all())
+            line.save(update_fields=["variations_price"])
+        apply_order_line_change(previous=line._stored_line, line=line)
+
+    def delete_model(self, request, obj):
+        with transaction.atomic():
+            super().delete_model(request, obj)
+            apply_order_line_change(previous=obj)
+
+    def delete_queryset(self, request, queryset):
+        with transaction.atomic():
+            lines = list(queryset)
+            super().delete_queryset(request, queryset)
+            for line in lines:
+                apply_order_line_change(previous=line)
+
     def has_add_permission(self, request, obj=None):
         if request.user.is_anonymous:
             return False
@@ -135,6 +189,23 @@ class OrderServiceAdmin(admin.ModelAdmin):
     list_filter = ("order", "service")
     search_fields = ("id", "order__id", "service__name")
 
+    def save_model(self, request, obj, form, change):
+        stored_line = OrderService.objects.filter(pk=obj.pk).first() if change else None
+        super().save_model(request, obj, form, change)
+        apply_order_line_change(previous=stored_line, line=obj)
+
+    def delete_model(self, request, obj):
+        with transaction.atomic():
+            super().delete_model(request, obj)
+            apply_order_line_change(previous=obj)
+
+    def delete_queryset(self, request, queryset):
+        with transaction.atomic():
+            lines = list(queryset)
+            super().delete_queryset(request, queryset)
+            for line in lines:
+                apply_order_line_change(previous=line)
+
     def has_add_permission(self, request, obj=None):
         if request.user.is_anonymous:
             return False
@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand
+
+from src.order.services import ORDER_EXPORT_FORMATS, export_orders
+
+
+class Command(BaseCommand):
+    help = """
+    Export the orders created between two dates (inclusive, YYYY-MM-DD) with their lines as CSV or JSONL.
+
+    Rows are streamed in keyset batches, so exporting a whole year runs in constant memory.
+    """
+
+    def add_arguments(self, parser):
+        parser.add_argument("date_from")
+        parser.add_argument("date_to")
+        parser.add_argument("--format", dest="export_format", choices=list(ORDER_EXPORT_FORMATS), default="csv")
+        parser.add_argument("--output", help="File to write to, defaults to stdout")
+
+    def handle(self, *args, **options):
+        rows = export_orders(
+            date_from=options["date_from"], date_to=options["date_to"], export_format=options["export_format"]
+        )
+
+        if not options["output"]:
+            for row in rows:
+                self.stdout.write(row, ending="")
+            return
+
+        with open(options["output"], "w", encoding="utf-8", newline="") as output:
+            output.writelines(rows)
@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand
+
+from src.order.models import Order
+from src.order.services import rebuild_order_totals
+
+
+class Command(BaseCommand):
+    help = """
+    Rebuild the denormalized order totals (subtotal, tax_amount, total, paid_total)
+    from the order lines.
+
+    Use --verify to only report orders whose stored totals drifted, without writing anything.
+    """
+
+    def add_arguments(self, parser):
+        parser.add_argument("--verify", action="store_true", help="Only report mismatching orders")
+        parser.add_argument("--chunk-size", type=int, default=500)
+
+    def handle(self, *args, **options):
+        verify_only = options["verify"]
+        checked = 0
+        mismatched = 0
+
+        # Lines are priced from their snapshot columns, the menu and service rows are not read
+        queryset = Order.objects.prefetch_related("order_items", "order_services").order_by("id")
+
+        for order in queryset.iterator(chunk_size=options["chunk_size"]):
+            checked += 1
+            changed = rebuild_order_totals(order, commit=not verify_only)
+            if changed:
+                mismatched += 1
+                self.stdout.write(f"Order {order.id}: {', '.join(changed)} mismatch")
+
+        action = "found" if verify_only else "fixed"
+        self.stdout.write(self.style.SUCCESS(f"Checked {checked} orders, {action} {mismatched} with drifted totals"))
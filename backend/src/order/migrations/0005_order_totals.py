@@ -0,0 +1,68 @@
+# Generated by Django 5.1.2 on 2026-10-18 01:42
+
+from decimal import ROUND_HALF_UP, Decimal
+
+from django.db import migrations, models
+
+
+def backfill_order_totals(apps, schema_editor):
+    Order = apps.get_model("order", "Order")
+
+    orders = Order.objects.prefetch_related("order_items__item", "order_items__item_variations", "order_services__service")
+    for order in orders.iterator(chunk_size=500):
+        subtotal = Decimal("0.00")
+        paid_total = Decimal("0.00")
+
+        for line in order.order_items.all():
+            if line.item.discount_price and line.item.discount_price > 0:
+                base_price = line.item.discount_price
+            else:
+                base_price = line.item.price
+            variations_price = sum(var.extra_price or 0 for var in line.item_variations.all())
+            subtotal += (base_price + variations_price) * line.quantity
+            paid_total += line.paid_amount or 0
+
+        for line in order.order_services.all():
+            subtotal += line.service.price * line.quantity
+            paid_total += line.paid_amount or 0
+
+        tax_amount = Decimal("0.00")
+        if order.tax_enabled:
+            tax_amount = (subtotal * order.tax_rate).quantize(Decimal("0.01"), rounding=ROUND_HALF_UP)
+
+        Order.objects.filter(id=order.id).update(
+            subtotal=subtotal, tax_amount=tax_amount, total=subtotal + tax_amount, paid_total=paid_total
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('menu', '0003_alter_menuitemvariation_variation'),
+        ('service', '0001_initial'),
+        ('order', '0004_alter_orderservice_is_paid_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='order',
+            name='paid_total',
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=10, verbose_name='إجمالي المدفوع'),
+        ),
+        migrations.AddField(
+            model_name='order',
+            name='subtotal',
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=10, verbose_name='المجموع الفرعي'),
+        ),
+        migrations.AddField(
+            model_name='order',
+            name='tax_amount',
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=10, verbose_name='قيمة الضريبة'),
+        ),
+        migrations.AddField(
+            model_name='order',
+            name='total',
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=10, verbose_name='الإجمالي'),
+        ),
+        migrations.RunPython(backfill_order_totals, migrations.RunPython.noop),
+    ]
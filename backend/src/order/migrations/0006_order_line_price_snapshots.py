@@ -0,0 +1,60 @@
+# Generated by Django 5.1.2 on 2026-10-18 02:10
+
+from django.db import migrations, models
+
+
+def backfill_price_snapshots(apps, schema_editor):
+    OrderItem = apps.get_model("order", "OrderItem")
+    OrderService = apps.get_model("order", "OrderService")
+
+    items = OrderItem.objects.select_related("item").prefetch_related("item_variations")
+    batch = []
+    for line in items.iterator(chunk_size=1000):
+        line.unit_price = line.item.price
+        line.discount_price = line.item.discount_price
+        line.variations_price = sum(var.extra_price or 0 for var in line.item_variations.all())
+        batch.append(line)
+        if len(batch) >= 1000:
+            OrderItem.objects.bulk_update(batch, ["unit_price", "discount_price", "variations_price"])
+            batch = []
+    OrderItem.objects.bulk_update(batch, ["unit_price", "discount_price", "variations_price"])
+
+    batch = []
+    for line in OrderService.objects.select_related("service").iterator(chunk_size=1000):
+        line.unit_price = line.service.price
+        batch.append(line)
+        if len(batch) >= 1000:
+            OrderService.objects.bulk_update(batch, ["unit_price"])
+            batch = []
+    OrderService.objects.bulk_update(batch, ["unit_price"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('order', '0005_order_totals'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='orderitem',
+            name='discount_price',
+            field=models.DecimalField(blank=True, decimal_places=2, max_digits=8, null=True, verbose_name='السعر بعد الخصم'),
+        ),
+        migrations.AddField(
+            model_name='orderitem',
+            name='unit_price',
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=8, verbose_name='سعر الوحدة'),
+        ),
+        migrations.AddField(
+            model_name='orderitem',
+            name='variations_price',
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=8, verbose_name='سعر الإضافات'),
+        ),
+        migrations.AddField(
+            model_name='orderservice',
+            name='unit_price',
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=8, verbose_name='سعر الوحدة'),
+        ),
+        migrations.RunPython(backfill_price_snapshots, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.1.2 on 2026-10-18 01:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('order', '0006_order_line_price_snapshots'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailySalesRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(verbose_name='التاريخ')),
+                ('kind', models.CharField(choices=[('order', 'طلب'), ('item', 'منتج'), ('service', 'خدمة')], max_length=10, verbose_name='النوع')),
+                ('object_id', models.PositiveBigIntegerField(default=0, verbose_name='المنتج / الخدمة')),
+                ('payment_status', models.CharField(choices=[('pending', 'قيد الانتظار'), ('partial', 'جزئي'), ('paid', 'مدفوع'), ('refunded', 'تم استرداد المبلغ')], max_length=20, verbose_name='حالة الدفع')),
+                ('cancelled', models.BooleanField(default=False, verbose_name='ملغي')),
+                ('orders', models.PositiveIntegerField(default=0, verbose_name='عدد الطلبات')),
+                ('lines', models.PositiveIntegerField(default=0, verbose_name='عدد البنود')),
+                ('quantity', models.PositiveIntegerField(default=0, verbose_name='الكمية')),
+                ('total', models.DecimalField(decimal_places=2, default=0, max_digits=12, verbose_name='الإجمالي')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='تاريخ التحديث')),
+            ],
+            options={
+                'verbose_name': 'ملخص المبيعات اليومي',
+                'verbose_name_plural': 'ملخصات المبيعات اليومية',
+                'constraints': [models.UniqueConstraint(fields=('date', 'kind', 'object_id', 'payment_status', 'cancelled'), name='daily_sales_rollup_key')],
+            },
+        ),
+    ]
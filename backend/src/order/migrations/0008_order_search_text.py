@@ -0,0 +1,64 @@
+# Generated by Django 5.1.2 on 2026-10-18 02:01
+
+import re
+
+from django.db import migrations, models
+
+# Frozen copy of src.common.utils.normalize_search_text as of this migration
+ARABIC_DIACRITICS = re.compile("[\u0610-\u061a\u064b-\u065f\u0670\u06d6-\u06ed\u0640]")
+ARABIC_LETTER_VARIANTS = str.maketrans(
+    {
+        "أ": "ا",
+        "إ": "ا",
+        "آ": "ا",
+        "ٱ": "ا",
+        "ى": "ي",
+        "ئ": "ي",
+        "ؤ": "و",
+        "ة": "ه",
+        **{chr(0x0660 + digit): str(digit) for digit in range(10)},
+        **{chr(0x06F0 + digit): str(digit) for digit in range(10)},
+    }
+)
+
+
+def normalize_search_text(*values):
+    text = " ".join(str(value) for value in values if value)
+    text = ARABIC_DIACRITICS.sub("", text).translate(ARABIC_LETTER_VARIANTS).lower()
+    return " ".join(text.split())
+
+
+def backfill_search_text(apps, schema_editor):
+    Order = apps.get_model("order", "Order")
+
+    batch = []
+    for order in Order.objects.select_related("table__area", "staff").iterator(chunk_size=1000):
+        order.search_text = normalize_search_text(
+            order.customer_name,
+            order.customer_phone,
+            order.ref_code,
+            order.table.number if order.table else None,
+            order.table.area.name if order.table else None,
+            order.staff.username if order.staff else None,
+        )
+        batch.append(order)
+        if len(batch) == 1000:
+            Order.objects.bulk_update(batch, ["search_text"])
+            batch = []
+    Order.objects.bulk_update(batch, ["search_text"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('order', '0007_daily_sales_rollup'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='order',
+            name='search_text',
+            field=models.TextField(blank=True, default='', editable=False, verbose_name='نص البحث'),
+        ),
+        migrations.RunPython(backfill_search_text, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.1.2 on 2026-10-18 02:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('order', '0008_order_search_text'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='order',
+            options={'verbose_name': 'طلب', 'verbose_name_plural': 'الطلبات'},
+        ),
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(fields=['-created_at', '-id'], name='order_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(condition=models.Q(('cancelled', False)), fields=['-created_at', '-id'], name='order_open_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(condition=models.Q(('payment_status', 'pending'), ('payment_status', 'partial'), _connector='OR'), fields=['-created_at'], name='order_unpaid_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(fields=['ref_code'], name='order_ref_code_idx'),
+        ),
+    ]
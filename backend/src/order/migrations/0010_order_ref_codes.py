@@ -0,0 +1,121 @@
+# Generated by Django 5.1.2 on 2026-10-18 02:05
+
+import re
+
+from django.db import migrations, models
+from django.db.models import Count, Q
+
+# Frozen copy of src.common.utils.normalize_search_text as of this migration
+ARABIC_DIACRITICS = re.compile("[\u0610-\u061a\u064b-\u065f\u0670\u06d6-\u06ed\u0640]")
+ARABIC_LETTER_VARIANTS = str.maketrans(
+    {
+        "أ": "ا",
+        "إ": "ا",
+        "آ": "ا",
+        "ٱ": "ا",
+        "ى": "ي",
+        "ئ": "ي",
+        "ؤ": "و",
+        "ة": "ه",
+        **{chr(0x0660 + digit): str(digit) for digit in range(10)},
+        **{chr(0x06F0 + digit): str(digit) for digit in range(10)},
+    }
+)
+
+
+def normalize_search_text(*values):
+    text = " ".join(str(value) for value in values if value)
+    text = ARABIC_DIACRITICS.sub("", text).translate(ARABIC_LETTER_VARIANTS).lower()
+    return " ".join(text.split())
+
+
+# Frozen copy of src.order.models.encode_ref_code as of this migration
+CROCKFORD_ALPHABET = "0123456789ABCDEFGHJKMNPQRSTVWXYZ"
+
+
+def encode_ref_code(order_id):
+    number = (order_id * 0x5DEECE66D + 0x2B7E15162) % 32**7
+    code = []
+    for _position in range(7):
+        number, digit = divmod(number, 32)
+        code.append(CROCKFORD_ALPHABET[digit])
+    return "".join(reversed(code))
+
+
+def reissue_ref_codes(apps, schema_editor):
+    """
+    Give the orders without a code, and all but the oldest holder of a colliding truncated UUID code,
+    an id derived one. Every other code is already printed on receipts and is kept.
+    Legacy codes are 8 characters long, the new ones 7, so they never collide.
+    """
+    Order = apps.get_model("order", "Order")
+
+    duplicates = (
+        Order.objects.exclude(Q(ref_code__isnull=True) | Q(ref_code=""))
+        .values("ref_code")
+        .annotate(count=Count("id"))
+        .filter(count__gt=1)
+        .values_list("ref_code", flat=True)
+    )
+    kept = set()
+    orders = (
+        Order.objects.filter(Q(ref_code__isnull=True) | Q(ref_code="") | Q(ref_code__in=list(duplicates)))
+        .select_related("table__area", "staff")
+        .order_by("id")
+    )
+
+    batch = []
+    for order in orders.iterator(chunk_size=1000):
+        if order.ref_code and order.ref_code not in kept:
+            kept.add(order.ref_code)
+            continue
+
+        order.ref_code = encode_ref_code(order.id)
+        order.search_text = normalize_search_text(
+            order.customer_name,
+            order.customer_phone,
+            order.ref_code,
+            order.table.number if order.table else None,
+            order.table.area.name if order.table else None,
+            order.staff.username if order.staff else None,
+        )
+        batch.append(order)
+        if len(batch) == 1000:
+            Order.objects.bulk_update(batch, ["ref_code", "search_text"])
+            batch = []
+    Order.objects.bulk_update(batch, ["ref_code", "search_text"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('order', '0009_order_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='order',
+            name='ticket_number',
+            field=models.PositiveIntegerField(blank=True, null=True, verbose_name='رقم التذكرة'),
+        ),
+        migrations.CreateModel(
+            name='OrderTicketCounter',
+            fields=[
+                ('date', models.DateField(primary_key=True, serialize=False, verbose_name='التاريخ')),
+                ('last_number', models.PositiveIntegerField(default=0, verbose_name='آخر رقم')),
+            ],
+            options={
+                'verbose_name': 'عداد التذاكر',
+                'verbose_name_plural': 'عدادات التذاكر',
+            },
+        ),
+        migrations.RunPython(reissue_ref_codes, migrations.RunPython.noop),
+        migrations.RemoveIndex(
+            model_name='order',
+            name='order_ref_code_idx',
+        ),
+        migrations.AddConstraint(
+            model_name='order',
+            constraint=models.UniqueConstraint(fields=('ref_code',), name='order_ref_code_unique'),
+        ),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 5.1.2 on 2026-10-18 12:40
+
+from django.db import migrations
+
+
+def create_trigram_index(apps, schema_editor):
+    # pg_trgm only exists on PostgreSQL, other backends fall back to an unindexed LIKE
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    # A failed concurrent build leaves an invalid index behind, IF NOT EXISTS would keep it
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT NOT indisvalid FROM pg_index WHERE indexrelid = to_regclass('order_search_text_trgm')"
+        )
+        invalid = cursor.fetchone()
+    if invalid and invalid[0]:
+        schema_editor.execute("DROP INDEX CONCURRENTLY IF EXISTS order_search_text_trgm")
+    # Built without blocking writes to the orders table, this needs the non-atomic migration
+    schema_editor.execute(
+        "CREATE INDEX CONCURRENTLY IF NOT EXISTS order_search_text_trgm "
+        "ON order_order USING gin (search_text gin_trgm_ops)"
+    )
+
+
+def drop_trigram_index(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute("DROP INDEX CONCURRENTLY IF EXISTS order_search_text_trgm")
+
+
+class Migration(migrations.Migration):
+    atomic = False
+
+    dependencies = [
+        ('order', '0010_order_ref_codes'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_trigram_index, drop_trigram_index),
+    ]
@@ -5,12 +5,14 @@ from django.utils.translation import gettext_lazy as _
 # from django_countries.fields import CountryField
 from src.menu.models import MenuItem, MenuItemVariation
 import decimal
-from django.db.models import Q
-from datetime import datetime
-from django.utils.timezone import make_aware
+from django.db.models import Q, Sum, Count, Value, F, Case, When, ExpressionWrapper
+from django.db.models.functions import Coalesce, Trunc
+from datetime import datetime, time
+from django.utils.timezone import make_aware, is_naive, get_current_timezone, now
 from datetime import timedelta
 from src.service.models import Service, ServiceBooking
 from src.table.models import Table
+from src.common.utils import normalize_search_text
 
 
 User = get_user_model()
@@ -24,6 +26,57 @@ PAYMENT_STATUS = (
 )
 
 
+REVENUE_GRANULARITIES = ("hour", "day", "week", "month")
+
+# Revenue breakdowns, the grouping fields and the keys they are returned under
+REVENUE_SPLITS = {
+    "area": {"table__area_id": "area_id", "table__area__name": "area"},
+    "payment_status": {"payment_status": "payment_status"},
+}
+
+
+def parse_range_date(value, end=False):
+    """
+    accept a date, datetime or string ("%Y-%m-%d" or "%Y-%m-%d %H:%M:%S") and return an aware datetime,
+    a date only upper bound covers the whole day (used with `__lt`)
+    """
+    if isinstance(value, str):
+        try:
+            value = datetime.strptime(value, "%Y-%m-%d %H:%M:%S")
+        except ValueError:
+            value = datetime.strptime(value, "%Y-%m-%d").date()
+
+    if not isinstance(value, datetime):
+        value = datetime.combine(value + timedelta(days=1) if end else value, time.min)
+
+    return make_aware(value) if is_naive(value) else value
+
+
+CROCKFORD_ALPHABET = "0123456789ABCDEFGHJKMNPQRSTVWXYZ"
+CROCKFORD_ALIASES = str.maketrans({"O": "0", "I": "1", "L": "1", "-": None, " ": None})
+
+# Reference codes are the order id run through a fixed bijection of [0, 32**7) and written as 7 Crockford
+# base32 characters, unique by construction (for the first 34 billion orders) and not sequential looking
+REF_CODE_LENGTH = 7
+REF_CODE_SPACE = 32**REF_CODE_LENGTH
+REF_CODE_MULTIPLIER = 0x5DEECE66D  # odd, so invertible modulo a power of two
+REF_CODE_OFFSET = 0x2B7E15162
+
+
+def encode_ref_code(order_id):
+    number = (order_id * REF_CODE_MULTIPLIER + REF_CODE_OFFSET) % REF_CODE_SPACE
+    code = []
+    for _position in range(REF_CODE_LENGTH):
+        number, digit = divmod(number, 32)
+        code.append(CROCKFORD_ALPHABET[digit])
+    return "".join(reversed(code))
+
+
+def normalize_ref_code(value):
+    """Upper-case a typed ref code and fold the Crockford look-alikes (O -> 0, I / L -> 1, dashes dropped)"""
+    return value.strip().upper().translate(CROCKFORD_ALIASES)
+
+
 class OrderManager(models.Manager):
     """
     order custom manager to add new queryset func
@@ -33,37 +86,57 @@ class OrderManager(models.Manager):
         """
         accept tow dates and return orders within these dates
         """
-        fromDate = make_aware(datetime.strptime(fromDate, "%Y-%m-%d %H:%M:%S"))
-        toDate = make_aware(datetime.strptime(toDate, "%Y-%m-%d %H:%M:%S"))
-        return self.filter(Q(start_date__gte=fromDate) & Q(start_date__lte=toDate), *args, **kwargs)
+        fromDate = parse_range_date(fromDate)
+        toDate = parse_range_date(toDate, end=True)
+        return self.filter(Q(created_at__gte=fromDate) & Q(created_at__lt=toDate), *args, **kwargs)
 
     def recent(self, *args, **kwargs):
         """
         return orders for today
         """
-        today = make_aware(datetime.now())
-        prev_day = make_aware(datetime.now() - timedelta(days=1))
-        return self.filter(Q(start_date__gte=prev_day) & Q(start_date__lte=today), *args, **kwargs)
+        prev_day = now() - timedelta(days=1)
+        return self.filter(created_at__gte=prev_day, *args, **kwargs)
 
     # .select_related(
     #         "shipping_address", "payment", "coupon", "user", "waiter", "delivery").prefetch_related(
     #         "items__item_variations__variation", "items__item", "order_status")
 
-    def total_earn_range(self, fromDate, toDate):
+    def total_earn_range(self, fromDate, toDate, granularity=None, split_by=None):
         """
-        return total earn with range dates, and order count
-        """
-        try:
-            fromDate = make_aware(datetime.strptime(fromDate, "%Y-%m-%d"))
-            toDate = make_aware(datetime.strptime(toDate, "%Y-%m-%d"))
-        except:
-            pass
+        return total revenue, tax, order count and cancelled count within the range dates
+        as a single aggregate query over the stored order totals.
 
-        queryset = self.filter(Q(start_date__gte=fromDate) & Q(start_date__lte=toDate))
-        total = 0
-        for order in queryset:  # loop throw orders then call model func get_total
-            total += order.get_total()
-        return decimal.Decimal(total), queryset.count()
+        with `granularity` (hour, day, week or month) the figures are grouped per period
+        (truncated in the current timezone) and a list of rows ordered by period is returned instead,
+        `split_by` (area or payment status) adds that breakdown to every period, still in one query.
+        """
+        queryset = self.filter(
+            created_at__gte=parse_range_date(fromDate), created_at__lt=parse_range_date(toDate, end=True)
+        )
+        aggregates = {
+            "total": Coalesce(Sum("total", filter=Q(cancelled=False)), Value(decimal.Decimal("0.00"))),
+            "tax": Coalesce(Sum("tax_amount", filter=Q(cancelled=False)), Value(decimal.Decimal("0.00"))),
+            "orders": Count("id", filter=Q(cancelled=False)),
+            "cancelled": Count("id", filter=Q(cancelled=True)),
+        }
+
+        if granularity is None:
+            return queryset.aggregate(**aggregates)
+
+        if granularity not in REVENUE_GRANULARITIES:
+            raise ValueError(f"Unsupported granularity {granularity!r}, use one of {', '.join(REVENUE_GRANULARITIES)}")
+        if split_by is not None and split_by not in REVENUE_SPLITS:
+            raise ValueError(f"Unsupported split {split_by!r}, use one of {', '.join(REVENUE_SPLITS)}")
+
+        split_fields = REVENUE_SPLITS[split_by] if split_by else {}
+        rows = (
+            queryset.annotate(period=Trunc("created_at", granularity, tzinfo=get_current_timezone()))
+            .values("period", *split_fields)
+            .annotate(**aggregates)
+            .order_by("period", *split_fields)
+        )
+
+        return [{split_fields.get(key, key): value for key, value in row.items()} for row in rows]
 
 
 class Order(models.Model):
@@ -77,6 +150,7 @@ class Order(models.Model):
     customer_name = models.CharField(_("الاسم"), max_length=100, blank=True)
     customer_phone = models.CharField(_("رقم الهاتف"), max_length=20, blank=True)
     ref_code = models.CharField(_("الكود"), max_length=20, blank=True, null=True)
+    ticket_number = models.PositiveIntegerField(_("رقم التذكرة"), null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
     tax_enabled = models.BooleanField(_("الضريبة"), default=True)
     tax_rate = models.DecimalField(_("نسبة الضريبة"), max_digits=5, decimal_places=4, default=0.14)
@@ -84,12 +158,35 @@ class Order(models.Model):
     created_at = models.DateTimeField(_("تاريخ الانشاء"), auto_now_add=True, null=True, blank=True)
     updated_at = models.DateTimeField(_("تاريخ التحديث"), auto_now=True)
     cancelled = models.BooleanField(_("ملفي"), default=False)
+    # Denormalized totals, kept up to date by the order services with delta updates
+    subtotal = models.DecimalField(_("المجموع الفرعي"), max_digits=10, decimal_places=2, default=0)
+    tax_amount = models.DecimalField(_("قيمة الضريبة"), max_digits=10, decimal_places=2, default=0)
+    total = models.DecimalField(_("الإجمالي"), max_digits=10, decimal_places=2, default=0)
+    paid_total = models.DecimalField(_("إجمالي المدفوع"), max_digits=10, decimal_places=2, default=0)
+    # Normalized customer, phone, ref code, table, area and staff text, trigram indexed on PostgreSQL
+    search_text = models.TextField(_("نص البحث"), blank=True, default="", editable=False)
     objects = OrderManager()
 
+    SEARCH_SOURCE_FIELDS = {"customer_name", "customer_phone", "ref_code", "table", "staff"}
+
     class Meta:
-        ordering = ["id"]
         verbose_name = _("طلب")
         verbose_name_plural = _("الطلبات")
+        indexes = [
+            # Date ranges, recent orders, exports and keyset pagination
+            models.Index(fields=["-created_at", "-id"], name="order_created_idx"),
+            # The order list only shows open orders
+            models.Index(fields=["-created_at", "-id"], condition=Q(cancelled=False), name="order_open_idx"),
+            # Orders still waiting for (part of) their payment
+            models.Index(
+                fields=["-created_at"],
+                condition=Q(payment_status="pending") | Q(payment_status="partial"),
+                name="order_unpaid_idx",
+            ),
+        ]
+        constraints = [
+            models.UniqueConstraint(fields=["ref_code"], name="order_ref_code_unique"),
+        ]
 
     def __str__(self):
         return f"طلب {self.ref_code or self.id}"
@@ -102,21 +199,79 @@ class Order(models.Model):
 
     def get_tax_amount(self):
         """Calculate tax amount"""
-        if not self.tax_enabled:
-            return decimal.Decimal("0.00")
-        return self.get_subtotal() * self.tax_rate
+        return self.calculate_tax(self.get_subtotal())
 
     def get_total(self):
         """Calculate total including tax"""
         subtotal = self.get_subtotal()
-        tax = self.get_tax_amount()
+        tax = self.calculate_tax(subtotal)
         return subtotal + tax
 
-    # def save(self, *args, **kwargs):
-    #     total = self.get_total()
-    #     if total:
-    #         self.total_price = total
-    #     super(Order, self).save(*args, **kwargs)
+    def get_paid_total(self):
+        """Calculate paid amount from all order items and services"""
+        items_paid = sum(item.paid_amount or 0 for item in self.order_items.all())
+        services_paid = sum(service.paid_amount or 0 for service in self.order_services.all())
+        return decimal.Decimal(items_paid + services_paid)
+
+    def calculate_tax(self, subtotal):
+        """Tax for the given subtotal, rounded the same way the stored `tax_amount` is"""
+        if not self.tax_enabled:
+            return decimal.Decimal("0.00")
+        return (decimal.Decimal(subtotal) * decimal.Decimal(str(self.tax_rate))).quantize(
+            decimal.Decimal("0.01"), rounding=decimal.ROUND_HALF_UP
+        )
+
+    def calculate_totals(self):
+        """
+        recompute the denormalized totals from the order lines,
+        used to build and verify the stored columns
+        """
+        subtotal = decimal.Decimal(self.get_subtotal()).quantize(decimal.Decimal("0.01"))
+        tax_amount = self.calculate_tax(subtotal)
+        return {
+            "subtotal": subtotal,
+            "tax_amount": tax_amount,
+            "total": subtotal + tax_amount,
+            "paid_total": self.get_paid_total().quantize(decimal.Decimal("0.01")),
+        }
+
+    def build_search_text(self):
+        table = self.table
+        return normalize_search_text(
+            self.customer_name,
+            self.customer_phone,
+            self.ref_code,
+            table.number if table else None,
+            table.area.name if table else None,
+            self.staff.username if self.staff else None,
+        )
+
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get("update_fields")
+        if update_fields is None or self.SEARCH_SOURCE_FIELDS.intersection(update_fields):
+            self.search_text = self.build_search_text()
+            if update_fields is not None:
+                kwargs["update_fields"] = {*update_fields, "search_text"}
+        super().save(*args, **kwargs)
+
+
+class OrderItemQuerySet(models.QuerySet):
+    """
+    order item queryset to price lines in SQL from the snapshot columns, without joining the menu tables
+    """
+
+    def with_line_total(self):
+        base_price = Case(
+            When(discount_price__gt=0, then=F("discount_price")),
+            default=F("unit_price"),
+            output_field=models.DecimalField(max_digits=8, decimal_places=2),
+        )
+        return self.annotate(
+            line_total=ExpressionWrapper(
+                (base_price + F("variations_price")) * F("quantity"),
+                output_field=models.DecimalField(max_digits=10, decimal_places=2),
+            )
+        )
 
 
 class OrderItem(models.Model):
@@ -132,9 +287,15 @@ class OrderItem(models.Model):
     # Individual payment tracking
     is_paid = models.BooleanField(_("تم الدفع"), default=False)
     paid_amount = models.DecimalField(_("المبلغ المدفوع"), max_digits=8, decimal_places=2, default=0)
+    # Prices frozen at creation time, so repricing the menu never changes past orders
+    unit_price = models.DecimalField(_("سعر الوحدة"), max_digits=8, decimal_places=2, default=0)
+    discount_price = models.DecimalField(_("السعر بعد الخصم"), max_digits=8, decimal_places=2, null=True, blank=True)
+    variations_price = models.DecimalField(_("سعر الإضافات"), max_digits=8, decimal_places=2, default=0)
 
     created_at = models.DateTimeField(_("تاريخ الانشاء"), auto_now_add=True, null=True, blank=True)
 
+    objects = OrderItemQuerySet.as_manager()
+
     class Meta:
         verbose_name = _("العنصر المطلوب")
         verbose_name_plural = _("العناصر المطلوبة")
@@ -142,11 +303,27 @@ class OrderItem(models.Model):
     def __str__(self):
         return f"{self.quantity}x {self.item.name}"
 
+    def save(self, *args, **kwargs):
+        # Lines created outside the order services (admin, shell) still get the current menu price
+        if self._state.adding and not self.unit_price:
+            self.unit_price = self.item.price
+            if self.discount_price is None:
+                self.discount_price = self.item.discount_price
+        super().save(*args, **kwargs)
+
+    def snapshot_prices(self, variations=None):
+        """
+        freeze the current menu item and variations prices on the line
+        """
+        self.unit_price = self.item.price
+        self.discount_price = self.item.discount_price
+        self.variations_price = sum(var.extra_price or 0 for var in variations or [])
+
     def get_base_price(self):
         """Get item base price (with discount if applicable)"""
-        if self.item.discount_price and self.item.discount_price > 0:
-            return self.item.discount_price
-        return self.item.price
+        if self.discount_price and self.discount_price > 0:
+            return self.discount_price
+        return self.unit_price
 
     def get_unit_price(self):
         """Get price per unit including variations"""
@@ -158,30 +335,26 @@ class OrderItem(models.Model):
 
     def get_variations_price(self):
         """Get total price of variations"""
-        return sum(var.extra_price for var in self.item_variations.all())
+        return self.variations_price
 
     def get_total_variations_price(self):
         """
         get extras price for variations eg. (size large)
         """
-        if self.item_variations:
-            price = 0
-            for var in self.item_variations.all():
-                price += var.extra_price
-            return price
+        return self.variations_price
 
     def get_total_item_price(self):
         """
         total price without variations
         """
-        return self.quantity * self.item.price
+        return self.quantity * self.unit_price
 
     def get_total_discount_item_price(self):
         """
         if item have discount return the discount price
         """
         try:
-            return self.quantity * self.item.discount_price
+            return self.quantity * self.discount_price
         except:
             pass
 
@@ -198,7 +371,7 @@ class OrderItem(models.Model):
         """
         final price include variations price
         """
-        if self.item.discount_price:
+        if self.discount_price:
             return self.get_total_discount_item_price() + self.get_total_variations_price()
         return self.get_total_item_price() + self.get_total_variations_price()
 
@@ -210,6 +383,19 @@ class OrderItem(models.Model):
         return usage
 
 
+class OrderServiceQuerySet(models.QuerySet):
+    """
+    order service queryset to price lines in SQL from the snapshot column
+    """
+
+    def with_line_total(self):
+        return self.annotate(
+            line_total=ExpressionWrapper(
+                F("unit_price") * F("quantity"), output_field=models.DecimalField(max_digits=10, decimal_places=2)
+            )
+        )
+
+
 class OrderService(models.Model):
     """Services added to an order"""
 
@@ -227,9 +413,13 @@ class OrderService(models.Model):
     paid_amount = models.DecimalField(
         _("المبلغ المدفوع"), max_digits=8, decimal_places=2, default=0, null=True, blank=True
     )
+    # Price frozen at creation time
+    unit_price = models.DecimalField(_("سعر الوحدة"), max_digits=8, decimal_places=2, default=0)
 
     created_at = models.DateTimeField(_("تاريخ الانشاء"), auto_now_add=True)
 
+    objects = OrderServiceQuerySet.as_manager()
+
     class Meta:
         verbose_name = _("الخدمة المطلوبة")
         verbose_name_plural = _("الخدمات المطلوبة")
@@ -237,6 +427,65 @@ class OrderService(models.Model):
     def __str__(self):
         return f"{self.quantity}x {self.service.name}"
 
+    def save(self, *args, **kwargs):
+        if self._state.adding and not self.unit_price:
+            self.unit_price = self.service.price
+        super().save(*args, **kwargs)
+
     def get_total_price(self):
         """Get total price for this service"""
-        return self.service.price * self.quantity
+        return self.unit_price * self.quantity
+
+
+SALES_ROLLUP_KINDS = (
+    ("order", "طلب"),
+    ("item", "منتج"),
+    ("service", "خدمة"),
+)
+
+
+class DailySalesRollup(models.Model):
+    """
+    Pre-aggregated sales per local day, keyed by (date, menu item or service, payment status, cancelled),
+    `order` rows (object_id 0) carry the order counts, `item` and `service` rows the line figures.
+    Maintained by src.order.services.refresh_daily_sales and rebuilt by a periodic task.
+    """
+
+    date = models.DateField(_("التاريخ"))
+    kind = models.CharField(_("النوع"), max_length=10, choices=SALES_ROLLUP_KINDS)
+    object_id = models.PositiveBigIntegerField(_("المنتج / الخدمة"), default=0)
+    payment_status = models.CharField(_("حالة الدفع"), max_length=20, choices=PAYMENT_STATUS)
+    cancelled = models.BooleanField(_("ملغي"), default=False)
+
+    orders = models.PositiveIntegerField(_("عدد الطلبات"), default=0)
+    lines = models.PositiveIntegerField(_("عدد البنود"), default=0)
+    quantity = models.PositiveIntegerField(_("الكمية"), default=0)
+    total = models.DecimalField(_("الإجمالي"), max_digits=12, decimal_places=2, default=0)
+
+    updated_at = models.DateTimeField(_("تاريخ التحديث"), auto_now=True)
+
+    class Meta:
+        verbose_name = _("ملخص المبيعات اليومي")
+        verbose_name_plural = _("ملخصات المبيعات اليومية")
+        constraints = [
+            models.UniqueConstraint(
+                fields=["date", "kind", "object_id", "payment_status", "cancelled"], name="daily_sales_rollup_key"
+            )
+        ]
+
+    def __str__(self):
+        return f"{self.date} {self.kind} {self.object_id}"
+
+
+class OrderTicketCounter(models.Model):
+    """Last ticket number handed out per local day"""
+
+    date = models.DateField(_("التاريخ"), primary_key=True)
+    last_number = models.PositiveIntegerField(_("آخر رقم"), default=0)
+
+    class Meta:
+        verbose_name = _("عداد التذاكر")
+        verbose_name_plural = _("عدادات التذاكر")
+
+    def __str__(self):
+        return f"{self.date} #{self.last_number}"
@@ -1,8 +1,20 @@
-from src.order.models import Order
-from src.common.utils import get_object
-from django.db.models import Sum, Count, F
+from src.order.models import (
+    Order,
+    OrderItem,
+    OrderService,
+    DailySalesRollup,
+    PAYMENT_STATUS,
+    normalize_ref_code,
+    parse_range_date,
+)
+from decimal import Decimal
+from src.menu.models import MenuItem
+from src.service.models import Service
+from src.common.utils import get_object, normalize_search_text
+from django.db.models import Sum, Count, F, Prefetch, Case, When, Value
+from django.utils import timezone
 import django_filters
-from datetime import date
+from datetime import date, timedelta
 from django.db.models import Q
 
 
@@ -31,12 +43,12 @@ def get_order_by_id(order_id: int):
 
 
 def get_order_by_ref_code(ref_code: str):
-    """Get order by reference code including services"""
+    """Get order by reference code including services, a single unique index probe"""
     return get_object(
         Order.objects.select_related("table__area").prefetch_related(
             "order_items__item", "order_services__service"  # Add this line
         ),
-        ref_code=ref_code,
+        ref_code=normalize_ref_code(ref_code),
     )
 
 
@@ -51,16 +63,17 @@ def get_recent_orders():
         Order.objects.recent()
         .select_related("table__area")
         .prefetch_related("order_items__item", "order_services__service")
+        .order_by("-created_at")
     )
 
 
 def get_pending_orders():
     """Get orders with pending payment status"""
-    return Order.objects.filter(payment_status="pending").select_related("table__area")
+    return Order.objects.filter(payment_status="pending").select_related("table__area").order_by("-created_at")
 
 
 class OrderListFilter(django_filters.FilterSet):
-    search_table = django_filters.CharFilter(method="search_table")
+    search_table = django_filters.CharFilter(method="filter_search_table")
     ref_code = django_filters.CharFilter(field_name="ref_code", lookup_expr="icontains")
     tax_enabled = django_filters.BooleanFilter(field_name="tax_enabled", lookup_expr="exact")
     payment_status = django_filters.CharFilter(field_name="payment_status", lookup_expr="exact")
@@ -68,20 +81,248 @@ class OrderListFilter(django_filters.FilterSet):
     created_at = django_filters.DateFilter(field_name="created_at", lookup_expr="gte", initial=date.today())
 
     def search_filter(self, queryset, name, value):
-        return queryset.filter(
-            Q(staff__username=value) | Q(customer_name__icontains=value) | Q(customer_phone__icontains=value)
-        )
+        return search_orders(queryset, value)
 
-    def search_table(self, queryset, name, value):
-        return queryset.filter(table__name__icontains=value | Q(table__area__name__icontains=value))
+    # Not named after the filter, a method with the same name would replace the declared filter
+    def filter_search_table(self, queryset, name, value):
+        return queryset.filter(Q(table__number__icontains=value) | Q(table__area__name__icontains=value))
 
     class Meta:
         model = Order
         fields = ["ref_code", "tax_enabled", "payment_status", "search", "created_at"]
 
 
+def search_orders(queryset, value):
+    """
+    Match the normalized term against Order.search_text (trigram indexed on PostgreSQL, so the
+    substring match stays index backed) or the ref code folded like normalize_ref_code,
+    and rank exact ref codes, then matches at the start of the text or of a word, first
+    """
+    term = normalize_search_text(value)
+    if not term:
+        return queryset
+
+    ref_code = normalize_ref_code(value)
+    return (
+        queryset.filter(Q(search_text__contains=term) | Q(ref_code=ref_code))
+        .annotate(
+            search_rank=Case(
+                When(ref_code=ref_code, then=Value(4)),
+                When(search_text__startswith=term, then=Value(3)),
+                When(search_text__contains=f" {term}", then=Value(2)),
+                default=Value(1),
+            )
+        )
+        .order_by("-search_rank", "-created_at")
+    )
+
+
 def get_order_list_filter(*, filters=None):
     filters = filters or {}
     qs = get_orders_list()
 
     return OrderListFilter(filters, qs).qs
+
+
+def get_sales_stats():
+    """
+    Dashboard figures (same shape as order_analysis) read from the daily sales rollups,
+    a handful of queries over pre-aggregated rows whatever the order history size.
+    Periods are whole local days: the last 7 days against the 23 days before them.
+    """
+    today = timezone.localdate()
+    last_week = today - timedelta(days=7)
+    last_month = today - timedelta(days=30)
+
+    rollups = DailySalesRollup.objects.all()
+
+    # 1. ITEM AND SERVICE REVENUE, ORDER COUNTS
+    by_kind = {
+        row["kind"]: row
+        for row in rollups.values("kind").annotate(orders=Sum("orders"), lines=Sum("lines"), total=Sum("total"))
+    }
+    item_revenue = by_kind.get("item", {}).get("total") or 0
+    service_revenue = by_kind.get("service", {}).get("total") or 0
+
+    # 2. PAYMENT STATUS BREAKDOWN
+    by_status = {
+        row["payment_status"]: row
+        for row in rollups.values("payment_status").annotate(orders=Sum("orders"), total=Sum("total"))
+    }
+    payment_status = [
+        {
+            "payment_status": status,
+            "count": by_status.get(status, {}).get("orders") or 0,
+            "total": by_status.get(status, {}).get("total") or 0,
+        }
+        for status, _ in PAYMENT_STATUS
+    ]
+
+    # 3 / 4. TOP ITEMS AND SERVICES
+    def top(kind, model, name_key):
+        rows = list(
+            rollups.filter(kind=kind)
+            .values("object_id")
+            .annotate(count=Sum("lines"), total=Sum("total"))
+            .order_by("-count")[:5]
+        )
+        names = model.objects.in_bulk([row["object_id"] for row in rows])
+        return [
+            {name_key: getattr(names.get(row["object_id"]), "name", None), "count": row["count"], "total": row["total"]}
+            for row in rows
+        ]
+
+    # 5. TIME-BASED COMPARISONS
+    periods = rollups.aggregate(
+        current=Sum("total", filter=Q(date__gt=last_week) & ~Q(kind="order")),
+        previous=Sum("total", filter=Q(date__gt=last_month, date__lte=last_week) & ~Q(kind="order")),
+        new_orders=Sum("orders", filter=Q(date__gt=last_week)),
+    )
+    current_period_revenue = periods["current"] or 0
+    previous_period_revenue = periods["previous"] or 0
+
+    percent_change = 0
+    if previous_period_revenue > 0:
+        percent_change = ((current_period_revenue - previous_period_revenue) / previous_period_revenue) * 100
+
+    return {
+        "totalRevenue": item_revenue + service_revenue,
+        "totalOrders": by_kind.get("order", {}).get("orders") or 0,
+        "paymentStatus": payment_status,
+        "topItems": top("item", MenuItem, "item__name"),
+        "topServices": top("service", Service, "service__name"),
+        "percentChange": round(percent_change, 2),
+        "newOrders": periods["new_orders"] or 0,
+        "itemsSold": by_kind.get("item", {}).get("lines") or 0,
+        "servicesBooked": by_kind.get("service", {}).get("lines") or 0,
+        "itemRevenue": item_revenue,
+        "serviceRevenue": service_revenue,
+    }
+
+
+def get_revenue_series(*, date_from, date_to, granularity="day", split_by=None):
+    """
+    Revenue, tax, order count and average ticket per hour, day, week or month (Africa/Cairo buckets)
+    between two dates, optionally split by table area or payment status, with a single grouped query
+    """
+    rows = Order.objects.total_earn_range(date_from, date_to, granularity=granularity, split_by=split_by)
+    for row in rows:
+        average_ticket = row["total"] / row["orders"] if row["orders"] else 0
+        row["average_ticket"] = Decimal(average_ticket).quantize(Decimal("0.01"))
+
+    return rows
+
+
+ORDER_EXPORT_FIELDS = [
+    "order_id",
+    "ref_code",
+    "created_at",
+    "customer_name",
+    "table",
+    "area",
+    "staff",
+    "payment_status",
+    "cancelled",
+    "order_subtotal",
+    "order_tax",
+    "order_total",
+    "order_paid",
+    "line_type",
+    "line_name",
+    "quantity",
+    "unit_price",
+    "discount_price",
+    "variations_price",
+    "line_total",
+    "line_paid",
+]
+
+
+def get_order_export_queryset(*, date_from, date_to):
+    return (
+        Order.objects.filter(
+            created_at__gte=parse_range_date(date_from), created_at__lt=parse_range_date(date_to, end=True)
+        )
+        .select_related("table__area", "staff")
+        .prefetch_related(
+            Prefetch("order_items", queryset=OrderItem.objects.with_line_total().select_related("item").order_by("id")),
+            Prefetch(
+                "order_services",
+                queryset=OrderService.objects.with_line_total().select_related("service").order_by("id"),
+            ),
+        )
+        .order_by("created_at", "id")
+    )
+
+
+def get_order_export_rows(*, date_from, date_to, batch_size=1000, chunk_size=200):
+    """
+    Yield one row per order line (or one per order without lines) for the orders created between two dates.
+    Orders are read in (created_at, id) keyset batches, each streamed with iterator(chunk_size) and its lines
+    prefetched per chunk, so memory stays constant whatever the range.
+    """
+    queryset = get_order_export_queryset(date_from=date_from, date_to=date_to)
+
+    last = None
+    while True:
+        batch = queryset
+        if last is not None:
+            batch = batch.filter(Q(created_at__gt=last.created_at) | Q(created_at=last.created_at, id__gt=last.id))
+
+        count = 0
+        for order in batch[:batch_size].iterator(chunk_size=chunk_size):
+            count += 1
+            last = order
+            yield from get_order_export_lines(order)
+
+        if count < batch_size:
+            return
+
+
+def get_order_export_lines(order):
+    header = {
+        "order_id": order.id,
+        "ref_code": order.ref_code,
+        "created_at": timezone.localtime(order.created_at).isoformat(),
+        "customer_name": order.customer_name,
+        "table": order.table.number if order.table else None,
+        "area": order.table.area.name if order.table else None,
+        "staff": order.staff.username if order.staff else None,
+        "payment_status": order.payment_status,
+        "cancelled": order.cancelled,
+        "order_subtotal": order.subtotal,
+        "order_tax": order.tax_amount,
+        "order_total": order.total,
+        "order_paid": order.paid_total,
+    }
+    empty_line = dict.fromkeys(ORDER_EXPORT_FIELDS[len(header) :])
+
+    lines = []
+    for item in order.order_items.all():
+        lines.append(
+            {
+                "line_type": "item",
+                "line_name": item.item.name,
+                "quantity": item.quantity,
+                "unit_price": item.unit_price,
+                "discount_price": item.discount_price,
+                "variations_price": item.variations_price,
+                "line_total": item.line_total.quantize(Decimal("0.01")),
+                "line_paid": item.paid_amount,
+            }
+        )
+    for service in order.order_services.all():
+        lines.append(
+            {
+                "line_type": "service",
+                "line_name": service.service.name,
+                "quantity": service.quantity,
+                "unit_price": service.unit_price,
+                "discount_price": None,
+                "variations_price": None,
+                "line_total": service.line_total.quantize(Decimal("0.01")),
+                "line_paid": service.paid_amount,
+            }
+        )
+
+    return [{**header, **line} for line in lines] or [{**header, **empty_line}]
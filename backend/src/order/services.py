@@ -1,62 +1,174 @@
-from src.order.models import Order, OrderItem, OrderService, PAYMENT_STATUS
+from src.order.models import (
+    Order,
+    OrderItem,
+    OrderService,
+    OrderTicketCounter,
+    DailySalesRollup,
+    PAYMENT_STATUS,
+    encode_ref_code,
+    parse_range_date,
+)
 from src.menu.models import MenuItem, MenuItemVariation
 from src.service.models import Service
-from src.table.models import Table
-from django.db import transaction
+from django.db import connection, transaction
 from typing import List, Dict, Optional
-import uuid
+import csv
+import json
+import logging
 from decimal import Decimal
-from src.menu.services import check_ingredient_availability, decrease_ingredient_stock, increase_ingredient_stock
+from src.menu.services import (
+    check_ingredient_availability,
+    get_ingredient_requirements,
+    release_ingredients,
+    reserve_ingredients,
+)
 from src.api.exception_handlers import ApplicationError
-from src.order.selectors import get_order_by_id
+from src.order.selectors import get_order_by_id, get_sales_stats, get_order_export_rows, ORDER_EXPORT_FIELDS
 from src.common.services import model_update
-from django.db.models.functions import Coalesce
+from src.common.utils import on_commit_once
+from src.common.cache import cache_get_or_compute, invalidate_namespaces
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models.functions import Round, TruncDate
 
 from django.db.models import (
     Sum,
     Count,
     F,
-    ExpressionWrapper,
     DecimalField,
     Case,
     When,
     Value,
     Q,
-    FloatField,
-    Subquery,
-    OuterRef,
 )
 from django.utils import timezone
 from datetime import timedelta
 
+logger = logging.getLogger(__name__)
+
+
+def next_ticket_number(date) -> int:
+    """
+    Hand out the next per-day ticket number with a single atomic upsert.
+    The counter row stays locked until the transaction ends, so call it as late as possible.
+    """
+    table = connection.ops.quote_name(OrderTicketCounter._meta.db_table)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"INSERT INTO {table} (date, last_number) VALUES (%s, 1) "
+            f"ON CONFLICT (date) DO UPDATE SET last_number = {table}.last_number + 1 "
+            "RETURNING last_number",
+            [date],
+        )
+        return cursor.fetchone()[0]
 
-def generate_ref_code() -> str:
-    """Generate unique reference code for order"""
-    return str(uuid.uuid4())[:8].upper()
 
+def issue_order_codes(order: Order) -> Order:
+    """
+    Give a saved order its reference code, derived from the id so it is unique without retries,
+    and, with ORDER_DAILY_TICKETS, its ticket number for the day, in one update
+    """
+    order.ref_code = encode_ref_code(order.pk)
+    order.search_text = order.build_search_text()
+    fields = ["ref_code", "search_text"]
 
-def update_order_payment_status(order):
-    """Update order payment status based on individual item/service payments"""
-    total_amount = order.get_total()
-    paid_amount = Decimal("0.00")
+    if settings.ORDER_DAILY_TICKETS:
+        order.ticket_number = next_ticket_number(timezone.localdate(order.created_at))
+        fields.append("ticket_number")
 
-    # Calculate total paid from items
-    for item in order.order_items.all():
-        paid_amount += item.paid_amount
+    Order.objects.filter(pk=order.pk).update(**{field: getattr(order, field) for field in fields})
+    return order
 
-    # Calculate total paid from services
-    for service in order.order_services.all():
-        paid_amount += service.paid_amount
 
-    if paid_amount >= total_amount:
+ORDER_TOTAL_FIELDS = ["subtotal", "tax_amount", "total", "paid_total"]
+
+
+def refresh_order_search_text(orders, batch_size: int = 1000) -> int:
+    """
+    Rebuild Order.search_text for `orders`, after a table, area or staff member it copies was renamed.
+    Returns the number of updated orders.
+    """
+    updated = 0
+    batch = []
+    for order in orders.select_related("table__area", "staff").order_by("id").iterator(chunk_size=batch_size):
+        order.search_text = order.build_search_text()
+        batch.append(order)
+        if len(batch) == batch_size:
+            updated += Order.objects.bulk_update(batch, ["search_text"])
+            batch = []
+    return updated + Order.objects.bulk_update(batch, ["search_text"])
+
+
+def apply_order_totals_delta(order: Order, subtotal: Decimal = Decimal("0.00"), paid: Decimal = Decimal("0.00")):
+    """
+    Shift the stored order totals by the given deltas with a single UPDATE.
+    Tax and total are derived from the new subtotal inside the same statement,
+    so concurrent line changes never overwrite each other.
+    """
+    new_subtotal = F("subtotal") + Decimal(subtotal)
+    tax_amount = Case(
+        When(tax_enabled=True, then=Round(new_subtotal * F("tax_rate"), 2)),
+        default=Value(Decimal("0.00")),
+        output_field=DecimalField(max_digits=10, decimal_places=2),
+    )
+    Order.objects.filter(id=order.id).update(
+        subtotal=new_subtotal,
+        tax_amount=tax_amount,
+        total=new_subtotal + tax_amount,
+        paid_total=F("paid_total") + Decimal(paid or 0),
+    )
+    order.refresh_from_db(fields=ORDER_TOTAL_FIELDS)
+    return order
 
-        order.payment_status = "paid"
-    elif paid_amount > 0:
-        order.payment_status = "partial"
-    else:
-        order.payment_status = "pending"
 
-    order.save()
+def apply_order_line_change(previous=None, line=None):
+    """
+    Move the stored totals for an order line that was added, edited or deleted outside the order services.
+    `previous` is the line as it was stored before the change, `line` the line after it.
+    """
+    deltas = {}
+    if previous is not None and previous.order_id:
+        subtotal, paid = deltas.get(previous.order_id, (Decimal("0.00"), Decimal("0.00")))
+        deltas[previous.order_id] = (subtotal - previous.get_total_price(), paid - (previous.paid_amount or 0))
+    if line is not None and line.order_id:
+        subtotal, paid = deltas.get(line.order_id, (Decimal("0.00"), Decimal("0.00")))
+        deltas[line.order_id] = (subtotal + line.get_total_price(), paid + (line.paid_amount or 0))
+
+    for order in Order.objects.filter(id__in=deltas):
+        subtotal, paid = deltas[order.id]
+        if subtotal or paid:
+            apply_order_totals_delta(order, subtotal=subtotal, paid=paid)
+
+
+def rebuild_order_totals(order: Order, commit: bool = True) -> List[str]:
+    """
+    Recompute the stored totals from the order lines.
+    Returns the names of the columns that were out of date.
+    """
+    totals = order.calculate_totals()
+    changed = [field for field, value in totals.items() if getattr(order, field) != value]
+
+    if changed and commit:
+        Order.objects.filter(id=order.id).update(**totals)
+        for field, value in totals.items():
+            setattr(order, field, value)
+
+    return changed
+
+
+def get_payment_status(total: Decimal, paid_total: Decimal) -> str:
+    """Payment status for the given total and paid amounts"""
+    if paid_total >= total:
+        return "paid"
+    elif paid_total > 0:
+        return "partial"
+    return "pending"
+
+
+def update_order_payment_status(order):
+    """Update order payment status based on the stored total and paid amounts"""
+    order.payment_status = get_payment_status(order.total, order.paid_total)
+    order.save(update_fields=["payment_status", "updated_at"])
     return order
 
 
@@ -70,30 +182,125 @@ def create_order(
     tax_enabled: bool = True,
     **kwargs,
 ) -> Order:
-    """Create a new order with items and services"""
-
-    # Create the order
-    order = Order.objects.create(
+    """
+    Create a new order with items and services.
+    Everything the lines reference is fetched up front and the lines are bulk inserted,
+    so the query count does not grow with the number of lines.
+    """
+    items_data = items_data or []
+    services_data = services_data or []
+
+    order = Order(
         table_id=table_id,
         customer_name=customer_name,
         customer_phone=customer_phone,
         tax_enabled=tax_enabled,
-        ref_code=generate_ref_code(),
         **kwargs,
     )
 
-    # Add menu items
-    if items_data:
-        for item_data in items_data:
-            create_order_item(order, item_data)
+    order_items, item_variations = build_order_items(items_data)
+    order_services = build_order_services(services_data)
 
-    # Add services
-    if services_data:
-        for service_data in services_data:
-            create_order_service(order, service_data)
+    # Totals are known before anything is written, so the order is inserted once with them
+    lines = [*order_items, *order_services]
+    order.subtotal = sum((line.get_total_price() for line in lines), Decimal("0.00"))
+    order.tax_amount = order.calculate_tax(order.subtotal)
+    order.total = order.subtotal + order.tax_amount
+    order.paid_total = sum((Decimal(line.paid_amount or 0) for line in lines), Decimal("0.00"))
+    order.payment_status = get_payment_status(order.total, order.paid_total)
+    order.save()
 
-    update_order_payment_status(order)
-    return order
+    # One lock-ordered stock reservation for the whole order
+    reserve_ingredients(
+        get_ingredient_requirements(
+            [
+                (line.item_id, [var.id for var in variations], line.quantity)
+                for line, variations in zip(order_items, item_variations)
+            ]
+        ),
+        order=order,
+    )
+
+    for line in lines:
+        line.order = order
+
+    OrderItem.objects.bulk_create(order_items)
+    OrderService.objects.bulk_create(order_services)
+
+    OrderItemVariation = OrderItem.item_variations.through
+    OrderItemVariation.objects.bulk_create(
+        [
+            OrderItemVariation(orderitem_id=line.id, menuitemvariation_id=variation.id)
+            for line, variations in zip(order_items, item_variations)
+            for variation in variations
+        ]
+    )
+
+    # Last, the ticket counter row stays locked until commit
+    return issue_order_codes(order)
+
+
+def build_order_items(items_data: List[Dict]) -> tuple[List[OrderItem], List[List[MenuItemVariation]]]:
+    """
+    Build unsaved order items with their price snapshots,
+    fetching all referenced menu items and variations with one query each
+    """
+    menu_items = MenuItem.objects.in_bulk({item_data["item"] for item_data in items_data})
+    variations = MenuItemVariation.objects.in_bulk(
+        {variation_id for item_data in items_data for variation_id in item_data.get("item_variations") or []}
+    )
+
+    order_items = []
+    item_variations = []
+    for item_data in items_data:
+        menu_item = menu_items.get(item_data["item"])
+        if menu_item is None:
+            raise ApplicationError(message="لم يتم العثور على المنتج", extra={"item": item_data["item"]})
+
+        line_variations = [
+            variations[variation_id]
+            for variation_id in item_data.get("item_variations") or []
+            if variation_id in variations
+        ]
+        order_item = OrderItem(
+            item=menu_item,
+            quantity=item_data["quantity"],
+            notes=item_data.get("notes", ""),
+            person_name=item_data.get("person_name", ""),
+            is_paid=item_data.get("is_paid", False),
+            paid_amount=item_data.get("paid_amount", 0),
+        )
+        order_item.snapshot_prices(line_variations)
+        order_items.append(order_item)
+        item_variations.append(line_variations)
+
+    return order_items, item_variations
+
+
+def build_order_services(services_data: List[Dict]) -> List[OrderService]:
+    """Build unsaved order services, fetching all referenced services with one query"""
+    services = Service.objects.in_bulk({service_data["service"] for service_data in services_data})
+
+    order_services = []
+    for service_data in services_data:
+        service = services.get(service_data["service"])
+        if service is None:
+            raise ApplicationError(message="لم يتم العثور على الخدمة", extra={"service": service_data["service"]})
+
+        order_services.append(
+            OrderService(
+                service=service,
+                quantity=service_data["quantity"],
+                notes=service_data.get("notes", ""),
+                person_name=service_data.get("person_name", ""),
+                booking_id=service_data.get("booking_id"),
+                is_paid=service_data.get("is_paid", False),
+                paid_amount=service_data.get("paid_amount", 0),
+                unit_price=service.price,
+            )
+        )
+
+    return order_services
 
 
 def create_order_item(order: Order, item_data: Dict) -> OrderItem:
@@ -105,15 +312,11 @@ def create_order_item(order: Order, item_data: Dict) -> OrderItem:
     if "item_variations" in item_data and item_data["item_variations"]:
         variations = list(MenuItemVariation.objects.filter(id__in=item_data["item_variations"]))
 
-    is_available, missing_ingredients = check_ingredient_availability(menu_item, variations, quantity)
-
-    if not is_available:
-        missing_items = ", ".join(
-            [f"{ing['ingredient']} (تحتاج {ing['required']}, يملك {ing['available']})" for ing in missing_ingredients]
-        )
-        raise ApplicationError(message=f"مكونات غير كافية ل {menu_item.name}: {missing_items}")
+    reserve_ingredients(
+        get_ingredient_requirements([(menu_item.id, [var.id for var in variations or []], quantity)]), order=order
+    )
 
-    order_item = OrderItem.objects.create(
+    order_item = OrderItem(
         order=order,
         item=menu_item,
         quantity=item_data["quantity"],
@@ -122,11 +325,13 @@ def create_order_item(order: Order, item_data: Dict) -> OrderItem:
         is_paid=item_data.get("is_paid", False),
         paid_amount=item_data.get("paid_amount", 0),
     )
+    order_item.snapshot_prices(variations)
+    order_item.save()
 
     if variations:
         order_item.item_variations.set(variations)
 
-    decrease_ingredient_stock(menu_item, variations, quantity)
+    apply_order_totals_delta(order, subtotal=order_item.get_total_price(), paid=order_item.paid_amount)
 
     return order_item
 
@@ -144,8 +349,11 @@ def create_order_service(order: Order, service_data: Dict) -> OrderService:
         booking_id=service_data.get("booking_id"),
         is_paid=service_data.get("is_paid", False),
         paid_amount=service_data.get("paid_amount", 0),
+        unit_price=service.price,
     )
 
+    apply_order_totals_delta(order, subtotal=order_service.get_total_price(), paid=order_service.paid_amount)
+
     return order_service
 
 
@@ -235,7 +443,7 @@ def split_payment_by_person(order):
         "people": list(people_data.values()),
         "unassigned_items": unassigned_items,
         "unassigned_services": unassigned_services,
-        "order_total": order.get_total(),
+        "order_total": order.total,
         "total_paid": sum(p["paid"] for p in people_data.values()),
         "total_remaining": sum(p["remaining"] for p in people_data.values()),
     }
@@ -244,17 +452,32 @@ def split_payment_by_person(order):
 @transaction.atomic
 def cancel_order(order: Order) -> Order:
     """Cancel an entire order and return all ingredients to stock"""
+    if order.cancelled:
+        raise ApplicationError(message="الطلب ملغي بالفعل")
 
-    for order_item in order.order_items.all():
-        variations = list(order_item.item_variations.all()) if order_item.item_variations.exists() else None
-        increase_ingredient_stock(order_item.item, variations, order_item.quantity)
+    release_ingredients(get_order_items_requirements(order.order_items.all()), order=order)
 
+    # Lines are kept on cancellation, so the stored totals stay as they are,
+    # only save the flag to avoid overwriting totals with stale in-memory values
     order.cancelled = True
-    order.save()
+    order.save(update_fields=["cancelled", "updated_at"])
 
     return order
 
 
+def get_order_items_requirements(order_items, quantity: Optional[int] = None) -> Dict[int, float]:
+    """
+    Sum the ingredient requirements of existing order items into one {ingredient_id: required} vector,
+    `quantity` overrides the line quantity (e.g. for a quantity difference)
+    """
+    return get_ingredient_requirements(
+        [
+            (line.item_id, [var.id for var in line.item_variations.all()], quantity or line.quantity)
+            for line in order_items
+        ]
+    )
+
+
 def get_order_ingredient_usage(order: Order) -> Dict:
     """Get total ingredient usage for an order"""
     total_usage = {}
@@ -300,38 +523,25 @@ def update_order_item_quantity(order_item: OrderItem, new_quantity: int) -> Orde
     if quantity_difference == 0:
         return order_item
 
-    # Get variations
-    variations = list(order_item.item_variations.all()) if order_item.item_variations.exists() else None
+    requirements = get_order_items_requirements([order_item], quantity=abs(quantity_difference))
 
     if quantity_difference > 0:
-        # Increasing quantity - check availability first
-        is_available, missing_ingredients = check_ingredient_availability(
-            order_item.item, variations, quantity_difference
-        )
-
-        if not is_available:
-            missing_items = ", ".join(
-                [
-                    f"{ing['ingredient']} (need {ing['required']}, have {ing['available']})"
-                    for ing in missing_ingredients
-                ]
-            )
-            raise ApplicationError(message=f"Insufficient ingredients to increase quantity: {missing_items}")
-
-        # Decrease stock for additional quantity
-        decrease_ingredient_stock(order_item.item, variations, quantity_difference)
-
+        # Increasing quantity - reserve the extra ingredients
+        reserve_ingredients(requirements, order=order_item.order)
     else:
         # Decreasing quantity - return ingredients to stock
-        increase_ingredient_stock(order_item.item, variations, abs(quantity_difference))
+        release_ingredients(requirements, order=order_item.order)
 
     # Update the order item
     order_item.quantity = new_quantity
-    order_item.save()
+    order_item.save(update_fields=["quantity"])
+
+    apply_order_totals_delta(order_item.order, subtotal=order_item.get_unit_price() * quantity_difference)
 
     return order_item
 
 
+@transaction.atomic
 def update_order_item(*, orderId, orderItemId: int, data: dict) -> OrderItem:
     """Update order item person and paid status"""
     order = get_order_by_id(orderId)
@@ -347,186 +557,70 @@ def update_order_item(*, orderId, orderItemId: int, data: dict) -> OrderItem:
         raise ApplicationError(message="لم يتم العثور على عنصر الطلب")
 
     fields = ["person_name", "is_paid", "paid_amount"]
+    old_paid_amount = item.paid_amount or 0
 
     instance, is_updated = model_update(instance=item, fields=fields, data=data)
-    order.refresh_from_db()
+    apply_order_totals_delta(order, paid=(instance.paid_amount or 0) - old_paid_amount)
     update_order_payment_status(order)
 
     return instance
 
 
 def order_analysis():
+    """
+    Dashboard figures computed live from the order tables in a single pass,
+    one aggregate per table with FILTER (WHERE ...) conditional aggregates plus the two top lists
+    """
     # Date ranges
     today = timezone.now()
     last_week = today - timedelta(days=7)
     last_month = today - timedelta(days=30)
 
-    # 1. ITEM REVENUE CALCULATION (using subquery approach)
-    item_revenue = (
-        OrderItem.objects.annotate(
-            base_price=Case(
-                When(item__discount_price__gt=0, then=F("item__discount_price")),
-                default=F("item__price"),
-                output_field=DecimalField(),
-            ),
-            variations_total=Coalesce(Sum("item_variations__extra_price"), Value(0), output_field=DecimalField()),
-        )
-        .annotate(
-            item_total=ExpressionWrapper(
-                (F("base_price") + F("variations_total")) * F("quantity"), output_field=DecimalField()
-            )
-        )
-        .aggregate(total=Sum("item_total"))["total"]
-        or 0
-    )
-
-    # 2. SERVICE REVENUE CALCULATION
-    service_revenue = (
-        OrderService.objects.annotate(
-            service_total=ExpressionWrapper(F("service__price") * F("quantity"), output_field=DecimalField())
-        ).aggregate(total=Sum("service_total"))["total"]
-        or 0
+    # Every revenue figure as a conditional aggregate over the order of each line
+    revenue_filters = {
+        "total": Q(),
+        "current": Q(order__created_at__gte=last_week),
+        "previous": Q(order__created_at__gte=last_month, order__created_at__lt=last_week),
+        **{status: Q(order__payment_status=status) for status, _ in PAYMENT_STATUS},
+    }
+    revenue_aggregates = {name: Sum("line_total", filter=line_filter) for name, line_filter in revenue_filters.items()}
+
+    # Lines are priced from their snapshot columns, no menu or service joins needed
+    items = OrderItem.objects.with_line_total()
+    services = OrderService.objects.with_line_total()
+
+    item_figures = items.aggregate(lines=Count("id"), **revenue_aggregates)
+    service_figures = services.aggregate(lines=Count("id"), **revenue_aggregates)
+    order_figures = Order.objects.aggregate(
+        total=Count("id"),
+        new=Count("id", filter=Q(created_at__gte=last_week)),
+        **{status: Count("id", filter=Q(payment_status=status)) for status, _ in PAYMENT_STATUS},
     )
 
-    total_revenue = item_revenue + service_revenue
-
-    # 3. PAYMENT STATUS BREAKDOWN (simplified approach)
-    payment_status = []
-    for status, _ in PAYMENT_STATUS:
-        # Item revenue for status
-        status_item_rev = (
-            OrderItem.objects.filter(order__payment_status=status)
-            .annotate(
-                base_price=Case(
-                    When(item__discount_price__gt=0, then=F("item__discount_price")),
-                    default=F("item__price"),
-                    output_field=DecimalField(),
-                ),
-                variations_total=Coalesce(Sum("item_variations__extra_price"), Value(0), output_field=DecimalField()),
-            )
-            .annotate(
-                item_total=ExpressionWrapper(
-                    (F("base_price") + F("variations_total")) * F("quantity"), output_field=DecimalField()
-                )
-            )
-            .aggregate(total=Sum("item_total"))["total"]
-            or 0
-        )
+    def revenue(name):
+        return (item_figures[name] or 0) + (service_figures[name] or 0)
 
-        # Service revenue for status
-        status_service_rev = (
-            OrderService.objects.filter(order__payment_status=status)
-            .annotate(service_total=ExpressionWrapper(F("service__price") * F("quantity"), output_field=DecimalField()))
-            .aggregate(total=Sum("service_total"))["total"]
-            or 0
-        )
+    # 1. ITEM AND SERVICE REVENUE
+    item_revenue = item_figures["total"] or 0
+    service_revenue = service_figures["total"] or 0
 
-        # Order count
-        order_count = Order.objects.filter(payment_status=status).count()
+    # 2. PAYMENT STATUS BREAKDOWN
+    payment_status = [
+        {"payment_status": status, "count": order_figures[status], "total": revenue(status)}
+        for status, _ in PAYMENT_STATUS
+    ]
 
-        payment_status.append(
-            {"payment_status": status, "count": order_count, "total": status_item_rev + status_service_rev}
-        )
+    # 3. TOP ITEMS
+    top_items = items.values("item__name").annotate(count=Count("id"), total=Sum("line_total")).order_by("-count")[:5]
 
-    # 4. TOP ITEMS (simplified approach)
-    top_items = (
-        OrderItem.objects.values("item__name")
-        .annotate(
-            count=Count("id"),
-            total=Sum(
-                ExpressionWrapper(
-                    Case(
-                        When(item__discount_price__gt=0, then=F("item__discount_price")),
-                        default=F("item__price"),
-                        output_field=DecimalField(),
-                    )
-                    * F("quantity"),
-                    output_field=DecimalField(),
-                )
-            ),
-        )
-        .order_by("-count")[:5]
-    )
-
-    # Add variations to top items (separate query)
-    for item in top_items:
-        variations_total = (
-            OrderItem.objects.filter(item__name=item["item__name"])
-            .annotate(
-                variations_sum=Coalesce(
-                    Sum("item_variations__extra_price") * F("quantity"), Value(0), output_field=DecimalField()
-                )
-            )
-            .aggregate(total=Sum("variations_sum"))["total"]
-            or 0
-        )
-        item["total"] += variations_total
-
-    # 5. TOP SERVICES
+    # 4. TOP SERVICES
     top_services = (
-        OrderService.objects.values("service__name")
-        .annotate(count=Count("id"), total=Sum(F("service__price") * F("quantity")))
-        .order_by("-count")[:5]
-    )
-
-    # 6. TIME-BASED COMPARISONS
-    # Current period (last week)
-    current_items = (
-        OrderItem.objects.filter(order__created_at__gte=last_week)
-        .annotate(
-            base_price=Case(
-                When(item__discount_price__gt=0, then=F("item__discount_price")),
-                default=F("item__price"),
-                output_field=DecimalField(),
-            ),
-            variations_total=Coalesce(Sum("item_variations__extra_price"), Value(0), output_field=DecimalField()),
-        )
-        .annotate(
-            item_total=ExpressionWrapper(
-                (F("base_price") + F("variations_total")) * F("quantity"), output_field=DecimalField()
-            )
-        )
-        .aggregate(total=Sum("item_total"))["total"]
-        or 0
-    )
-
-    current_services = (
-        OrderService.objects.filter(order__created_at__gte=last_week)
-        .annotate(service_total=ExpressionWrapper(F("service__price") * F("quantity"), output_field=DecimalField()))
-        .aggregate(total=Sum("service_total"))["total"]
-        or 0
+        services.values("service__name").annotate(count=Count("id"), total=Sum("line_total")).order_by("-count")[:5]
     )
 
-    current_period_revenue = current_items + current_services
-
-    # Previous period (week before last)
-    previous_items = (
-        OrderItem.objects.filter(order__created_at__gte=last_month, order__created_at__lt=last_week)
-        .annotate(
-            base_price=Case(
-                When(item__discount_price__gt=0, then=F("item__discount_price")),
-                default=F("item__price"),
-                output_field=DecimalField(),
-            ),
-            variations_total=Coalesce(Sum("item_variations__extra_price"), Value(0), output_field=DecimalField()),
-        )
-        .annotate(
-            item_total=ExpressionWrapper(
-                (F("base_price") + F("variations_total")) * F("quantity"), output_field=DecimalField()
-            )
-        )
-        .aggregate(total=Sum("item_total"))["total"]
-        or 0
-    )
-
-    previous_services = (
-        OrderService.objects.filter(order__created_at__gte=last_month, order__created_at__lt=last_week)
-        .annotate(service_total=ExpressionWrapper(F("service__price") * F("quantity"), output_field=DecimalField()))
-        .aggregate(total=Sum("service_total"))["total"]
-        or 0
-    )
-
-    previous_period_revenue = previous_items + previous_services
+    # 5. TIME-BASED COMPARISONS
+    current_period_revenue = revenue("current")
+    previous_period_revenue = revenue("previous")
 
     # Calculate percentage change
     percent_change = 0
@@ -534,15 +628,176 @@ def order_analysis():
         percent_change = ((current_period_revenue - previous_period_revenue) / previous_period_revenue) * 100
 
     return {
-        "totalRevenue": total_revenue,
-        "totalOrders": Order.objects.count(),
+        "totalRevenue": item_revenue + service_revenue,
+        "totalOrders": order_figures["total"],
         "paymentStatus": payment_status,
         "topItems": list(top_items),
         "topServices": list(top_services),
         "percentChange": round(percent_change, 2),
-        "newOrders": Order.objects.filter(created_at__gte=last_week).count(),
-        "itemsSold": OrderItem.objects.count(),
-        "servicesBooked": OrderService.objects.count(),
+        "newOrders": order_figures["new"],
+        "itemsSold": item_figures["lines"],
+        "servicesBooked": service_figures["lines"],
         "itemRevenue": item_revenue,
         "serviceRevenue": service_revenue,
     }
+
+
+DAILY_SALES_KEY_FIELDS = ["date", "kind", "object_id", "payment_status", "cancelled"]
+DAILY_SALES_VALUE_FIELDS = ["orders", "lines", "quantity", "total", "updated_at"]
+
+
+def get_daily_sales_rows(start=None, end=None) -> List[DailySalesRollup]:
+    """
+    Aggregate the orders created in [start, end) (default all) into unsaved DailySalesRollup rows
+    grouped by local date, three grouped queries whatever the range
+    """
+    tzinfo = timezone.get_current_timezone()
+    order_filter, line_filter = Q(), Q()
+    if start:
+        order_filter &= Q(created_at__gte=start)
+        line_filter &= Q(order__created_at__gte=start)
+    if end:
+        order_filter &= Q(created_at__lt=end)
+        line_filter &= Q(order__created_at__lt=end)
+    rows = []
+
+    orders = (
+        Order.objects.filter(order_filter)
+        .annotate(date=TruncDate("created_at", tzinfo=tzinfo))
+        .values("date", "payment_status", "cancelled")
+        .annotate(orders=Count("id"))
+    )
+    for row in orders:
+        rows.append(DailySalesRollup(kind="order", object_id=0, **row))
+
+    lines = [
+        ("item", OrderItem.objects.with_line_total(), "item_id"),
+        ("service", OrderService.objects.with_line_total(), "service_id"),
+    ]
+    for kind, queryset, object_field in lines:
+        line_rows = (
+            queryset.filter(line_filter)
+            .annotate(date=TruncDate("order__created_at", tzinfo=tzinfo))
+            .values("date", object_field, "order__payment_status", "order__cancelled")
+            .annotate(lines=Count("id"), quantity=Sum("quantity"), total=Sum("line_total"))
+        )
+        for row in line_rows:
+            rows.append(
+                DailySalesRollup(
+                    date=row["date"],
+                    kind=kind,
+                    object_id=row[object_field],
+                    payment_status=row["order__payment_status"],
+                    cancelled=row["order__cancelled"],
+                    lines=row["lines"],
+                    quantity=row["quantity"],
+                    total=row["total"],
+                )
+            )
+
+    return rows
+
+
+@transaction.atomic
+def refresh_daily_sales(date) -> int:
+    """
+    Recompute the rollup rows of one local day from its orders, returns the number of rows written.
+    Idempotent, so concurrent or repeated refreshes of the same day converge.
+    """
+    rows = get_daily_sales_rows(start=parse_range_date(date), end=parse_range_date(date, end=True))
+
+    DailySalesRollup.objects.filter(date=date).delete()
+    DailySalesRollup.objects.bulk_create(
+        rows, update_conflicts=True, unique_fields=DAILY_SALES_KEY_FIELDS, update_fields=DAILY_SALES_VALUE_FIELDS
+    )
+    transaction.on_commit(invalidate_order_stats)
+
+    return len(rows)
+
+
+@transaction.atomic
+def rebuild_daily_sales() -> int:
+    """Recompute every rollup row from the full order history, returns the number of rows written"""
+    rows = get_daily_sales_rows()
+
+    DailySalesRollup.objects.all().delete()
+    DailySalesRollup.objects.bulk_create(
+        rows,
+        batch_size=1000,
+        update_conflicts=True,
+        unique_fields=DAILY_SALES_KEY_FIELDS,
+        update_fields=DAILY_SALES_VALUE_FIELDS,
+    )
+    transaction.on_commit(invalidate_order_stats)
+
+    return len(rows)
+
+
+def enqueue_daily_sales_refresh(date: str):
+    """Queue the refresh of one day's rollups, refresh them inline when the broker cannot be reached"""
+    from src.order.tasks import refresh_daily_sales_task
+
+    try:
+        refresh_daily_sales_task.delay(date)
+    except Exception:
+        logger.exception("Could not queue the daily sales refresh of %s, refreshing inline", date)
+        refresh_daily_sales(date)
+
+
+def schedule_daily_sales_refresh(order: Order):
+    """
+    Refresh the rollups of the order's day in the background once the current transaction commits,
+    once per transaction and day however many orders and lines it saves.
+    Robust callbacks: the order is committed by then, a failing refresh is logged and must not fail the request.
+    """
+    date = timezone.localdate(order.created_at).isoformat()
+    if on_commit_once(f"daily-sales-refresh:{date}", lambda: enqueue_daily_sales_refresh(date)):
+        on_commit_once("order-stats-invalidation", invalidate_order_stats)
+
+
+ORDER_STATS_CACHE_KEYS = {False: "order:stats", True: "order:stats:live"}
+
+
+def get_order_stats(live: bool = False) -> Dict:
+    """
+    Dashboard figures for the stats endpoint, from the daily rollups or `live` from the order tables,
+    cached for ORDER_STATS_CACHE_TTL seconds with a single caller recomputing after an invalidation
+    """
+    return cache_get_or_compute(
+        ORDER_STATS_CACHE_KEYS[live],
+        order_analysis if live else get_sales_stats,
+        ttl=settings.ORDER_STATS_CACHE_TTL,
+        stale_ttl=settings.ORDER_STATS_CACHE_STALE_TTL,
+        namespace="orders",
+    )
+
+
+def invalidate_order_stats():
+    """Mark the cached stats stale in every worker, through the cache invalidation bus"""
+    invalidate_namespaces("orders")
+
+
+ORDER_EXPORT_FORMATS = {"csv": "text/csv", "jsonl": "application/x-ndjson"}
+
+
+class EchoBuffer:
+    """File-like object whose write returns the value, lets csv.writer produce strings for streaming"""
+
+    def write(self, value):
+        return value
+
+
+def export_orders(*, date_from, date_to, export_format="csv"):
+    """Generate the orders export for a date range as CSV or JSONL text chunks, one per row"""
+    rows = get_order_export_rows(date_from=date_from, date_to=date_to)
+
+    if export_format == "jsonl":
+        for row in rows:
+            yield json.dumps(row, cls=DjangoJSONEncoder, ensure_ascii=False) + "\n"
+        return
+
+    writer = csv.DictWriter(EchoBuffer(), fieldnames=ORDER_EXPORT_FIELDS)
+    # Byte order mark so spreadsheet apps read the Arabic names as UTF-8
+    yield "\ufeff" + writer.writeheader()
+    for row in rows:
+        yield writer.writerow(row)
@@ -0,0 +1,58 @@
+from django.contrib.auth import get_user_model
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from src.order.models import Order, OrderItem, OrderService
+from src.order.services import refresh_order_search_text, schedule_daily_sales_refresh
+from src.table.models import Table, TableArea
+
+User = get_user_model()
+
+# Model -> (field copied into Order.search_text, order lookup), see Order.build_search_text
+SEARCH_TEXT_SOURCES = {
+    Table: ("number", "table"),
+    TableArea: ("name", "table__area"),
+    User: ("username", "staff"),
+}
+
+
+@receiver(post_save, sender=Order)
+@receiver(post_delete, sender=Order)
+def order_changed(sender, instance, **kwargs):
+    schedule_daily_sales_refresh(instance)
+
+
+@receiver(post_save, sender=OrderItem)
+@receiver(post_delete, sender=OrderItem)
+@receiver(post_save, sender=OrderService)
+@receiver(post_delete, sender=OrderService)
+def order_line_changed(sender, instance, **kwargs):
+    if instance.order_id is None:
+        # A line not attached to an order (yet) is in no day's sales
+        return
+    try:
+        order = instance.order
+    except Order.DoesNotExist:
+        # Deleted together with its order, which schedules the refresh itself
+        return
+    schedule_daily_sales_refresh(order)
+
+
+@receiver(pre_save, sender=Table)
+@receiver(pre_save, sender=TableArea)
+@receiver(pre_save, sender=User)
+def remember_search_text_source(sender, instance, update_fields=None, **kwargs):
+    field, lookup = SEARCH_TEXT_SOURCES[sender]
+    if instance.pk is None or (update_fields is not None and field not in update_fields):
+        return
+    instance._search_text_source = sender.objects.filter(pk=instance.pk).values_list(field, flat=True).first()
+
+
+@receiver(post_save, sender=Table)
+@receiver(post_save, sender=TableArea)
+@receiver(post_save, sender=User)
+def search_text_source_changed(sender, instance, created, **kwargs):
+    field, lookup = SEARCH_TEXT_SOURCES[sender]
+    previous = instance.__dict__.pop("_search_text_source", None)
+    if not created and previous is not None and previous != getattr(instance, field):
+        refresh_order_search_text(Order.objects.filter(**{lookup: instance.pk}))
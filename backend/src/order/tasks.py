@@ -0,0 +1,15 @@
+from celery import shared_task
+
+from src.order.services import rebuild_daily_sales, refresh_daily_sales
+
+
+@shared_task
+def refresh_daily_sales_task(date):
+    """Recompute the daily sales rollups of one day (ISO date)"""
+    return refresh_daily_sales(date)
+
+
+@shared_task
+def rebuild_daily_sales_task():
+    """Recompute all daily sales rollups from the order history"""
+    return rebuild_daily_sales()
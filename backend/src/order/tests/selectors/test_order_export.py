@@ -0,0 +1,49 @@
+import csv
+import io
+import json
+from decimal import Decimal
+
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+
+from src.menu.models import Category, MenuItem
+from src.order.models import Order
+from src.order.selectors import get_order_export_rows
+from src.order.services import create_order
+
+
+class OrderExportTests(TestCase):
+    def setUp(self):
+        category = Category.objects.create(name="Food", slug="food", image="category.webp")
+        self.burger = MenuItem.objects.create(
+            category=category, name="برجر", slug="burger", price=Decimal("50.00"), product_image="burger.webp"
+        )
+        for index in range(5):
+            create_order(
+                customer_name=f"Customer {index}", items_data=[{"item": self.burger.id, "quantity": index + 1}]
+            )
+        Order.objects.create(customer_name="Empty")
+
+        self.today = timezone.localdate().isoformat()
+
+    def test_keyset_batches_cover_every_order_once(self):
+        rows = list(get_order_export_rows(date_from=self.today, date_to=self.today, batch_size=2, chunk_size=2))
+
+        self.assertEqual(len(rows), 6)
+        self.assertEqual(len({row["order_id"] for row in rows}), 6)
+        self.assertEqual([row["quantity"] for row in rows[:5]], [1, 2, 3, 4, 5])
+        self.assertIsNone(rows[5]["line_type"])
+
+    def test_command_writes_csv_and_jsonl(self):
+        output = io.StringIO()
+        call_command("export_orders", self.today, self.today, stdout=output)
+        rows = list(csv.DictReader(io.StringIO(output.getvalue().lstrip("﻿"))))
+        self.assertEqual(len(rows), 6)
+        self.assertEqual(rows[0]["line_name"], "برجر")
+        self.assertEqual(rows[1]["line_total"], "100.00")
+
+        output = io.StringIO()
+        call_command("export_orders", self.today, self.today, "--format", "jsonl", stdout=output)
+        rows = [json.loads(line) for line in output.getvalue().splitlines()]
+        self.assertEqual(rows[2]["line_total"], "150.00")
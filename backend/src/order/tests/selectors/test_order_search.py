@@ -0,0 +1,44 @@
+from django.test import TestCase
+
+from src.order.models import Order
+from src.order.selectors import get_order_list_filter
+from src.table.models import Table, TableArea
+
+
+class OrderSearchTests(TestCase):
+    def setUp(self):
+        self.pool = TableArea.objects.create(name="المسبح")
+        table = Table.objects.create(number="12", area=self.pool, capacity=4)
+
+        self.ahmed = Order.objects.create(customer_name="أَحْمَد علي", customer_phone="٠١٠٠١٢٣٤٥٦٧", ref_code="AB12CD")
+        self.mohamed = Order.objects.create(customer_name="محمد احمد", ref_code="ZZ99YY", table=table)
+        self.other = Order.objects.create(customer_name="Sara", ref_code="Q011WW")
+
+    def search(self, **filters):
+        return list(get_order_list_filter(filters={"created_at": "2000-01-01", **filters}))
+
+    def test_search_is_arabic_normalized_and_ranked(self):
+        # Word prefix matches first, diacritics and alef variants do not matter
+        self.assertEqual(self.search(search="احمد"), [self.ahmed, self.mohamed])
+        self.assertEqual(self.search(search="01001234"), [self.ahmed])
+        self.assertEqual(self.search(search="zz99yy"), [self.mohamed])
+
+    def test_search_text_follows_updates(self):
+        self.other.customer_name = "سارة"
+        self.other.save(update_fields=["customer_name"])
+
+        self.assertEqual(self.search(search="ساره"), [self.other])
+
+    def test_search_table_matches_number_and_area(self):
+        self.assertEqual(self.search(search_table="مسبح"), [self.mohamed])
+        self.assertEqual(self.search(search_table="12"), [self.mohamed])
+
+    def test_ref_code_look_alikes_match_exactly(self):
+        self.assertEqual(self.search(search="qol-iww"), [self.other])
+
+    def test_renamed_area_refreshes_the_search_text(self):
+        self.pool.name = "الحديقة"
+        self.pool.save()
+
+        self.assertEqual(self.search(search="الحديقه"), [self.mohamed])
+        self.assertEqual(self.search(search="المسبح"), [])
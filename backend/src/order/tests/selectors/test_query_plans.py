@@ -0,0 +1,81 @@
+import re
+from datetime import timedelta
+from decimal import Decimal
+
+from django.db import connection
+from django.test import TestCase
+from django.utils import timezone
+
+from src.order.models import Order
+from src.order.selectors import (
+    get_order_export_queryset,
+    get_order_list_filter,
+    get_orders_by_table,
+    get_orders_list,
+    get_pending_orders,
+    get_recent_orders,
+)
+from src.table.models import Table, TableArea
+
+
+class OrderQueryPlanTests(TestCase):
+    """
+    Every hot order selector must be served by an index, a sequential scan of the orders table fails the test.
+    On PostgreSQL sequential scans are disabled for the check, so the seeded table size does not matter.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        area = TableArea.objects.create(name="Beach")
+        cls.table = Table.objects.create(number="1", area=area, capacity=4)
+
+        now = timezone.now()
+        statuses = ["pending", "partial", "paid", "paid", "refunded"]
+        orders = [
+            Order(
+                ref_code=f"REF{index:05d}",
+                table=cls.table if index % 10 == 0 else None,
+                payment_status=statuses[index % len(statuses)],
+                cancelled=index % 20 == 0,
+                total=Decimal(index),
+            )
+            for index in range(500)
+        ]
+        Order.objects.bulk_create(orders)
+        for index, order in enumerate(Order.objects.order_by("id")):
+            Order.objects.filter(id=order.id).update(created_at=now - timedelta(hours=index))
+
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE")
+
+    def get_hot_querysets(self):
+        today = timezone.localdate()
+
+        return {
+            "orders list": get_orders_list()[:25],
+            "filtered orders list": get_order_list_filter(filters={"created_at": today.isoformat()})[:25],
+            "orders by ref code": Order.objects.filter(ref_code="REF00042"),
+            "orders by table": get_orders_by_table(self.table.id)[:25],
+            "recent orders": get_recent_orders(),
+            "pending orders": get_pending_orders()[:25],
+            "revenue range": Order.objects.range(str(today - timedelta(days=7)), str(today)),
+            "export batch": get_order_export_queryset(date_from=today - timedelta(days=3), date_to=today)[:1000],
+        }
+
+    def explain(self, queryset):
+        if connection.vendor == "postgresql":
+            with connection.cursor() as cursor:
+                cursor.execute("SET LOCAL enable_seqscan = off")
+        return queryset.explain()
+
+    def is_sequential_scan(self, plan):
+        if connection.vendor == "postgresql":
+            return re.search(r"Seq Scan on order_order\b", plan) is not None
+        # SQLite reports a full table scan as "SCAN <table>" without a "USING ... INDEX"
+        return re.search(r"SCAN order_order\b(?! USING)", plan) is not None
+
+    def test_hot_order_queries_use_indexes(self):
+        for name, queryset in self.get_hot_querysets().items():
+            with self.subTest(name):
+                plan = self.explain(queryset)
+                self.assertFalse(self.is_sequential_scan(plan), f"{name} scans order_order:\n{plan}")
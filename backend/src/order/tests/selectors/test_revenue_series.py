@@ -0,0 +1,42 @@
+from datetime import datetime
+from datetime import timezone as dt_timezone
+from decimal import Decimal
+
+from django.test import TestCase
+
+from src.order.models import Order
+from src.order.selectors import get_revenue_series
+
+
+class RevenueSeriesTests(TestCase):
+    def create_order(self, created_at, total, **kwargs):
+        order = Order.objects.create(total=total, **kwargs)
+        Order.objects.filter(id=order.id).update(created_at=created_at)
+        return order
+
+    def setUp(self):
+        # 23:30 UTC on the 1st is already the 2nd in Cairo
+        self.create_order(datetime(2026, 3, 1, 23, 30, tzinfo=dt_timezone.utc), Decimal("100.00"))
+        self.create_order(datetime(2026, 3, 2, 10, 0, tzinfo=dt_timezone.utc), Decimal("50.00"), payment_status="paid")
+        self.create_order(datetime(2026, 3, 1, 12, 0, tzinfo=dt_timezone.utc), Decimal("30.00"), payment_status="paid")
+        self.create_order(datetime(2026, 3, 2, 11, 0, tzinfo=dt_timezone.utc), Decimal("80.00"), cancelled=True)
+
+    def test_daily_buckets_in_restaurant_timezone_with_one_query(self):
+        with self.assertNumQueries(1):
+            series = get_revenue_series(date_from="2026-03-01", date_to="2026-03-31")
+
+        self.assertEqual([row["period"].date().isoformat() for row in series], ["2026-03-01", "2026-03-02"])
+        self.assertEqual([row["total"] for row in series], [Decimal("30.00"), Decimal("150.00")])
+        self.assertEqual(series[1]["orders"], 2)
+        self.assertEqual(series[1]["cancelled"], 1)
+        self.assertEqual(series[1]["average_ticket"], Decimal("75.00"))
+
+    def test_split_by_payment_status(self):
+        series = get_revenue_series(
+            date_from="2026-03-02", date_to="2026-03-02", granularity="month", split_by="payment_status"
+        )
+
+        self.assertEqual(
+            [(row["payment_status"], row["total"], row["orders"]) for row in series],
+            [("paid", Decimal("50.00"), 1), ("pending", Decimal("100.00"), 1)],
+        )
@@ -0,0 +1,94 @@
+from decimal import Decimal
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from src.api.exception_handlers import ApplicationError
+from src.inventory.models import Ingredient, RecipeIngredient
+from src.menu.models import Category, MenuItem, MenuItemVariation, Variation
+from src.menu.recipes import get_recipe_index
+from src.order.models import Order, OrderItem
+from src.order.selectors import get_order_by_id
+from src.order.services import cancel_order, create_order
+from src.service.models import Service, ServiceCategory
+
+
+class CreateOrderTests(TestCase):
+    def setUp(self):
+        category = Category.objects.create(name="Food", slug="food", image="category.webp")
+        self.bread = Ingredient.objects.create(name="Bread", unit="Piece", quantity_in_stock=100)
+        self.cheese = Ingredient.objects.create(name="Cheese", unit="Gram", quantity_in_stock=1000)
+
+        self.items = []
+        self.variations = []
+        for index in range(15):
+            item = MenuItem.objects.create(
+                category=category,
+                name=f"Sandwich {index}",
+                slug=f"sandwich-{index}",
+                price=Decimal("20.00"),
+                product_image="sandwich.webp",
+            )
+            RecipeIngredient.objects.create(menu_item=item, ingredient=self.bread, quantity_required=1)
+            variation = Variation.objects.create(item=item, name="Extra")
+            extra = MenuItemVariation.objects.create(variation=variation, value="Cheese", extra_price=Decimal("5.00"))
+            RecipeIngredient.objects.create(variation=extra, ingredient=self.cheese, quantity_required=10)
+            self.items.append(item)
+            self.variations.append(extra)
+
+        service_category = ServiceCategory.objects.create(name="Kids", slug="kids")
+        self.service = Service.objects.create(
+            category=service_category, name="Play area", slug="play-area", price=Decimal("50.00")
+        )
+
+    def items_data(self, count):
+        return [
+            {"item": item.id, "quantity": 2, "item_variations": [variation.id]}
+            for item, variation in zip(self.items[:count], self.variations[:count])
+        ]
+
+    def test_query_count_does_not_grow_with_lines(self):
+        get_recipe_index()
+
+        with CaptureQueriesContext(connection) as single_line:
+            create_order(customer_name="Ahmed", items_data=self.items_data(1))
+
+        with CaptureQueriesContext(connection) as many_lines:
+            order = create_order(
+                customer_name="Ahmed",
+                items_data=self.items_data(15),
+                services_data=[{"service": self.service.id, "quantity": 1}],
+            )
+
+        # Only the services lookup and insert are added on top of the single line order
+        self.assertEqual(len(many_lines.captured_queries), len(single_line.captured_queries) + 2)
+        self.assertEqual(order.order_items.count(), 15)
+        self.assertEqual(OrderItem.item_variations.through.objects.filter(orderitem__order=order).count(), 15)
+
+        order.refresh_from_db()
+        self.assertEqual(order.subtotal, Decimal("800.00"))
+        self.assertEqual(order.calculate_totals()["total"], order.total)
+
+        self.assertEqual(self.bread.get_stock_level(), 100 - 2 - 30)
+        self.assertEqual(self.cheese.get_stock_level(), 1000 - 20 - 300)
+
+    def test_insufficient_stock_creates_nothing(self):
+        Ingredient.objects.filter(id=self.bread.id).update(quantity_in_stock=5)
+
+        with self.assertRaises(ApplicationError):
+            create_order(customer_name="Ahmed", items_data=self.items_data(3))
+
+        self.assertFalse(Order.objects.exists())
+        self.assertEqual(self.cheese.get_stock_level(), 1000)
+
+    def test_cancel_order_releases_the_whole_reservation(self):
+        order = create_order(customer_name="Ahmed", items_data=self.items_data(5))
+
+        cancel_order(get_order_by_id(order.id))
+
+        self.assertEqual(self.bread.get_stock_level(), 100)
+        self.assertEqual(self.cheese.get_stock_level(), 1000)
+
+        with self.assertRaises(ApplicationError):
+            cancel_order(get_order_by_id(order.id))
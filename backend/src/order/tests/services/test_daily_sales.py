@@ -0,0 +1,95 @@
+from decimal import Decimal
+from unittest.mock import patch
+
+from django.test import TestCase
+from django.utils import timezone
+
+from src.menu.models import Category, MenuItem
+from src.order.models import DailySalesRollup, OrderItem
+from src.order.selectors import get_order_by_id, get_sales_stats
+from src.order.services import (
+    cancel_order,
+    create_order,
+    order_analysis,
+    rebuild_daily_sales,
+)
+from src.service.models import Service, ServiceCategory
+
+
+class DailySalesRollupTests(TestCase):
+    def setUp(self):
+        category = Category.objects.create(name="Food", slug="food", image="category.webp")
+        self.burger = MenuItem.objects.create(
+            category=category, name="Burger", slug="burger", price=Decimal("50.00"), product_image="burger.webp"
+        )
+        self.fries = MenuItem.objects.create(
+            category=category,
+            name="Fries",
+            slug="fries",
+            price=Decimal("20.00"),
+            discount_price=Decimal("15.00"),
+            product_image="fries.webp",
+        )
+        service_category = ServiceCategory.objects.create(name="Kids", slug="kids")
+        self.service = Service.objects.create(
+            category=service_category, name="Play area", slug="play-area", price=Decimal("40.00")
+        )
+
+    def create_orders(self):
+        create_order(
+            customer_name="Ahmed",
+            items_data=[{"item": self.burger.id, "quantity": 2}, {"item": self.fries.id, "quantity": 1}],
+            services_data=[{"service": self.service.id, "quantity": 1}],
+        )
+        create_order(customer_name="Sara", items_data=[{"item": self.fries.id, "quantity": 3}])
+        return create_order(customer_name="Omar", items_data=[{"item": self.burger.id, "quantity": 1}])
+
+    def test_stats_from_rollups_match_the_raw_analysis(self):
+        order = self.create_orders()
+        cancel_order(get_order_by_id(order.id))
+
+        rebuild_daily_sales()
+
+        # Three conditional aggregates (items, services, orders) and the two top lists
+        with self.assertNumQueries(5):
+            analysis = order_analysis()
+
+        self.assertEqual(get_sales_stats(), analysis)
+        self.assertEqual(analysis["totalRevenue"], Decimal("250.00"))
+        self.assertEqual(
+            analysis["paymentStatus"][0], {"payment_status": "pending", "count": 3, "total": Decimal("250.00")}
+        )
+
+    def test_order_changes_refresh_their_day_on_commit(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            order = self.create_orders()
+
+        self.assertEqual(get_sales_stats()["totalRevenue"], Decimal("250.00"))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            cancel_order(get_order_by_id(order.id))
+
+        cancelled = DailySalesRollup.objects.get(kind="order", cancelled=True)
+        self.assertEqual(cancelled.orders, 1)
+        self.assertEqual(get_sales_stats(), order_analysis())
+
+    def test_orders_are_created_and_rolled_up_without_a_broker(self):
+        with patch("src.order.tasks.refresh_daily_sales_task.delay", side_effect=ConnectionError("no broker")):
+            with self.captureOnCommitCallbacks(execute=True):
+                self.create_orders()
+
+        self.assertEqual(get_sales_stats()["totalRevenue"], Decimal("250.00"))
+
+    def test_one_refresh_is_queued_per_transaction_and_day(self):
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.create_orders()
+
+        keys = [getattr(callback, "on_commit_key", None) for callback in callbacks]
+        self.assertEqual(keys.count(f"daily-sales-refresh:{timezone.localdate().isoformat()}"), 1)
+        self.assertEqual(keys.count("order-stats-invalidation"), 1)
+
+    def test_lines_without_an_order_are_ignored(self):
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            OrderItem(item=self.burger, quantity=2).save()
+
+        self.assertEqual(callbacks, [])
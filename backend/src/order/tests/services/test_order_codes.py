@@ -0,0 +1,29 @@
+from django.test import TestCase, override_settings
+
+from src.order.models import REF_CODE_LENGTH, encode_ref_code
+from src.order.selectors import get_order_by_ref_code
+from src.order.services import create_order
+
+
+class OrderCodesTests(TestCase):
+    def test_ref_codes_are_unique_fixed_width_crockford(self):
+        codes = {encode_ref_code(order_id) for order_id in range(1, 50001)}
+
+        self.assertEqual(len(codes), 50000)
+        self.assertTrue(all(len(code) == REF_CODE_LENGTH for code in codes))
+        self.assertFalse(set("".join(codes)) & set("ILOU"))
+
+    def test_create_order_issues_ref_code_and_daily_ticket(self):
+        first = create_order(customer_name="Ahmed")
+        second = create_order(customer_name="Sara")
+
+        self.assertEqual(first.ref_code, encode_ref_code(first.id))
+        self.assertEqual((first.ticket_number, second.ticket_number), (1, 2))
+
+        typed = first.ref_code.lower().replace("0", "o").replace("1", "l")
+        with self.assertNumQueries(3):  # the order and its two prefetches
+            self.assertEqual(get_order_by_ref_code(f" {typed} "), first)
+
+    @override_settings(ORDER_DAILY_TICKETS=False)
+    def test_daily_tickets_are_optional(self):
+        self.assertIsNone(create_order(customer_name="Ahmed").ticket_number)
@@ -0,0 +1,143 @@
+from decimal import Decimal
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+
+from src.inventory.models import Ingredient, RecipeIngredient
+from src.menu.models import Category, MenuItem, MenuItemVariation, Variation
+from src.order.models import OrderItem, OrderService
+from src.order.services import (
+    create_order,
+    order_analysis,
+    rebuild_order_totals,
+    update_order_item,
+    update_order_item_quantity,
+)
+from src.service.models import Service, ServiceCategory
+from src.users.models import User
+
+
+class OrderTotalsTests(TestCase):
+    def setUp(self):
+        category = Category.objects.create(name="Drinks", slug="drinks", image="category.webp")
+        self.coffee = MenuItem.objects.create(
+            category=category, name="Coffee", slug="coffee", price=Decimal("30.00"), product_image="coffee.webp"
+        )
+        self.juice = MenuItem.objects.create(
+            category=category,
+            name="Juice",
+            slug="juice",
+            price=Decimal("40.00"),
+            discount_price=Decimal("35.00"),
+            product_image="juice.webp",
+        )
+        size = Variation.objects.create(item=self.coffee, name="Size")
+        self.large = MenuItemVariation.objects.create(variation=size, value="Large", extra_price=Decimal("5.00"))
+
+        self.beans = Ingredient.objects.create(name="Beans", unit="Gram", quantity_in_stock=1000)
+        RecipeIngredient.objects.create(menu_item=self.coffee, ingredient=self.beans, quantity_required=10)
+
+        service_category = ServiceCategory.objects.create(name="Kids", slug="kids")
+        self.service = Service.objects.create(
+            category=service_category, name="Play area", slug="play-area", price=Decimal("50.00")
+        )
+
+    def create_order(self):
+        return create_order(
+            customer_name="Ahmed",
+            items_data=[
+                {"item": self.coffee.id, "quantity": 2, "item_variations": [self.large.id]},
+                {"item": self.juice.id, "quantity": 1, "paid_amount": Decimal("10.00")},
+            ],
+            services_data=[{"service": self.service.id, "quantity": 1}],
+        )
+
+    def test_create_order_stores_totals(self):
+        order = self.create_order()
+        order.refresh_from_db()
+
+        # (30 + 5) * 2 + 35 + 50
+        self.assertEqual(order.subtotal, Decimal("155.00"))
+        self.assertEqual(order.tax_amount, Decimal("21.70"))
+        self.assertEqual(order.total, Decimal("176.70"))
+        self.assertEqual(order.paid_total, Decimal("10.00"))
+        self.assertEqual(order.payment_status, "partial")
+        self.assertEqual(order.calculate_totals()["total"], order.total)
+
+    def test_line_updates_apply_deltas(self):
+        order = self.create_order()
+        coffee_line = order.order_items.get(item=self.coffee)
+
+        update_order_item_quantity(coffee_line, 3)
+        update_order_item(orderId=order.id, orderItemId=coffee_line.id, data={"type": "item", "paid_amount": 105})
+
+        order.refresh_from_db()
+        self.assertEqual(order.subtotal, Decimal("190.00"))
+        self.assertEqual(order.paid_total, Decimal("115.00"))
+        self.assertEqual(order.calculate_totals()["total"], order.total)
+
+    def test_rebuild_command_fixes_drifted_totals(self):
+        order = self.create_order()
+        type(order).objects.filter(id=order.id).update(total=0)
+
+        out = StringIO()
+        call_command("rebuild_order_totals", "--verify", stdout=out)
+        self.assertIn(f"Order {order.id}: total mismatch", out.getvalue())
+
+        call_command("rebuild_order_totals", stdout=StringIO())
+        order.refresh_from_db()
+        self.assertEqual(order.total, Decimal("176.70"))
+
+    def test_menu_repricing_does_not_change_existing_orders(self):
+        order = self.create_order()
+        MenuItem.objects.filter(id=self.coffee.id).update(price=Decimal("99.00"))
+        MenuItemVariation.objects.filter(id=self.large.id).update(extra_price=Decimal("20.00"))
+
+        order.refresh_from_db()
+        self.assertEqual(order.calculate_totals()["subtotal"], Decimal("155.00"))
+        self.assertEqual(order_analysis()["totalRevenue"], Decimal("155.00"))
+
+    def test_lines_saved_directly_snapshot_current_prices(self):
+        order = self.create_order()
+
+        juice_line = OrderItem.objects.create(order=order, item=self.juice, quantity=1)
+        service_line = OrderService.objects.create(order=order, service=self.service, quantity=2)
+        priced_line = OrderItem.objects.create(order=order, item=self.coffee, unit_price=Decimal("12.00"))
+
+        self.assertEqual(juice_line.unit_price, Decimal("40.00"))
+        self.assertEqual(juice_line.get_total_price(), Decimal("35.00"))
+        self.assertEqual(service_line.get_total_price(), Decimal("100.00"))
+        self.assertEqual(priced_line.unit_price, Decimal("12.00"))
+
+    def test_admin_line_changes_move_the_totals(self):
+        order = self.create_order()
+        coffee_line = order.order_items.get(item=self.coffee)
+        self.client.force_login(
+            User.objects.create_superuser(username="admin", email="admin@hacksoft.io", password="123456")
+        )
+
+        self.client.post(
+            reverse("admin:order_orderitem_change", args=[coffee_line.id]),
+            {
+                "order": order.id,
+                "item": self.coffee.id,
+                "quantity": 3,
+                "item_variations": [],
+                "paid_amount": "20.00",
+                "unit_price": "30.00",
+                "variations_price": "5.00",
+            },
+        )
+        order.refresh_from_db()
+        # the variation is dropped: 30 * 3 + 35 + 50
+        self.assertEqual(order.subtotal, Decimal("175.00"))
+        self.assertEqual(order.paid_total, Decimal("30.00"))
+
+        self.client.post(
+            reverse("admin:order_orderservice_delete", args=[order.order_services.get().id]), {"post": "yes"}
+        )
+        order.refresh_from_db()
+        self.assertEqual(order.subtotal, Decimal("125.00"))
+        self.assertEqual(rebuild_order_totals(order, commit=False), [])
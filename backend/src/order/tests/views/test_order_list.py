@@ -0,0 +1,32 @@
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from src.order.models import Order
+from src.users.models import User
+
+
+class OrderListViewTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(
+            User.objects.create_superuser(username="admin", email="admin@hacksoft.io", password="123456")
+        )
+        self.url = reverse("api:orders:order-list")
+        self.order = Order.objects.create(customer_name="Ahmed", ref_code="AB12CD")
+
+    def test_cursor_pages_by_created_at(self):
+        result = self.client.get(self.url, {"cursor": "", "created_at": "2000-01-01"})
+
+        self.assertEqual(result.status_code, 200)
+        self.assertEqual([order["id"] for order in result.json()["results"]], [self.order.id])
+
+    def test_cursor_is_rejected_with_a_search(self):
+        result = self.client.get(self.url, {"cursor": "", "search": "ahmed", "created_at": "2000-01-01"})
+
+        self.assertEqual(result.status_code, 400)
+
+        result = self.client.get(self.url, {"search": "ahmed", "created_at": "2000-01-01"})
+
+        self.assertEqual(result.status_code, 200)
+        self.assertEqual([order["id"] for order in result.json()["results"]], [self.order.id])
@@ -15,4 +15,6 @@ urlpatterns = [
         name="update-order-items-services",
     ),
     path("stats/", views.OrderStats.as_view(), name="order-stats"),
+    path("revenue/", views.OrderRevenueView.as_view(), name="order-revenue"),
+    path("export/", views.OrderExportView.as_view(), name="order-export"),
 ]
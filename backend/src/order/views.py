@@ -1,8 +1,11 @@
+from django.http import StreamingHttpResponse
 from rest_framework import serializers, views, response, status
 from src.api.utils import inline_serializer
-from src.order.selectors import get_orders_list, get_order_by_id, get_order_list_filter
-from src.order.services import create_order, split_payment_by_person, cancel_order, update_order_item, order_analysis
-from src.api.pagination import get_paginated_response, LimitOffsetPagination
+from src.order.selectors import get_orders_list, get_order_by_id, get_order_list_filter, get_revenue_series
+from src.order.models import REVENUE_GRANULARITIES, REVENUE_SPLITS
+from src.order.services import create_order, split_payment_by_person, cancel_order, update_order_item, get_order_stats
+from src.order.services import export_orders, ORDER_EXPORT_FORMATS
+from src.api.pagination import get_paginated_response, CursorPagination, LimitOffsetPagination
 from src.api.mixins import ApiAuthMixin
 
 
@@ -43,6 +46,10 @@ class OrderListView(ApiAuthMixin, views.APIView):
     class Pagination(LimitOffsetPagination):
         default_limit = 25
 
+    class KeysetPagination(CursorPagination):
+        ordering = ("-created_at", "-id")
+        page_size = 25
+
     class OutputSerializer(serializers.Serializer):
         id = serializers.IntegerField()
         ref_code = serializers.CharField()
@@ -52,6 +59,8 @@ class OrderListView(ApiAuthMixin, views.APIView):
         tax_enabled = serializers.BooleanField()
         created_at = serializers.DateTimeField()
         cancelled = serializers.BooleanField()
+        total = serializers.DecimalField(max_digits=10, decimal_places=2)
+        paid_total = serializers.DecimalField(max_digits=10, decimal_places=2)
         table = inline_serializer(
             fields={
                 "id": serializers.IntegerField(),
@@ -74,10 +83,17 @@ class OrderListView(ApiAuthMixin, views.APIView):
         )
 
     def get(self, request):
+        # Clients opt in to keyset pagination by sending a (possibly empty) `cursor`.
+        # The keyset is (created_at, id), search results are ordered by rank and are paged by offset.
+        keyset = "cursor" in request.query_params
+        if keyset and request.query_params.get("search"):
+            raise serializers.ValidationError({"cursor": "لا يمكن استخدام cursor مع البحث، استخدم limit و offset"})
+
         orders = get_order_list_filter(filters=request.query_params)
+        pagination_class = self.KeysetPagination if keyset else self.Pagination
 
         return get_paginated_response(
-            pagination_class=self.Pagination,
+            pagination_class=pagination_class,
             serializer_class=self.OutputSerializer,
             queryset=orders,
             request=request,
@@ -97,6 +113,10 @@ class OrderDetailView(ApiAuthMixin, views.APIView):
         created_at = serializers.DateTimeField()
         updated_at = serializers.DateTimeField()
         cancelled = serializers.BooleanField()
+        subtotal = serializers.DecimalField(max_digits=10, decimal_places=2)
+        tax_amount = serializers.DecimalField(max_digits=10, decimal_places=2)
+        total = serializers.DecimalField(max_digits=10, decimal_places=2)
+        paid_total = serializers.DecimalField(max_digits=10, decimal_places=2)
         table = inline_serializer(
             fields={
                 "id": serializers.IntegerField(),
@@ -120,6 +140,9 @@ class OrderDetailView(ApiAuthMixin, views.APIView):
                 "person_name": serializers.CharField(),
                 "is_paid": serializers.BooleanField(),
                 "paid_amount": serializers.DecimalField(max_digits=8, decimal_places=2),
+                "unit_price": serializers.DecimalField(max_digits=8, decimal_places=2),
+                "discount_price": serializers.DecimalField(max_digits=8, decimal_places=2),
+                "variations_price": serializers.DecimalField(max_digits=8, decimal_places=2),
                 "item": inline_serializer(
                     fields={
                         "id": serializers.IntegerField(),
@@ -149,6 +172,7 @@ class OrderDetailView(ApiAuthMixin, views.APIView):
                 "person_name": serializers.CharField(),
                 "is_paid": serializers.BooleanField(),
                 "paid_amount": serializers.DecimalField(max_digits=8, decimal_places=2),
+                "unit_price": serializers.DecimalField(max_digits=8, decimal_places=2),
                 "service": inline_serializer(
                     fields={
                         "id": serializers.IntegerField(),
@@ -183,7 +207,7 @@ class OrderPaymentUpdateView(ApiAuthMixin, views.APIView):
 
         order = get_order_by_id(order_id)
         order.payment_status = serializer.validated_data["payment_status"]
-        order.save()
+        order.save(update_fields=["payment_status", "updated_at"])
 
         return response.Response({"message": "Payment status updated successfully"}, status=status.HTTP_200_OK)
 
@@ -212,5 +236,65 @@ class UpdateOrderItemsServicesView(ApiAuthMixin, views.APIView):
 
 
 class OrderStats(ApiAuthMixin, views.APIView):
+    class FilterSerializer(serializers.Serializer):
+        # Compute from the order tables instead of the daily rollups
+        live = serializers.BooleanField(required=False, default=False)
+
+    def get(self, request):
+        filters_serializer = self.FilterSerializer(data=request.query_params)
+        filters_serializer.is_valid(raise_exception=True)
+
+        stats = get_order_stats(live=filters_serializer.validated_data["live"])
+        return response.Response(stats, status=status.HTTP_200_OK)
+
+
+class OrderRevenueView(ApiAuthMixin, views.APIView):
+    class FilterSerializer(serializers.Serializer):
+        date_from = serializers.DateField()
+        date_to = serializers.DateField()
+        granularity = serializers.ChoiceField(choices=REVENUE_GRANULARITIES, default="day")
+        split_by = serializers.ChoiceField(choices=list(REVENUE_SPLITS), required=False)
+
+        def validate(self, data):
+            if data["date_from"] > data["date_to"]:
+                raise serializers.ValidationError({"date_to": "يجب أن يكون تاريخ النهاية بعد تاريخ البداية"})
+            return data
+
+    class OutputSerializer(serializers.Serializer):
+        period = serializers.DateTimeField()
+        area_id = serializers.IntegerField(required=False)
+        area = serializers.CharField(required=False)
+        payment_status = serializers.CharField(required=False)
+        total = serializers.DecimalField(max_digits=12, decimal_places=2)
+        tax = serializers.DecimalField(max_digits=12, decimal_places=2)
+        orders = serializers.IntegerField()
+        cancelled = serializers.IntegerField()
+        average_ticket = serializers.DecimalField(max_digits=12, decimal_places=2)
+
     def get(self, request):
-        return response.Response(order_analysis(), status=status.HTTP_200_OK)
+        filters_serializer = self.FilterSerializer(data=request.query_params)
+        filters_serializer.is_valid(raise_exception=True)
+
+        series = get_revenue_series(**filters_serializer.validated_data)
+        serializer = self.OutputSerializer(series, many=True)
+        return response.Response(serializer.data, status=status.HTTP_200_OK)
+
+
+class OrderExportView(ApiAuthMixin, views.APIView):
+    class FilterSerializer(serializers.Serializer):
+        date_from = serializers.DateField()
+        date_to = serializers.DateField()
+        # Not named `format`, DRF reserves that query parameter for content negotiation
+        export_format = serializers.ChoiceField(choices=list(ORDER_EXPORT_FORMATS), default="csv")
+
+    def get(self, request):
+        filters_serializer = self.FilterSerializer(data=request.query_params)
+        filters_serializer.is_valid(raise_exception=True)
+        filters = filters_serializer.validated_data
+
+        export_format = filters["export_format"]
+        stream = StreamingHttpResponse(export_orders(**filters), content_type=ORDER_EXPORT_FORMATS[export_format])
+        stream[
+            "Content-Disposition"
+        ] = f'attachment; filename="orders-{filters["date_from"]}-{filters["date_to"]}.{export_format}"'
+        return stream
@@ -1,8 +1,10 @@
 from src.service.models import Service, ServiceCategory, ServiceBooking
+from src.common.cache import cached_selector
 from src.common.utils import get_object
 from django.db.models import Prefetch
 
 
+@cached_selector("services")
 def get_service_categories_list():
     """Get all active service categories with their services"""
     return (
@@ -12,16 +14,19 @@ def get_service_categories_list():
     )
 
 
+@cached_selector("services")
 def get_service_category_by_slug(slug: str):
     """Get service category by slug"""
     return get_object(ServiceCategory.objects.prefetch_related("services"), slug=slug)
 
 
+@cached_selector("services")
 def get_services_list():
     """Get all active services"""
     return Service.objects.filter(is_active=True).select_related("category")
 
 
+@cached_selector("services")
 def get_service_by_slug(slug: str):
     """Get service by slug"""
     return get_object(Service.objects.select_related("category"), slug=slug)
@@ -32,6 +37,7 @@ def get_service_by_id(id: int, is_active: bool = True):
     return get_object(Service.objects.select_related("category"), id=id, is_active=is_active)
 
 
+@cached_selector("services")
 def get_services_by_category(category_id: int):
     """Get services by category"""
     return Service.objects.filter(category_id=category_id, is_active=True).select_related("category")
@@ -0,0 +1,18 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from src.common.cache import register_cache_invalidation
+from src.menu.shared_catalog import schedule_shared_catalog_refresh
+from src.menu.snapshots import schedule_catalog_snapshots
+from src.service.models import Service, ServiceCategory
+
+register_cache_invalidation("services", ServiceCategory, Service)
+
+
+@receiver(post_save, sender=ServiceCategory)
+@receiver(post_delete, sender=ServiceCategory)
+@receiver(post_save, sender=Service)
+@receiver(post_delete, sender=Service)
+def service_catalog_changed(sender, **kwargs):
+    schedule_catalog_snapshots()
+    schedule_shared_catalog_refresh()
@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class TableConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "src.table"
+
+    def ready(self) -> None:
+        from . import signals
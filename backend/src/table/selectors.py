@@ -1,8 +1,10 @@
 from src.table.models import Table, TableArea
+from src.common.cache import cached_selector
 from src.common.utils import get_object
 from django.db.models import Prefetch
 
 
+@cached_selector("tables")
 def get_table_areas_list():
     """Get all active table areas with their tables"""
     return TableArea.objects.filter(is_active=True).prefetch_related(
@@ -10,11 +12,13 @@ def get_table_areas_list():
     )
 
 
+@cached_selector("tables")
 def get_table_area_by_id(area_id: int):
     """Get table area by ID"""
     return get_object(TableArea.objects.prefetch_related("tables"), id=area_id)
 
 
+@cached_selector("tables")
 def get_tables_list():
     """Get all active tables"""
     return Table.objects.filter(is_active=True).select_related("area")
@@ -25,11 +29,13 @@ def get_table_by_id(table_id: int):
     return get_object(Table.objects.select_related("area"), id=table_id)
 
 
+@cached_selector("tables")
 def get_tables_by_area(area_id: int):
     """Get tables by area"""
     return Table.objects.filter(area_id=area_id, is_active=True).select_related("area")
 
 
+@cached_selector("tables")
 def get_tables_by_status(status: str):
     """Get tables by status"""
     return Table.objects.filter(status=status, is_active=True).select_related("area")
@@ -3,6 +3,7 @@ from src.table.selectors import filter_tables
 from django.db.models import Q
 from typing import List, Optional
 from src.api.exception_handlers import ApplicationError
+from src.common.cache import invalidate_namespaces
 
 
 def get_available_tables(area_id: Optional[int] = None) -> List[Table]:
@@ -17,6 +18,8 @@ def change_table_status(table_id: int, status: str) -> bool:
     """Reserve a table"""
     try:
         table = filter_tables(id=table_id).update(status=status)
+        # update() sends no signals
+        invalidate_namespaces("tables")
         return True
     except Exception as e:
         raise ApplicationError(f"Failed to change table status: {e}")
@@ -0,0 +1,4 @@
+from src.common.cache import register_cache_invalidation
+from src.table.models import Table, TableArea
+
+register_cache_invalidation("tables", TableArea, Table)
@@ -3,6 +3,9 @@ from django.db import transaction
 from django.utils.timezone import get_default_timezone_name
 from django_celery_beat.models import CrontabSchedule, IntervalSchedule, PeriodicTask
 
+from src.inventory.tasks import compact_stock_ledger_task
+from src.order.tasks import rebuild_daily_sales_task
+
 
 class Command(BaseCommand):
     help = """
@@ -10,7 +13,8 @@ class Command(BaseCommand):
 
     Following tasks will be created:
 
-        - ....
+        - Compact the ingredient stock ledger every 5 minutes
+        - Rebuild the daily sales rollups every night at 03:00
     """
 
     @transaction.atomic
@@ -38,7 +42,36 @@ class Command(BaseCommand):
             'enabled': True
         },
         """
-        periodic_tasks_data = []
+        periodic_tasks_data = [
+            {
+                "task": compact_stock_ledger_task,
+                "name": "Compact the ingredient stock ledger",
+                # Every 5 minutes
+                # https://crontab.guru/#*/5_*_*_*_*
+                "cron": {
+                    "minute": "*/5",
+                    "hour": "*",
+                    "day_of_week": "*",
+                    "day_of_month": "*",
+                    "month_of_year": "*",
+                },
+                "enabled": True,
+            },
+            {
+                "task": rebuild_daily_sales_task,
+                "name": "Rebuild the daily sales rollups",
+                # Everyday at 03:00
+                # https://crontab.guru/#0_3_*_*_*
+                "cron": {
+                    "minute": "0",
+                    "hour": "3",
+                    "day_of_week": "*",
+                    "day_of_month": "*",
+                    "month_of_year": "*",
+                },
+                "enabled": True,
+            },
+        ]
 
         timezone = get_default_timezone_name()
 
@@ -22,9 +22,11 @@ done
 
 python3 ./manage.py collectstatic --noinput
 
+python3 ./manage.py publish_catalog
+
 # chown -R wsgi:wsgi ./django_static
 
-gunicorn config.wsgi --bind 0.0.0.0:8000 --workers 8 --threads 8 --log-level info --timeout 120 --max-requests 1000 --max-requests-jitter 50
+gunicorn config.wsgi --config config/gunicorn.py --bind 0.0.0.0:8000 --workers 8 --threads 8 --log-level info --timeout 120 --max-requests 1000 --max-requests-jitter 50
 
 #####################################################################################
 # Options to DEBUG Django server